@@ -9,6 +9,8 @@ import psycopg2
 import psycopg2.extras
 from typing import Optional
 
+from db import connection
+
 
 # Secret key for JWT
 SECRET_KEY = "CHANGE_THIS_TO_A_RANDOM_SECRET"
@@ -21,17 +23,6 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter()
 
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
-
 # Request model
 class UserCreate(BaseModel):
     username: str
@@ -47,36 +38,33 @@ class LoginUser(BaseModel):
 
 @router.post("/signup")
 def signup(user: UserCreate):
-    conn = connect_to_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    cur.execute("SELECT * FROM users WHERE username = %s", (user.username,))
-    if cur.fetchone():
-        conn.close()
-        raise HTTPException(status_code=400, detail="Username already taken")
+        cur.execute("SELECT * FROM users WHERE username = %s", (user.username,))
+        if cur.fetchone():
+            raise HTTPException(status_code=400, detail="Username already taken")
 
-    hashed_pw = pwd_context.hash(user.password)
-    cur.execute("""
-        INSERT INTO users (username, hashed_password, name, surname, email)
-        VALUES (%s, %s, %s, %s, %s)
-        RETURNING user_id
-    """, (user.username, hashed_pw, user.name, user.surname, user.email))
+        hashed_pw = pwd_context.hash(user.password)
+        cur.execute("""
+            INSERT INTO users (username, hashed_password, name, surname, email)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING user_id
+        """, (user.username, hashed_pw, user.name, user.surname, user.email))
 
-    user_id = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
+        user_id = cur.fetchone()[0]
+        conn.commit()
 
     return {"msg": "User created successfully", "user_id": user_id}
 
 
 @router.post("/login")
 def login(user: LoginUser, response: Response):
-    conn = connect_to_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    cur.execute("SELECT * FROM users WHERE username = %s", (user.username,))
-    row = cur.fetchone()
-    conn.close()
+        cur.execute("SELECT * FROM users WHERE username = %s", (user.username,))
+        row = cur.fetchone()
 
     if not row or not pwd_context.verify(user.password, row["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -96,12 +84,10 @@ def logout(response: Response):
 
 @router.get("/check-username")
 def check_username(username: str):
-    conn = connect_to_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
-    cur.execute("SELECT 1 FROM users WHERE username = %s", (username,))
-    exists = cur.fetchone() is not None
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    conn.close()
+        cur.execute("SELECT 1 FROM users WHERE username = %s", (username,))
+        exists = cur.fetchone() is not None
 
     return {"exists": exists}
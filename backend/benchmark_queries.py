@@ -0,0 +1,123 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Solution Queries Benchmark |||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# Latency of the queries on the run of one saved solution as the number of saved runs grows, with and without the run_id indexes
+# (see db/migrations/003_solution_runs.sql). The tables are copied (structure only) into a scratch schema and filled with synthetic
+# runs, so the real data is never touched, and the schema is dropped at the end. For every number of runs:
+#   read     SELECT * ... WHERE run_id = %s, as the solution views do once they found the run of the solution
+#   delete   DELETE ... WHERE run_id = %s, as releasing a run does (rolled back)
+# are timed on random runs, first without and then with the index.
+#     python benchmark_queries.py --solutions 100 1000 10000 --rows 300
+# The database is the one in DATABASE_URL (see db.py).
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import time
+import random
+import argparse
+
+import numpy as np
+
+from db import connection
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+SCHEMA = "benchmark_queries"
+
+# Synthetic rows of runs first..last - 1, rows_per_solution rows each, spread over a number of users. The mapping tables are left
+# out: their primary key (run_id, index) already indexes them by run.
+TABLES = {
+    "solution_assignments": """
+        INSERT INTO {schema}.solution_assignments
+            (id, user_id, run_id, class_name, start_time, end_time, room_id, teacher_id, student_id)
+        SELECT s * %(rows)s + r, s %% %(users)s, s, 'class_' || (r %% 40), r %% 60, r %% 60 + 2, r %% 10, r %% 25, r
+        FROM generate_series(%(first)s, %(last)s - 1) AS s, generate_series(1, %(rows)s) AS r
+    """,
+    "solution_insights": """
+        INSERT INTO {schema}.solution_insights (id, user_id, run_id, workload_balance_index, student_distribution_score)
+        SELECT s * %(rows)s + r, s %% %(users)s, s, r, r
+        FROM generate_series(%(first)s, %(last)s - 1) AS s, generate_series(1, %(rows)s) AS r
+    """,
+}
+QUERIES = {
+    "read": "SELECT * FROM {schema}.{table} WHERE run_id = %s",
+    "delete": "DELETE FROM {schema}.{table} WHERE run_id = %s",
+}
+
+
+# |||||||||| BENCHMARK |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def time_query(conn, query, solutions, repeat):
+    ''' p50 and p99 latency (ms) of a query on random runs. Every query is rolled back, so deletes leave the data as it was. '''
+    cursor = conn.cursor()
+    latencies = []
+    for _ in range(repeat):
+        solution = random.randrange(solutions)
+        start = time.perf_counter()
+        cursor.execute(query, (solution,))
+        if cursor.description:
+            cursor.fetchall()
+        latencies.append(time.perf_counter() - start)
+        conn.rollback()
+    cursor.close()
+    return round(float(np.percentile(latencies, 50)) * 1000, 2), round(float(np.percentile(latencies, 99)) * 1000, 2)
+
+def run_benchmark(solution_counts, rows, users, repeat):
+    results = []
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        for table in TABLES:
+            cursor.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table})")
+        conn.commit()
+
+        try:
+            loaded = 0
+            for solutions in sorted(solution_counts):
+                for table, insert in TABLES.items():
+                    cursor.execute(insert.format(schema=SCHEMA), {"first": loaded, "last": solutions, "rows": rows, "users": users})
+                    cursor.execute(f"ANALYZE {SCHEMA}.{table}")
+                conn.commit()
+                loaded = solutions
+                print(f"{solutions} solutions loaded")
+
+                for table in TABLES:
+                    timings = {}
+                    for indexed in (False, True):
+                        if indexed:
+                            cursor.execute(f"CREATE INDEX {table}_benchmark_idx ON {SCHEMA}.{table} (run_id)")
+                            cursor.execute(f"ANALYZE {SCHEMA}.{table}")
+                            conn.commit()
+                        for name, query in QUERIES.items():
+                            timings[(name, indexed)] = time_query(conn, query.format(schema=SCHEMA, table=table), solutions, repeat)
+                        if indexed:
+                            cursor.execute(f"DROP INDEX {SCHEMA}.{table}_benchmark_idx")
+                            conn.commit()
+                    results.append((solutions, solutions * rows, table, timings))
+        finally:
+            conn.rollback()
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.commit()
+            cursor.close()
+    return results
+
+def print_results(results):
+    print(f"\n{'solutions':>9} {'rows':>9} {'table':<22} | {'query':<6} | {'no index p50/p99':>18} | {'indexed p50/p99':>18}")
+    for solutions, total_rows, table, timings in results:
+        for name in QUERIES:
+            plain, indexed = timings[(name, False)], timings[(name, True)]
+            print(f"{solutions:>9} {total_rows:>9} {table:<22} | {name:<6} | {plain[0]:>8} {plain[1]:>9} | {indexed[0]:>8} {indexed[1]:>9}")
+    print("Latencies in ms")
+
+
+# |||||||||| MAIN ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of the queries on a saved solution as the number of saved solutions grows.")
+    parser.add_argument("--solutions", type=int, nargs="+", default=[100, 1000, 10000], help="Numbers of saved solutions to try")
+    parser.add_argument("--rows", type=int, default=300, help="Rows of every table per solution")
+    parser.add_argument("--users", type=int, default=20, help="Users the solutions are spread over")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs of every query")
+    args = parser.parse_args()
+
+    print_results(run_benchmark(args.solutions, args.rows, args.users, args.repeat))
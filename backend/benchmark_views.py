@@ -0,0 +1,125 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Solution Views Benchmark ||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# Latency of the solution views under N parallel dashboard loads. A dashboard load is everything the solution screen needs: the
+# solution, insights, student count and five name mapping requests, all at once. For every N, the N loads are started together,
+# again and again for a number of rounds, and the p50/p99 latency of single requests and of whole loads is reported.
+#
+# Run it against a running API (uvicorn main:app) with a saved solution:
+#     python benchmark_views.py --user 1 --solution temp_sol --loads 1 8 32 --save async.json
+# To compare two versions of the API, save the results of the first one and pass them with --compare when running the second:
+#     python benchmark_views.py --user 1 --solution temp_sol --loads 1 8 32 --compare sync.json
+# With --bundle a dashboard load is a single solution-bundle request instead, as MainScreen.js makes it.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import httpx
+import numpy as np
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+BUNDLE_ENDPOINTS = ["solution-bundle"]
+DASHBOARD_ENDPOINTS = [
+    "custom-get-solution",
+    "custom-get-insights",
+    "custom-get-student-count",
+    "custom-get-student-names",
+    "custom-get-teacher-names",
+    "custom-get-room-names",
+    "custom-get-course-names",
+    "custom-get-instrument-names",
+]
+
+
+# |||||||||| BENCHMARK |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+async def timed_request(client, endpoint, body):
+    start = time.perf_counter()
+    response = await client.post(f"/{endpoint}", json=body)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+async def dashboard_load(client, body, endpoints):
+    ''' One dashboard load. Returns the latency of every request and of the whole load, in seconds. '''
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[timed_request(client, endpoint, body) for endpoint in endpoints])
+    return latencies, time.perf_counter() - start
+
+def percentiles(latencies):
+    ''' p50 and p99 of a list of latencies, in milliseconds. '''
+    return {"p50": round(float(np.percentile(latencies, 50)) * 1000, 1), "p99": round(float(np.percentile(latencies, 99)) * 1000, 1)}
+
+async def run_benchmark(url, body, loads, rounds, warmup, endpoints=DASHBOARD_ENDPOINTS):
+    results = {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)  # Every request of every load in flight at once
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        for _ in range(warmup):
+            await dashboard_load(client, body, endpoints)
+
+        for n in loads:
+            request_latencies, load_latencies = [], []
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for latencies, total in await asyncio.gather(*[dashboard_load(client, body, endpoints) for _ in range(n)]):
+                    request_latencies.extend(latencies)
+                    load_latencies.append(total)
+            elapsed = time.perf_counter() - start
+
+            results[str(n)] = {
+                "requests": percentiles(request_latencies),
+                "loads": percentiles(load_latencies),
+                "loads_per_second": round(n * rounds / elapsed, 1),
+            }
+            print(f"{n} parallel loads done in {elapsed:.1f}s")
+    return results
+
+def print_results(results, baseline=None):
+    print(f"\n{'loads':>6} | {'request p50':>11} {'request p99':>11} | {'load p50':>9} {'load p99':>9} | {'loads/s':>8}")
+    for n, result in results.items():
+        print(f"{n:>6} | {result['requests']['p50']:>11} {result['requests']['p99']:>11} | "
+              f"{result['loads']['p50']:>9} {result['loads']['p99']:>9} | {result['loads_per_second']:>8}")
+        if baseline and n in baseline:
+            base = baseline[n]
+            print(f"{'base':>6} | {base['requests']['p50']:>11} {base['requests']['p99']:>11} | "
+                  f"{base['loads']['p50']:>9} {base['loads']['p99']:>9} | {base['loads_per_second']:>8}")
+    print("Latencies in ms")
+
+
+# |||||||||| MAIN ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of the solution views under parallel dashboard loads.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--user", type=int, required=True, help="User id that owns the solution")
+    parser.add_argument("--solution", default="temp_sol", help="Solution id to load")
+    parser.add_argument("--loads", type=int, nargs="+", default=[1, 8, 32], help="Numbers of parallel dashboard loads to try")
+    parser.add_argument("--rounds", type=int, default=20, help="Times the parallel loads are repeated for each number")
+    parser.add_argument("--warmup", type=int, default=3, help="Single loads made before measuring, to open the pools")
+    parser.add_argument("--bundle", action="store_true", help="Load the dashboard with the solution-bundle endpoint")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run, to print next to the results")
+    args = parser.parse_args()
+
+    body = {"user_id": args.user, "solution_id": args.solution}
+    try:
+        results = asyncio.run(run_benchmark(
+            args.url, body, args.loads, args.rounds, args.warmup, BUNDLE_ENDPOINTS if args.bundle else DASHBOARD_ENDPOINTS
+        ))
+    except httpx.HTTPError as e:
+        print(f"Benchmark failed: {e}")
+        sys.exit(1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,133 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Response Cache ||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# A saved solution does not change after /save-solution writes it, so the responses of its views (solution-bundle and the custom-get-*
+# endpoints) are kept in an in-process LRU cache bounded by bytes, keyed by (user_id, solution_id, resource). The resource names the
+# view and its format, e.g. "solution:text/csv". /save-solution and /delete-solution invalidate every entry of the solution they touch.
+# temp_sol is rewritten by every run of the model, so it is never cached.
+#
+# Every cached response carries an ETag (a hash of its body) and Cache-Control: no-cache, so the browser revalidates with
+# If-None-Match and gets a 304 without a body while the solution is unchanged. The cache lives in the API process: with several
+# server processes, a save or delete only invalidates the cache of the process that served it. The first read of a streamed view is
+# read whole into the cache before it is sent, so it carries its ETag too; only a body larger than the whole cache streams without one.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from fastapi.responses import Response
+
+from runs import TEMP_SOLUTION
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+CACHE_BYTES = int(float(os.environ.get("SOLUTION_CACHE_MB", "64")) * 1024 * 1024)
+UNCACHED_SOLUTIONS = (TEMP_SOLUTION,)
+INVALIDATIONS_KEPT = 1024  # Invalidations remembered for reads that were in flight when they happened
+
+
+# |||||||||| CACHE |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def etag_of(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag):
+    ''' Whether an If-None-Match header matches an ETag (weak comparison, as RFC 9110 asks for If-None-Match). '''
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+def cacheable(solution_id):
+    return solution_id not in UNCACHED_SOLUTIONS
+
+
+class ResponseCache:
+    ''' LRU cache of response bodies, bounded by their total size in bytes. Thread safe: the async views read it in the event loop
+    while the sync save and delete endpoints invalidate it from the threadpool. '''
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (user_id, solution_id, resource) -> (body, media_type, headers, etag)
+        self.size = 0
+        self.epoch = 0  # Number of invalidations so far
+        self.invalidated = OrderedDict()  # (user_id, solution_id) -> epoch of its last invalidation, the last INVALIDATIONS_KEPT only
+        self.forgotten = 0  # Latest epoch dropped from invalidated
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def generation(self, user_id, solution_id):
+        ''' Taken before reading a solution and passed to put, so a response read before an invalidation is not stored after it. '''
+        with self.lock:
+            return self.epoch
+
+    def stale(self, solution, generation):
+        ''' Whether the solution was invalidated after the generation was taken. Once its invalidation is forgotten, any generation
+        older than the forgotten ones counts as stale. '''
+        return self.invalidated.get(solution, 0) > generation or generation < self.forgotten
+
+    def put(self, key, body, media_type, headers=None, generation=0):
+        ''' Store a response body and return its entry. Bodies larger than the whole cache, and bodies of a solution invalidated since
+        the given generation, are not stored. '''
+        entry = (body, media_type, dict(headers or {}), etag_of(body))
+        if len(body) > self.max_bytes:
+            return entry
+        with self.lock:
+            if self.stale(key[:2], generation):
+                return entry
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key)[0])
+            self.entries[key] = entry
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, *_) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+        return entry
+
+    def invalidate(self, user_id, solution_id):
+        ''' Drop every cached response of a solution. '''
+        with self.lock:
+            self.epoch += 1
+            self.invalidated[(user_id, solution_id)] = self.epoch
+            self.invalidated.move_to_end((user_id, solution_id))
+            while len(self.invalidated) > INVALIDATIONS_KEPT:
+                _, self.forgotten = self.invalidated.popitem(last=False)
+            for key in [key for key in self.entries if key[:2] == (user_id, solution_id)]:
+                self.size -= len(self.entries.pop(key)[0])
+
+    async def fill(self, key, chunks, media_type, headers=None, generation=0):
+        ''' Read a streamed body whole and store it, so its response can be sent with an ETag. Returns (entry, None), or (None, body)
+        once the body grows larger than the whole cache: body then streams all of it, the chunks already read included. '''
+        parts, size = [], 0
+        async for chunk in chunks:
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            parts.append(data)
+            size += len(data)
+            if size > self.max_bytes:
+                return None, chain(parts, chunks)
+        return self.put(key, b"".join(parts), media_type, headers, generation), None
+
+
+async def chain(parts, chunks):
+    for part in parts:
+        yield part
+    async for chunk in chunks:
+        yield chunk
+
+
+def cached_response(entry, if_none_match=None):
+    ''' Response for a cache entry: 304 without a body if the client already has it, the body otherwise. '''
+    body, media_type, headers, etag = entry
+    headers = {**headers, "ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -16,12 +16,15 @@
 # |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 from ortools.sat.python import cp_model
 import pandas as pd
+import numpy as np
 import math
 import os
 import logging
 import ast
 import builtins
 
+from registry import VariableRegistry, ALL_KINDS, FAMILY
+
 DEBUG_FILE = r"c:\Users\joanm\Documents\SCHEDULER DATA\debug_file.txt"
 
 def print(*args, **kwargs):
@@ -92,82 +95,42 @@ def safe_eval(val):
         return ast.literal_eval(val)
     return val
 
-def is_same_day(t, duration):
-    day_slot_ranges = {
-        0: range(0, 20),    # Monday
-        1: range(20, 40),   # Tuesday
-        2: range(40, 60),   # Wednesday
-        3: range(60, 80),   # Thursday
-        4: range(80, 100),   # Friday 
-        # For some reason 100 reaises keyError while 99 works fine, no class is ever going to be ever assigned to t = 100 anyways
-    }
-
-    t_end = t + duration - 1  # Compute the end time slot
-
-    # Find the day for t
-    start_day = next(day for day, slots in day_slot_ranges.items() if t in slots)
-
-    # Find the day for t_end
-    end_day = next(day for day, slots in day_slot_ranges.items() if t_end in slots)
-
-    return start_day == end_day
-
-def precompute_starting_slots(student_availability, num_slots, num_courses, num_instruments, courses, instruments):
+def precompute_starting_slots(student_availability, grid, num_courses, num_instruments, courses, instruments):
     ''' Function used for determining all time slots the model can actually assign for each student, given individual availability and
     class duration, thus implementing the Class duration constraint and the Overlaps constraint. The model works by assigning individual
-    time slots to the different class types (x, x2, y, y2, z, z2). However, classes span accross multiple time slots (1 slot = 15 min),
-    the number of which depends on the corresponding class duration. To ensure classes are not assigned when the student the model is
-    working with will not be able to finish it, and in order to avoid scheduling overlapping classes, the precompute_starting_slots function
-    computes all possible time slots the model can assign for every student and class type combination. '''
-
-    durations = {
-        "course": [courses.iloc[c]["course_duration_minutes_per_session"] for c in range(num_courses)],
-        "instrument": [instruments.iloc[i]["instrument_duration_minutes_per_session"] for i in range(num_instruments)]
-    }
+    time slots to the different class types (x, x2, y, y2, z, z2). However, classes span accross multiple time slots (1 slot = 15 min
+    on the default time grid), the number of which depends on the corresponding class duration. To ensure classes are not assigned when
+    the student the model is working with will not be able to finish it, and in order to avoid scheduling overlapping classes, the
+    precompute_starting_slots function computes all possible time slots the model can assign for every student and class type
+    combination, as one boolean [student, class, time slot] array per family (course and instrument). The same goes for teachers.
+
+    Every window of availability is checked at once: with the running count of available slots, a class of duration d can start at t
+    when the count grows by exactly d between t and t + d, and it must also end before its day does. '''
+    num_slots = grid.num_slots
+    starts = np.arange(num_slots)
+
+    # Time slot t is read from column t of the availability matrix, like everywhere else in the model
+    available = student_availability.values[:, :num_slots] == 1
+    available_count = np.zeros((available.shape[0], num_slots + 1), dtype=np.int32)
+    available_count[:, 1:] = np.cumsum(available, axis=1)
 
     valid_starting_slots = {}
 
-    for s in range(len(student_availability)):
-        valid_starting_slots[s] = {}
+    for family, classes, num_classes in (('course', courses, num_courses), ('instrument', instruments, num_instruments)):
+        valid_starting_slots[family] = np.zeros((available.shape[0], num_classes, num_slots), dtype=bool)
 
-        for c in range(len(durations["course"])):
-            valid_starting_slots[s][f'course_{c}'] = []
-            duration = durations["course"][c]
-            duration = int(duration / 15)
+        for k in range(num_classes):
+            duration = grid.slots(classes.iloc[k][f"{family}_duration_minutes_per_session"])
 
-            for t in range(num_slots):
-                # Check if the student is available for the full duration starting at `t`
-                if t + duration <= num_slots:
-                    availability_slice = student_availability.iloc[s, t:t + duration]
-                    # Ensure we check per day, if the slice crosses into the next day, it should be invalid
-                    doesitcross = is_same_day(t, duration)
-                    if not doesitcross:  # This slice spans two different days
-                        continue  # Skip this starting point
-                    if all(availability_slice == 1):  # Ensure the student is available for the entire duration
-                        valid_starting_slots[s][f'course_{c}'].append(t)
+            # Ensure we check per day, if the class crosses into the next day, it should be invalid
+            same_day = starts[starts + duration <= grid.slot_day_end]
 
-        for i in range(len(durations["instrument"])):
-            valid_starting_slots[s][f'instrument_{i}'] = []
-            duration = durations["instrument"][i]
-            duration = int(duration / 15)
-
-            for t in range(num_slots):
-                # Check if the student is available for the full duration starting at `t`
-                if t + duration <= num_slots:
-                    availability_slice = student_availability.iloc[s, t:t + duration]
-
-                    # Ensure we check per day, if the slice crosses into the next day, it should be invalid
-                    doesitcross = is_same_day(t, duration)
-
-                    if not doesitcross:  # This slice spans two different days
-                        continue  # Skip this starting point
-
-                    if all(availability_slice == 1):  # Ensure the student is available for the entire duration
-                        valid_starting_slots[s][f'instrument_{i}'].append(t)
+            # Ensure the student is available for the entire duration
+            valid_starting_slots[family][:, k, same_day] = available_count[:, same_day + duration] - available_count[:, same_day] == duration
 
     return valid_starting_slots
 
-def antique_students(student_availability, antiquity):
+def antique_students(student_availability, antiquity, grid):
     ''' Funtion used for storing class days and starting time for those class days for all students with antiquity, looking
     exclussively to their feasible antique schedule (overlap between antique schedule and current availability). '''
 
@@ -178,8 +141,8 @@ def antique_students(student_availability, antiquity):
         daily_start_times = []
         day_index = 0
 
-        for day in ['MON', 'TUE', 'WED', 'THU', 'FRI']:
-            day_slots = [col for col in antiquity.columns if col.startswith(day)]
+        for day in grid.days:
+            day_slots = [grid.labels[t] for t in grid.day_range(grid.day_index[day])]
             
             # Check if the student is available on the given day and if they have a scheduled class
             first_slot = None
@@ -320,207 +283,172 @@ def get_minimum_days(s, x, x2, y, y2, z, z2, num_courses, num_instruments, num_s
     return min_days
 
 
-# |||||||||| CONSTRAINTS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
-def initialize_variables(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, student_availability, teacher_availability):
-    for s in range(num_students):
-        for e in range(num_teachers):
-            for r in range(num_rooms):
-                for t in range(num_slots):
-                    # Skip creating variables if student or teacher is unavailable
-                    if student_availability.iloc[s, t] == 0 or teacher_availability.iloc[e, t] == 0:
-                        continue
-
-                    for c in range(num_courses):
-                        gx[s, e, r, c, t] = model.NewBoolVar(f'gx_s{s}_e{e}_r{r}_c{c}_t{t}')
-                        
-                        # Only create gx2 if biweekly
-                        if courses.iloc[c]["course_duration_times_per_week"] == 2:
-                            gx2[s, e, r, c, t] = model.NewBoolVar(f'gx2_s{s}_e{e}_r{r}_c{c}_t{t}')
-
-                    for i in range(num_instruments):
-                        gy[s, e, r, i, t] = model.NewBoolVar(f'gy_s{s}_e{e}_r{r}_i{i}_t{t}')
-                        gz[s, e, r, i, t] = model.NewBoolVar(f'gz_s{s}_e{e}_r{r}_i{i}_t{t}')
-                        
-                        # Only create gy2 and gz2 if biweekly
-                        if instruments.iloc[i]["instrument_duration_times_per_week"] == 2:
-                            gy2[s, e, r, i, t] = model.NewBoolVar(f'gy2_s{s}_e{e}_r{r}_i{i}_t{t}')
-                            gz2[s, e, r, i, t] = model.NewBoolVar(f'gz2_s{s}_e{e}_r{r}_i{i}_t{t}')
-
-    return model, gx, gx2, gy, gy2, gz, gz2
+# |||||||||| VARIABLE DOMAIN ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# The following functions compute, from static input data only, which (student, teacher, room, class, time slot) tuples can ever be
+# assigned. Only the surviving tuples become variables, instead of creating variables for every available time slot and pinning most of
+# them to 0 afterwards, which is what used to exhaust memory with as little as 30 students, 5 teachers and 5 rooms.
 
-def continuity_and_priorization(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, priorities, course_continuity, student_availability, courses, instruments, num_students, num_courses, num_slots, num_instruments):
+def continuity_and_priorization(priorities, course_continuity, student_availability, courses, instruments, num_students, num_courses):
+    ''' Function used for determining which class types (kind, c/i) each student can be assigned, given their requested courses, their
+    first and second option instruments and instrument continuity. '''
     y_ins, z_ins, continuity = priority_instrument(student_availability, priorities)
 
-    remove_gx, remove_gx2 = [], []
-    remove_gy, remove_gy2, remove_gz, remove_gz2 = [], [], [], []
+    requested_classes = {}
 
     # Course and instrument selection
     print(f'these are the columns to check {priorities.columns}')
     print(f'these are the students to check {priorities.index}')
     for s in range(num_students):
         student_id = student_availability.index[s]
-        for e in range(num_teachers):
-            for r in range(num_rooms):
-                for c in range(num_courses):
-                    column_name = f'course_{courses.index[c]}'
-                    print(F'1. WE ARE HERE - {column_name} and {student_id}')
-                    if column_name in priorities.columns and student_id in priorities.index:
-                        print('2. NOW HERE')
-                        if priorities.loc[student_id, column_name] == 0:
-                            print('3. AND NOW HERE')
-                            for t in range(num_slots):
-                                if (s, e, r, c, t) in gx:
-                                    print('4. FINALLY HERE')
-                                    model.Add(gx[s, e, r, c, t] == 0)
-                                    remove_gx.append((s, e, r, c, t))
-                                if (s, e, r, c, t) in gx2:
-                                    model.Add(gx2[s, e, r, c, t] == 0)
-                                    remove_gx2.append((s, e, r, c, t))
-                        elif priorities.loc[student_id, column_name] == 1:
-                            continue
-
-                if continuity[s] == 1:
-                    # In this case the lower priority instrument must never be scheduled
-                    for i in range(num_instruments):
-                        for t in range(num_slots):
-                            if (s, e, r, i, t) in gz:
-                                model.Add(gz[s, e, r, i, t] == 0)
-                                remove_gz.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gz2:
-                                model.Add(gz2[s, e, r, i, t] == 0)
-                                remove_gz2.append((s, e, r, i, t))
-
-                for i in range(num_instruments):
-                    if i != y_ins[s]:
-                        # If the instrument for the student is not assigned as `y_instrument`, set all `y` and `y2` variables to 0
-                        for t in range(num_slots):
-                            if (s, e, r, i, t) in gy:
-                                model.Add(gy[s, e, r, i, t] == 0)
-                                remove_gy.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gy2:
-                                model.Add(gy2[s, e, r, i, t] == 0)
-                                remove_gy2.append((s, e, r, i, t))
-
-                    if z_ins[s] is not None and i != z_ins[s]:
-                        # If the instrument is not assigned as `z_instrument` for the student, set all `z` and `z2` variables to 0
-                        for t in range(num_slots):
-                            if (s, e, r, i, t) in gz:
-                                model.Add(gz[s, e, r, i, t] == 0)
-                                remove_gz.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gz2:
-                                model.Add(gz2[s, e, r, i, t] == 0)
-                                remove_gz2.append((s, e, r, i, t))
-
-                # If z_instrument for the student is None (no second requested instrument), eliminate all `z` and `z2` combinations
-                if z_ins[s] is None:
-                    for i in range(num_instruments):
-                        for t in range(num_slots):
-                            if (s, e, r, i, t) in gz:
-                                model.Add(gz[s, e, r, i, t] == 0)
-                                remove_gz.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gz2:
-                                model.Add(gz2[s, e, r, i, t] == 0)
-                                remove_gz2.append((s, e, r, i, t))
-            
+        requested_classes[s] = []
+
+        for c in range(num_courses):
+            column_name = f'course_{courses.index[c]}'
+            if column_name in priorities.columns and student_id in priorities.index:
+                if priorities.loc[student_id, column_name] == 0:
+                    # Courses the student did not request are never scheduled
+                    continue
+
+            requested_classes[s].append(('gx', c))
+            # Only schedule gx2 if biweekly
+            if courses.iloc[c]["course_duration_times_per_week"] == 2:
+                requested_classes[s].append(('gx2', c))
+
+        # Only the `y_instrument` of the student can be scheduled as `y` and `y2`
+        if y_ins[s] is not None:
+            requested_classes[s].append(('gy', y_ins[s]))
+            if instruments.iloc[y_ins[s]]["instrument_duration_times_per_week"] == 2:
+                requested_classes[s].append(('gy2', y_ins[s]))
+
+        # If continuity[s] == 1 the lower priority instrument must never be scheduled, otherwise only the `z_instrument` of the student
+        # (if any) can be scheduled as `z` and `z2`
+        if continuity[s] != 1 and z_ins[s] is not None:
+            requested_classes[s].append(('gz', z_ins[s]))
+            if instruments.iloc[z_ins[s]]["instrument_duration_times_per_week"] == 2:
+                requested_classes[s].append(('gz2', z_ins[s]))
+
     course_priorization = []
     for idx, next_course_id in enumerate(course_continuity['next_course']):
         if next_course_id > 0:
             course_priorization.append(idx)
- 
-    # Remove all zero variables from dictionaries
-    for key in remove_gx:
-        if key in gx:
-            del gx[key]
-    for key in remove_gx2:
-        if key in gx2:
-            del gx2[key]
-    for key in remove_gy:
-        if key in gy:
-            del gy[key]
-    for key in remove_gy2:
-        if key in gy2:
-            del gy2[key]
-    for key in remove_gz:
-        if key in gz:
-            del gz[key]
-    for key in remove_gz2:
-        if key in gz2:
-            del gz2[key]
-
-    print(f'REMOVE GX {remove_gx}')
-    print('XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX')
-    print(f'REMOVE GX2 {remove_gx2}')
-    print('XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX')
-    print(f'REMOVE GY {remove_gy}')
-    print('XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX')
-    print(f'REMOVE GY2 {remove_gy2}')
-
-    return model, gx, gx2, gy, gy2, gz, gz2, y_ins, z_ins, continuity, course_priorization
-
-def student_class_duration(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, student_availability, teacher_availability, courses, instruments, num_students, num_courses, num_slots, num_instruments):
-    st_valid_starting_slots = precompute_starting_slots(student_availability, num_slots, num_courses, num_instruments, courses, instruments)
-    tch_valid_starting_slots = precompute_starting_slots(teacher_availability, num_slots, num_courses, num_instruments, courses, instruments)
-
-    remove_gx, remove_gx2 = [], []
-    remove_gy, remove_gy2, remove_gz, remove_gz2 = [], [], [], []
+
+    return y_ins, z_ins, continuity, course_priorization, requested_classes
+
+def student_class_duration(student_availability, teacher_availability, courses, instruments, num_courses, grid, num_instruments):
+    ''' Function used for determining the valid starting time slots of every class for both students and teachers (availability for the
+    whole duration of the class, within a single day). '''
+    st_valid_starting_slots = precompute_starting_slots(student_availability, grid, num_courses, num_instruments, courses, instruments)
+    tch_valid_starting_slots = precompute_starting_slots(teacher_availability, grid, num_courses, num_instruments, courses, instruments)
+
+    return st_valid_starting_slots, tch_valid_starting_slots
+
+def teacher_qualifications(teacher_info, courses, instruments, num_teachers, num_courses, num_instruments):
+    ''' Function used for determining which teachers can teach each course and instrument, according to the binary course and instrument
+    columns of teacher_info. Classes without a matching column can be taught by any teacher. '''
+    qualified_teachers = {}
+
+    for family, classes, num_classes in (('course', courses, num_courses), ('instrument', instruments, num_instruments)):
+        for k in range(num_classes):
+            column_name = f'{family}_{classes.iloc[k][f"{family}_id"]}'
+            if column_name in teacher_info.columns:
+                qualified_teachers[family, k] = [e for e in range(num_teachers) if teacher_info.iloc[e][column_name] == 1]
+            else:
+                qualified_teachers[family, k] = list(range(num_teachers))
+
+    return qualified_teachers
+
+def features(courses, instruments, rooms, num_rooms, num_courses, num_instruments):
+    ''' Function used for determining which rooms have every feature each course and instrument needs. '''
+    feature_cols = [601, 602, 603, 604, 605, 606, 607, 608, 609]  # integers, not strings
+
+    feature_rooms = {}
+
+    for family, classes, num_classes in (('course', courses, num_courses), ('instrument', instruments, num_instruments)):
+        for k in range(num_classes):
+            needed_features = [feature for feature in feature_cols if classes.iloc[k][feature] == 1]  # Binary: 1 if class requires feature
+            feature_rooms[family, k] = [
+                r for r in range(num_rooms)
+                if all(rooms.iloc[r][feature] == 1 for feature in needed_features)  # Binary: 1 if room has the feature, 0 if not
+            ]
+
+    return feature_rooms
+
+def joint_starting_slots(st_valid_starting_slots, tch_valid_starting_slots):
+    ''' Function used for combining the student and teacher starting slots into one boolean [student, teacher, class, time slot]
+    array per family: a class can only start when both are available for its whole duration. '''
+    return {
+        family: st_valid_starting_slots[family][:, None, :, :] & tch_valid_starting_slots[family][None, :, :, :]
+        for family in st_valid_starting_slots
+    }
+
+def variable_domain(num_students, requested_classes, st_valid_starting_slots, tch_valid_starting_slots, qualified_teachers, feature_rooms):
+    ''' Function used for combining all of the above into the allowed (s, e, r, c/i, t) tuples of every class type: the student's
+    requested course or instrument, a qualified teacher, a room with the required features and a starting slot that is valid for the
+    whole duration of the class for both the student and the teacher. '''
+    joint_valid_starting_slots = joint_starting_slots(st_valid_starting_slots, tch_valid_starting_slots)
+    domain = {}
 
     for s in range(num_students):
-        for e in range(num_teachers):
-            for r in range(num_rooms):
-                for c in range(num_courses):
-                    for t in range(num_slots):
-                        if t not in st_valid_starting_slots[s].get(f'course_{c}', []) or t not in tch_valid_starting_slots[e].get(f'course_{c}', []):
-                            if (s, e, r, c, t) in gx:
-                                model.Add(gx[s, e, r, c, t] == 0)
-                                remove_gx.append((s, e, r, c, t))
-                            if (s, e, r, c, t) in gx2:
-                                model.Add(gx2[s, e, r, c, t] == 0)
-                                remove_gx2.append((s, e, r, c, t))
-
-                for i in range(num_instruments):
-                    for t in range(num_slots):
-                        if t not in st_valid_starting_slots[s].get(f'instrument_{i}', []) or t not in tch_valid_starting_slots[e].get(f'instrument_{i}', []):
-                            if (s, e, r, i, t) in gz:
-                                model.Add(gz[s, e, r, i, t] == 0)
-                                remove_gz.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gz2:
-                                model.Add(gz2[s, e, r, i, t] == 0)
-                                remove_gz2.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gy:
-                                model.Add(gy[s, e, r, i, t] == 0)
-                                remove_gy.append((s, e, r, i, t))
-                            if (s, e, r, i, t) in gy2:
-                                model.Add(gy2[s, e, r, i, t] == 0)
-                                remove_gy2.append((s, e, r, i, t))
-    
-    # Remove all zero variables from dictionaries
-    for key in remove_gx:
-        if key in gx:
-            del gx[key]
-    for key in remove_gx2:
-        if key in gx2:
-            del gx2[key]
-    for key in remove_gy:
-        if key in gy:
-            del gy[key]
-    for key in remove_gy2:
-        if key in gy2:
-            del gy2[key]
-    for key in remove_gz:
-        if key in gz:
-            del gz[key]
-    for key in remove_gz2:
-        if key in gz2:
-            del gz2[key]
-
-    return model, gx, gx2, gy, gy2, gz, gz2, st_valid_starting_slots, tch_valid_starting_slots
-
-def single_class_type(model, gx, gx2, gy, gy2, gz, gz2, priorities, student_availability, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_slots, num_instruments, y_ins, z_ins, continuity, course_priorization):
+        for kind, k in requested_classes[s]:
+            family = FAMILY[kind]
+
+            for e in qualified_teachers[family, k]:
+                for t in np.flatnonzero(joint_valid_starting_slots[family][s, e, k]):
+                    for r in feature_rooms[family, k]:
+                        domain.setdefault(kind, []).append((s, e, r, k, int(t)))
+
+    return domain
+
+
+# |||||||||| CONSTRAINTS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def initialize_variables(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, num_courses, num_instruments, domain, grid):
+    ''' Function used for creating the decision variables, only for the tuples of the precomputed variable domain. Every created literal
+    is stored in the variable registry, whose secondary indexes are then used by all the constraints and the objective function instead
+    of scanning the full s x e x r x c/i x t grid. '''
+
+    course_durations = [grid.slots(courses.iloc[c]["course_duration_minutes_per_session"]) for c in range(num_courses)]
+    instrument_durations = [grid.slots(instruments.iloc[i]["instrument_duration_minutes_per_session"]) for i in range(num_instruments)]
+    registry = VariableRegistry(gx, gx2, gy, gy2, gz, gz2, course_durations, instrument_durations, grid)
+
+    for kind in ALL_KINDS:
+        for key in domain.get(kind, []):
+            registry.add(model, kind, key)
+
+    print(f'Created {len(registry)} class variables')
+
+    return model, gx, gx2, gy, gy2, gz, gz2, registry
+
+def class_sessions(model, gx, gx2, gy, gy2, gz, gz2, registry, courses, instruments):
+    ''' Function used for creating the session layer of the model. A session (class) opens at a given teacher, room, course or
+    instrument and starting time slot, and students can only join (membership variables gx, gx2, gy, gy2, gz, gz2) sessions that are
+    open. Gating the memberships with sum(members) <= capacity * session both links the two layers and bounds the class capacity, so
+    teacher and room exclusivity only need to be stated once per session instead of once per student. '''
+    for session in registry.session_keys():
+        family, e, r, k, t = session
+        classes = courses if family == 'course' else instruments
+        max_students = int(classes.iloc[k][f"{family}_capacity"])
+
+        session_var = registry.add_session(model, session)
+        members = [var for _, _, var in registry.session_members(session)]
+
+        # Students can only join open sessions, and sessions cannot take more students than the class capacity
+        model.Add(sum(members) <= max_students * session_var)
+        # Sessions without students are not opened
+        model.AddBoolOr(members).OnlyEnforceIf(session_var)
+
+    print(f'Created {len(registry.sessions)} class sessions')
+
+    return model, gx, gx2, gy, gy2, gz, gz2
+
+def single_class_type(model, gx, gx2, gy, gy2, gz, gz2, registry, priorities, student_availability, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_slots, num_instruments, y_ins, z_ins, continuity, course_priorization):
     # Ensure each student attends up to one course and one instrument (up to one class type per student)
 
     for s in range(num_students):
         student_id = student_availability.index[s]
 
+        # All the variables of the student, per class type
+        assigned = {kind: sum(var for _, _, var in registry.student(s, (kind,))) for kind in ALL_KINDS}
+
         # Extract instrument id for the given student
         if s in y_ins:
             i_s = y_ins[s]
@@ -529,92 +457,41 @@ def single_class_type(model, gx, gx2, gy, gy2, gz, gz2, priorities, student_avai
 
         if continuity[s] == 1:
             # If continuity[s] == 1 we must schedule the first-option instrument (gy/gy2)
-            model.Add(sum(gy[s, e, r, i, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for i in range(num_instruments) 
-                        for t in range(num_slots) if (s, e, r, i, t) in gy) == 1)
+            model.Add(assigned['gy'] == 1)
 
             for i in range(num_instruments):
                 if i_s == i: 
                     if instruments.iloc[i]["instrument_duration_times_per_week"] == 2:
                         # The requested instrument is biweekly
-                        model.Add(sum(gy2[s, e, r, i, t] for e in range(num_teachers) 
-                                    for r in range(num_rooms) 
-                                    for i in range(num_instruments) 
-                                    for t in range(num_slots) if (s, e, r, i, t) in gy2) == 1)
+                        model.Add(assigned['gy2'] == 1)
                     else:
                         # The requested instrument is not biweekly
-                        model.Add(sum(gy2[s, e, r, i, t] for e in range(num_teachers) 
-                                    for r in range(num_rooms) 
-                                    for i in range(num_instruments) 
-                                    for t in range(num_slots) if (s, e, r, i, t) in gy2) == 0)
+                        model.Add(assigned['gy2'] == 0)
 
         else:
-            model.Add(sum(gy[s, e, r, i, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for i in range(num_instruments) 
-                        for t in range(num_slots) if (s, e, r, i, t) in gy) <= 1)
-
-            model.Add(sum(gy2[s, e, r, i, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for i in range(num_instruments) 
-                        for t in range(num_slots) if (s, e, r, i, t) in gy2) <= 1)
-
-            model.Add(sum(gz[s, e, r, i, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for i in range(num_instruments) 
-                        for t in range(num_slots) if (s, e, r, i, t) in gz) <= 1)
-
-            model.Add(sum(gz2[s, e, r, i, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for i in range(num_instruments) 
-                        for t in range(num_slots) if (s, e, r, i, t) in gz2) <= 1)
+            model.Add(assigned['gy'] <= 1)
+            model.Add(assigned['gy2'] <= 1)
+            model.Add(assigned['gz'] <= 1)
+            model.Add(assigned['gz2'] <= 1)
             
             for i in range(num_instruments):
                 if i_s == i: 
                     if instruments.iloc[i]["instrument_duration_times_per_week"] == 2:
                         # The requested instrument is biweekly
-                        model.Add(
-                            sum(gy[s, e, r, i, t] for e in range(num_teachers)
-                                                for r in range(num_rooms)
-                                                for i in range(num_instruments)
-                                                for t in range(num_slots) if (s, e, r, i, t) in gy) 
-                            == sum(gy2[s, e, r, i, t] for e in range(num_teachers)
-                                                    for r in range(num_rooms)
-                                                    for i in range(num_instruments)
-                                                    for t in range(num_slots) if (s, e, r, i, t) in gy2)
-                        )
+                        model.Add(assigned['gy'] == assigned['gy2'])
                     else:
                         # The requested instrument is not biweekly
-                        model.Add(sum(gy2[s, e, r, i, t] for e in range(num_teachers) 
-                                    for r in range(num_rooms) 
-                                    for i in range(num_instruments) 
-                                    for t in range(num_slots) if (s, e, r, i, t) in gy2) == 0)
+                        model.Add(assigned['gy2'] == 0)
                 if i_z == i: 
                     if instruments.iloc[i]["instrument_duration_times_per_week"] == 2:
                         # The requested instrument is biweekly
-                        model.Add(
-                            sum(gz[s, e, r, i, t] for e in range(num_teachers)
-                                                for r in range(num_rooms)
-                                                for i in range(num_instruments)
-                                                for t in range(num_slots) if (s, e, r, i, t) in gz) 
-                            == sum(gz2[s, e, r, i, t] for e in range(num_teachers)
-                                                    for r in range(num_rooms)
-                                                    for i in range(num_instruments)
-                                                    for t in range(num_slots) if (s, e, r, i, t) in gz2)
-                        )
+                        model.Add(assigned['gz'] == assigned['gz2'])
                     else:
                         # The requested instrument is not biweekly
-                        model.Add(sum(gz2[s, e, r, i, t] for e in range(num_teachers) 
-                                    for r in range(num_rooms) 
-                                    for i in range(num_instruments) 
-                                    for t in range(num_slots) if (s, e, r, i, t) in gz2) == 0)
+                        model.Add(assigned['gz2'] == 0)
 
         if s in course_priorization:
-            model.Add(sum(gx[s, e, r, c, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for c in range(num_courses) 
-                        for t in range(num_slots) if (s, e, r, c, t) in gx) == 1)
+            model.Add(assigned['gx'] == 1)
 
             for c in range(num_courses):
                 column_name = f'course_{courses.index[c]}'
@@ -623,27 +500,14 @@ def single_class_type(model, gx, gx2, gy, gy2, gz, gz2, priorities, student_avai
                         # The student requested the course
                         if courses.iloc[c]["course_duration_times_per_week"] == 2:
                             # The requested course is biweekly
-                            model.Add(sum(gx2[s, e, r, c, t] for e in range(num_teachers) 
-                                        for r in range(num_rooms) 
-                                        for c in range(num_courses) 
-                                        for t in range(num_slots) if (s, e, r, c, t) in gx2) == 1)
+                            model.Add(assigned['gx2'] == 1)
                         else:
                             # The requested course is not biweekly
-                            model.Add(sum(gx2[s, e, r, c, t] for e in range(num_teachers) 
-                                        for r in range(num_rooms) 
-                                        for c in range(num_courses) 
-                                        for t in range(num_slots) if (s, e, r, c, t) in gx2) == 0)
+                            model.Add(assigned['gx2'] == 0)
 
         else:
-            model.Add(sum(gx[s, e, r, c, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for c in range(num_courses) 
-                        for t in range(num_slots) if (s, e, r, c, t) in gx) <= 1)
-
-            model.Add(sum(gx2[s, e, r, c, t] for e in range(num_teachers) 
-                        for r in range(num_rooms) 
-                        for c in range(num_courses) 
-                        for t in range(num_slots) if (s, e, r, c, t) in gx2) <= 1)
+            model.Add(assigned['gx'] <= 1)
+            model.Add(assigned['gx2'] <= 1)
             
             for c in range(num_courses):
                 column_name = f'course_{courses.index[c]}'
@@ -652,400 +516,141 @@ def single_class_type(model, gx, gx2, gy, gy2, gz, gz2, priorities, student_avai
                         # The student requested the course
                         if courses.iloc[c]["course_duration_times_per_week"] == 2:
                             # The requested course is biweekly, either both classes are scheduled or none of the two
-                            model.Add(
-                                sum(gx2[s, e, r, c, t] for e in range(num_teachers) 
-                                            for r in range(num_rooms) 
-                                            for c in range(num_courses) 
-                                            for t in range(num_slots) if (s, e, r, c, t) in gx2) 
-                                == sum(gx[s, e, r, c, t] for e in range(num_teachers) 
-                                            for r in range(num_rooms) 
-                                            for c in range(num_courses) 
-                                            for t in range(num_slots) if (s, e, r, c, t) in gx)
-                            )
+                            model.Add(assigned['gx2'] == assigned['gx'])
                         else:
                             # The requested course is not biweekly
-                            model.Add(sum(gx2[s, e, r, c, t] for e in range(num_teachers) 
-                                        for r in range(num_rooms) 
-                                        for c in range(num_courses) 
-                                        for t in range(num_slots) if (s, e, r, c, t) in gx2) == 0)
+                            model.Add(assigned['gx2'] == 0)
 
     return model, gx, gx2, gy, gy2, gz, gz2
 
 
-def priority_assignment(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots):
+def priority_assignment(model, gx, gx2, gy, gy2, gz, gz2, registry, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots):
     for s in range(num_students):
         # Helper variable to indicate whether student s has a high-priority (y) assignment
         has_y = model.NewBoolVar(f"has_y_s{s}")
         # Helper variable to indicate whether student s has a low-priority (z) assignment
         has_z = model.NewBoolVar(f"has_z_s{s}")
 
+        assigned_y = sum(var for _, _, var in registry.student(s, ('gy',)))
+        assigned_z = sum(var for _, _, var in registry.student(s, ('gz',)))
+
         # Define whether the student has been assigned a high-priority (y) instrument
-        model.Add(sum(gy[s, e, r, i, t] for e in range(num_teachers)
-                                        for r in range(num_rooms)
-                                        for i in range(num_instruments)
-                                        for t in range(num_slots) if (s, e, r, i, t) in gy) > 0).OnlyEnforceIf(has_y)
-        model.Add(sum(gy[s, e, r, i, t] for e in range(num_teachers)
-                                        for r in range(num_rooms)
-                                        for i in range(num_instruments)
-                                        for t in range(num_slots) if (s, e, r, i, t) in gy) == 0).OnlyEnforceIf(has_y.Not())
+        model.Add(assigned_y > 0).OnlyEnforceIf(has_y)
+        model.Add(assigned_y == 0).OnlyEnforceIf(has_y.Not())
 
         # Define whether the student has been assigned a low-priority (z) instrument
-        model.Add(sum(gz[s, e, r, i, t] for e in range(num_teachers)
-                                        for r in range(num_rooms)
-                                        for i in range(num_instruments)
-                                        for t in range(num_slots) if (s, e, r, i, t) in gz) > 0).OnlyEnforceIf(has_z)
-        model.Add(sum(gz[s, e, r, i, t] for e in range(num_teachers)
-                                        for r in range(num_rooms)
-                                        for i in range(num_instruments)
-                                        for t in range(num_slots) if (s, e, r, i, t) in gz) == 0).OnlyEnforceIf(has_z.Not())
+        model.Add(assigned_z > 0).OnlyEnforceIf(has_z)
+        model.Add(assigned_z == 0).OnlyEnforceIf(has_z.Not())
 
         # If any y/y2 is assigned, then z/z2 must not be assigned, and vice versa
         model.Add(has_y + has_z <= 1)
 
     return model, gx, gx2, gy, gy2, gz, gz2
 
-def student_overlaps(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots):
+def student_overlaps(model, gx, gx2, gy, gy2, gz, gz2, registry, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots):
     # Prevent overlapping time slots for students, teachers, and rooms
 
-    # Define the time slot ranges for each day
-    day_slot_ranges = {
-        0: range(0, 20),    # Monday
-        1: range(20, 40),   # Tuesday
-        2: range(40, 60),   # Wednesday
-        3: range(60, 80),   # Thursday
-        4: range(80, 99),   # Friday 
-        # For some reason 100 reaises keyError while 99 works fine, no class is ever going to be ever assigned to t = 100 anyways
-    }
-
-    for s in range(num_students):  # Iterate over all possible start times
+    for s in range(num_students):
+        # Every class assigned to the student occupies all time slots from its start until its duration runs out
+        student_classes = {}
+        for kind, key, var in registry.student(s):
+            t_start = key[4]
+            for t in range(t_start, min(t_start + registry.duration(kind, key[3]), num_slots)):
+                student_classes.setdefault(t, []).append(var)
 
-        # Student overlaps (already implemented)
-        for t in range(num_slots):
-            student_classes = []
+        for t in sorted(student_classes):
+            model.Add(sum(student_classes[t]) <= 1)
 
-            # Course scheduling
-            for c in range(num_courses):
-                duration = int(courses.iloc[c]["course_duration_minutes_per_session"] / 15)
-                for overlap in range(duration):
-                    if t - overlap >= 0:
-                        student_classes.extend([
-                            gx[s, e, r, c, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, c, t - overlap) in gx
-                        ])
-                        student_classes.extend([
-                            gx2[s, e, r, c, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, c, t - overlap) in gx2
-                        ])
-
-            # Instrument scheduling
-            for i in range(num_instruments):
-                duration = int(instruments.iloc[i]["instrument_duration_minutes_per_session"] / 15)
-                for overlap in range(duration):
-                    if t - overlap >= 0:
-                        student_classes.extend([
-                            gy[s, e, r, i, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t - overlap) in gy
-                        ])
-                        student_classes.extend([
-                            gy2[s, e, r, i, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t - overlap) in gy2
-                        ])
-                        student_classes.extend([
-                            gz[s, e, r, i, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t - overlap) in gz
-                        ])
-                        student_classes.extend([
-                            gz2[s, e, r, i, t - overlap]
-                            for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t - overlap) in gz2
-                        ])
-
-            if student_classes:
-                model.Add(sum(student_classes) <= 1)
-
-    # up until this point we ensured students are not scheduled to overlapping classes
+    # up until this point we ensured students are not scheduled to overlapping classes, which also covers every room-teacher-time slot
+    # combination of a single student (those were previously stated as separate, redundant constraints)
 
     # now its time to ensure the same for rooms and teachers
-
-    # while ensuring one single room is scheduled for each class (class = unique room - time slot combination)
+    # while ensuring one single room is scheduled for each class (class = unique teacher - room - time slot combination)
     # as well as making sure an unlimited number of students can be scheduled to any given class
 
-    for s in range(num_students):
-        # we treat students separately to allow multilpe students per class
-        # basically, the same teacher-room-time slot constraints are applied separately to each student
-        # thus ensuring we can limit the number of overlapping combinations without including the number of students
-
-        for t in range(num_slots):
-            for r in range(num_rooms):
-                for e in range(num_teachers):
-                    # for each room-teacher-time slot combination for the given student
-
-                    room_teacher_classes = []
-
-                    for c in range(num_courses):
-                        duration = int(courses.iloc[c]["course_duration_minutes_per_session"] / 15)
-                        for overlap in range(duration):
-                            if t - overlap >= 0:
-                                if (s, e, r, c, t - overlap) in gx:
-                                    room_teacher_classes.append(gx[s, e, r, c, t - overlap])
-                                if (s, e, r, c, t - overlap) in gx2:
-                                    room_teacher_classes.append(gx2[s, e, r, c, t - overlap])
-
-                    for i in range(num_instruments):
-                        duration = int(instruments.iloc[i]["instrument_duration_minutes_per_session"] / 15)
-                        for overlap in range(duration):
-                            if t - overlap >= 0:
-                                if (s, e, r, i, t - overlap) in gy:
-                                    room_teacher_classes.append(gy[s, e, r, i, t - overlap])
-                                if (s, e, r, i, t - overlap) in gy2:
-                                    room_teacher_classes.append(gy2[s, e, r, i, t - overlap])
-                                if (s, e, r, i, t - overlap) in gz:
-                                    room_teacher_classes.append(gz[s, e, r, i, t - overlap])
-                                if (s, e, r, i, t - overlap) in gz2:
-                                    room_teacher_classes.append(gz2[s, e, r, i, t - overlap])
-
-                    if room_teacher_classes: 
-                        model.Add(sum(room_teacher_classes) <= 1)
-
-                        # we are still inside a room-teacher-time slot combination for a given student
-                        # we ensure for that student-room-teacher-time slot combination gx, gx2, gy, gy2, gz, gz2 do not overlap
-
-                        # we are missing the constraint about different students overlapping at one given room-teacher-time slot combination
-                        model.Add(
-                            sum([
-                                gx[s, e, r, c, t] for c in range(num_courses) if (s, e, r, c, t) in gx
-                            ] + [
-                                gx2[s, e, r, c, t] for c in range(num_courses) if (s, e, r, c, t) in gx2
-                            ]) +
-                            sum([
-                                gy[s, e, r, i, t] for i in range(num_instruments) if (s, e, r, i, t) in gy
-                            ] + [
-                                gy2[s, e, r, i, t] for i in range(num_instruments) if (s, e, r, i, t) in gy2
-                            ] + [
-                                gz[s, e, r, i, t] for i in range(num_instruments) if (s, e, r, i, t) in gz
-                            ] + [
-                                gz2[s, e, r, i, t] for i in range(num_instruments) if (s, e, r, i, t) in gz2
-                            ])
-                            <= 1
-                        )
-
-    # Prevent teachers from being assigned to overlapping classes across different rooms/courses/instruments
-    for t in range(num_slots):
-        for e in range(num_teachers):
-            teacher_schedule = []  # Track all classes assigned to teacher e at time t: only one will be valid
-            
-            for r in range(num_rooms):
-                for c in range(num_courses):
-                    duration = int(courses.iloc[c]["course_duration_minutes_per_session"] / 15)
-                    
-                    for overlap in range(duration):  # Ensure full duration is checked
-                        if t - overlap >= 0:
-                            class_var = model.NewBoolVar(f"gx_{e}_{r}_{c}_{t - overlap}")
-                            model.Add(sum(
-                                gx[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gx[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-                            class_var = model.NewBoolVar(f"gx2_{e}_{r}_{c}_{t - overlap}")
-                            model.Add(sum(
-                                gx2[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gx2[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-                for i in range(num_instruments):
-                    duration = int(instruments.iloc[i]["instrument_duration_minutes_per_session"] / 15)
-
-                    for overlap in range(duration):  # Ensure full duration is checked
-                        if t - overlap >= 0:
-                            class_var = model.NewBoolVar(f"gy_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gy[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gy[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-                            class_var = model.NewBoolVar(f"gy2_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gy2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gy2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-                            class_var = model.NewBoolVar(f"gz_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gz[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gz[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-                            class_var = model.NewBoolVar(f"gz2_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gz2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gz2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-
-                            teacher_schedule.append(class_var)
-
-            # Ensure the teacher is not scheduled for overlapping classes across any room or subject
-            model.Add(sum(teacher_schedule) <= 1)
-
-    # Prevent rooms from being assigned to overlapping classes across different teachers/courses/instruments
-    for t in range(num_slots):
-        for r in range(num_rooms):
-            room_schedule = []  # Track all classes assigned to room r at time t: only one will be valid
-            
-            for e in range(num_teachers):
-                for c in range(num_courses):
-                    duration = int(courses.iloc[c]["course_duration_minutes_per_session"] / 15)
-                    
-                    for overlap in range(duration):
-                        if t - overlap >= 0:
-                            class_var = model.NewBoolVar(f"room_gx_{e}_{r}_{c}_{t - overlap}")
-                            model.Add(sum(
-                                gx[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gx[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                            
-                            class_var = model.NewBoolVar(f"room_gx2_{e}_{r}_{c}_{t - overlap}")
-                            model.Add(sum(
-                                gx2[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gx2[s, e, r, c, t - overlap] for s in range(num_students) if (s, e, r, c, t - overlap) in gx2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                
-                for i in range(num_instruments):
-                    duration = int(instruments.iloc[i]["instrument_duration_minutes_per_session"] / 15)
-                    
-                    for overlap in range(duration):
-                        if t - overlap >= 0:
-                            class_var = model.NewBoolVar(f"room_gy_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gy[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gy[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                            
-                            class_var = model.NewBoolVar(f"room_gy2_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gy2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gy2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gy2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                            
-                            class_var = model.NewBoolVar(f"room_gz_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gz[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gz[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                            
-                            class_var = model.NewBoolVar(f"room_gz2_{e}_{r}_{i}_{t - overlap}")
-                            model.Add(sum(
-                                gz2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz2
-                            ) > 0).OnlyEnforceIf(class_var)
-                            model.Add(sum(
-                                gz2[s, e, r, i, t - overlap] for s in range(num_students) if (s, e, r, i, t - overlap) in gz2
-                            ) == 0).OnlyEnforceIf(class_var.Not())
-                            room_schedule.append(class_var)
-                
-            # Ensure the room is not double-booked
-            model.Add(sum(room_schedule) <= 1)
+    # Sessions hold the teacher and the room, whatever the number of students that joined them
+    teacher_schedule = {}  # Track all classes assigned to teacher e at time t: only one will be valid
+    room_schedule = {}  # Track all classes assigned to room r at time t: only one will be valid
+    for session, session_var in registry.sessions.items():
+        family, e, r, k, t_start = session
+        for t in range(t_start, min(t_start + registry.session_duration(session), num_slots)):
+            teacher_schedule.setdefault((e, t), []).append(session_var)
+            room_schedule.setdefault((r, t), []).append(session_var)
+
+    # Ensure the teacher is not scheduled for overlapping classes across any room or subject
+    for classes in teacher_schedule.values():
+        model.Add(sum(classes) <= 1)
 
+    # Ensure the room is not double-booked
+    for classes in room_schedule.values():
+        model.Add(sum(classes) <= 1)
+
+    return model, gx, gx2, gy, gy2, gz, gz2
+
+def biweekly_same_day(model, gx, gx2, gy, gy2, gz, gz2, registry, courses, instruments, num_students, num_courses, num_instruments):
     # Prevent biweekly sessions from occurring on the same day
-    for s in range(num_students):
-        for c in range(num_courses):
-            if courses.iloc[c]["course_duration_times_per_week"] == 2:
-                for d in range(5):  # Iterate over days
-                    model.Add(
-                        sum(gx[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'course_{c}'] if t in day_slot_ranges[d] and (s, e, r, c, t) in gx and t in tch_valid_starting_slots[e][f'course_{c}']) +
-                        sum(gx2[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'course_{c}'] if t in day_slot_ranges[d] and (s, e, r, c, t) in gx2 and t in tch_valid_starting_slots[e][f'course_{c}'])
-                        <= 1
-                    )
-
-        for i in range(num_instruments):
-            if instruments.iloc[i]["instrument_duration_times_per_week"] == 2:
-                for d in range(5):  # Iterate over days
-                    model.Add(
-                        sum(gy[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'instrument_{i}'] if t in day_slot_ranges[d] and (s, e, r, i, t) in gy and t in tch_valid_starting_slots[e][f'instrument_{i}']) +
-                        sum(gy2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'instrument_{i}'] if t in day_slot_ranges[d] and (s, e, r, i, t) in gy2 and t in tch_valid_starting_slots[e][f'instrument_{i}'])
-                        <= 1
-                    )
+    biweekly = {
+        ('gx', 'gx2'): [c for c in range(num_courses) if courses.iloc[c]["course_duration_times_per_week"] == 2],
+        ('gy', 'gy2'): [i for i in range(num_instruments) if instruments.iloc[i]["instrument_duration_times_per_week"] == 2],
+        ('gz', 'gz2'): [i for i in range(num_instruments) if instruments.iloc[i]["instrument_duration_times_per_week"] == 2],
+    }
 
-                    model.Add(
-                        sum(gz[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'instrument_{i}'] if t in day_slot_ranges[d] and (s, e, r, i, t) in gz and t in tch_valid_starting_slots[e][f'instrument_{i}']) +
-                        sum(gz2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms)
-                            for t in st_valid_starting_slots[s][f'instrument_{i}'] if t in day_slot_ranges[d] and (s, e, r, i, t) in gz2 and t in tch_valid_starting_slots[e][f'instrument_{i}'])
-                        <= 1
-                    )
+    for s in range(num_students):
+        for d in range(registry.grid.num_days):  # Iterate over days
+            for kinds, biweekly_classes in biweekly.items():
+                for k in biweekly_classes:
+                    same_day = [var for _, key, var in registry.student_day(s, d, kinds) if key[3] == k]
+                    if same_day:
+                        model.Add(sum(same_day) <= 1)
 
     return model, gx, gx2, gy, gy2, gz, gz2
 
-def contract(model, gx, gx2, gy, gy2, gz, gz2, teacher_info, courses, instruments, num_teachers, num_courses, num_slots, num_instruments, num_students, num_rooms):
+def interval_overlaps(model, gx, gx2, gy, gy2, gz, gz2, registry, num_students, num_teachers, num_rooms):
+    ''' Interval engine counterpart of student_overlaps. Every membership and every session becomes an optional interval of fixed
+    size (its duration in time slots) that is only present when its literal is true, so there is no need to expand each class over the
+    time slots it covers by hand: student, teacher and room overlaps become one NoOverlap constraint each. '''
+    # Students can only attend one class at a time
+    for s in range(num_students):
+        student_intervals = [
+            model.NewOptionalFixedSizeIntervalVar(key[4], registry.duration(kind, key[3]), var, f'interval_{var.Name()}')
+            for kind, key, var in registry.student(s)
+        ]
+        if len(student_intervals) > 1:
+            model.AddNoOverlap(student_intervals)
+
+    # Sessions hold the teacher and the room, whatever the number of students that joined them
+    teacher_intervals = {}
+    room_intervals = {}
+    for session, session_var in registry.sessions.items():
+        family, e, r, k, t = session
+        session_interval = model.NewOptionalFixedSizeIntervalVar(t, registry.session_duration(session), session_var, f'interval_{session_var.Name()}')
+        teacher_intervals.setdefault(e, []).append(session_interval)
+        room_intervals.setdefault(r, []).append(session_interval)
+
+    # Ensure the teacher is not scheduled for overlapping classes across any room or subject
     for e in range(num_teachers):
-        teacher_info['contract'] = teacher_info['contract'].apply(safe_eval)
-        max_weekly_minutes = int(teacher_info.iloc[e]['contract'][0] / 15)
+        if len(teacher_intervals.get(e, [])) > 1:
+            model.AddNoOverlap(teacher_intervals[e])
 
-        total_teaching_minutes = []
+    # Ensure the room is not double-booked
+    for r in range(num_rooms):
+        if len(room_intervals.get(r, [])) > 1:
+            model.AddNoOverlap(room_intervals[r])
 
-        # Sum all courses assigned to this teacher
-        for c in range(num_courses):
-            duration = int(courses.iloc[c]["course_duration_minutes_per_session"] / 15)  # Convert to slot duration
-            
-            total_course_assignments = sum(
-                (gx[s, e, r, c, t] if (s, e, r, c, t) in gx else 0) +
-                (gx2[s, e, r, c, t] if (s, e, r, c, t) in gx2 else 0)
-                for s in range(num_students) for r in range(num_rooms) for t in range(num_slots)
-            )
+    return model, gx, gx2, gy, gy2, gz, gz2
 
-            total_teaching_minutes.append(total_course_assignments * duration)
+def contract(model, gx, gx2, gy, gy2, gz, gz2, registry, teacher_info, courses, instruments, num_teachers, num_courses, num_slots, num_instruments, num_students, num_rooms):
+    teacher_info['contract'] = teacher_info['contract'].apply(safe_eval)
 
-        # Sum all instruments assigned to this teacher
-        for i in range(num_instruments):
-            duration = int(instruments.iloc[i]["instrument_duration_minutes_per_session"] / 15)  # Convert to slot duration
-            
-            total_instrument_assignments = sum(
-                (gy[s, e, r, i, t] if (s, e, r, i, t) in gy else 0) +
-                (gy2[s, e, r, i, t] if (s, e, r, i, t) in gy2 else 0) +
-                (gz[s, e, r, i, t] if (s, e, r, i, t) in gz else 0) +
-                (gz2[s, e, r, i, t] if (s, e, r, i, t) in gz2 else 0)
-                for s in range(num_students) for r in range(num_rooms) for t in range(num_slots)
-            )
+    for e in range(num_teachers):
+        max_weekly_minutes = int(teacher_info.iloc[e]['contract'][0] / registry.grid.slot_minutes)
 
-            total_teaching_minutes.append(total_instrument_assignments * duration)
+        # Sum all classes (sessions) taught by this teacher, weighted by their duration in time slots
+        total_teaching_minutes = [
+            registry.session_duration(session) * session_var
+            for session, session_var in registry.sessions.items()
+            if session[1] == e
+        ]
 
         # Constraint: Total assigned minutes for teacher `e` ≤ max weekly minutes
         print(max_weekly_minutes)
@@ -1053,86 +658,12 @@ def contract(model, gx, gx2, gy, gy2, gz, gz2, teacher_info, courses, instrument
 
     return model, gx, gx2, gy, gy2, gz, gz2
 
-def features(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, rooms, num_rooms, num_courses, num_instruments, num_slots, num_students, num_teachers):
-    feature_cols = [601, 602, 603, 604, 605, 606, 607, 608, 609]  # integers, not strings
-
-    for r in range(num_rooms):
-        for feature in feature_cols:
-            room_has_feature = rooms.iloc[r][feature]  # Binary: 1 if room has the feature, 0 if not
-            
-            # Ensure all assigned courses match the room features
-            for c in range(num_courses):
-                course_needs_feature = courses.iloc[c][feature]  # Binary: 1 if course requires feature
-                if course_needs_feature == 1:
-                    for s in range(num_students):
-                        for e in range(num_teachers):
-                            for t in range(num_slots):
-                                if (s, e, r, c, t) in gx:
-                                    model.Add(gx[s, e, r, c, t] <= room_has_feature)
-                                if (s, e, r, c, t) in gx2:
-                                    model.Add(gx2[s, e, r, c, t] <= room_has_feature)
-
-            # Ensure all assigned instrument classes match the room features
-            for i in range(num_instruments):
-                instrument_needs_feature = instruments.iloc[i][feature]  # Binary: 1 if instrument requires feature
-                if instrument_needs_feature == 1:
-                    for s in range(num_students):
-                        for e in range(num_teachers):
-                            for t in range(num_slots):
-                                if (s, e, r, i, t) in gy:
-                                    model.Add(gy[s, e, r, i, t] <= room_has_feature)
-                                if (s, e, r, i, t) in gy2:
-                                    model.Add(gy2[s, e, r, i, t] <= room_has_feature)
-                                if (s, e, r, i, t) in gz:
-                                    model.Add(gz[s, e, r, i, t] <= room_has_feature)
-                                if (s, e, r, i, t) in gz2:
-                                    model.Add(gz2[s, e, r, i, t] <= room_has_feature)
-
-    return model, gx, gx2, gy, gy2, gz, gz2
-
-def class_capacity(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_instruments, num_slots):
-    ''' I have not tested throughly this constraint given that i am currently using an oversimplified test database to
-    minimize running time, hence why I cannnot guarantee the successful implementation of the class_capacity constraint. '''
-    # Ensure no course class exceeds its max student capacity
-    for c in range(num_courses):
-        max_students = int(courses.iloc[c]["course_capacity"])  # Get course capacity
-        
-        for t in range(num_slots):
-            model.Add(
-                sum(gx[s, e, r, c, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, c, t) in gx) +
-                sum(gx2[s, e, r, c, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, c, t) in gx2)
-                <= max_students
-            )
-
-    # Ensure no instrument class exceeds its max student capacity
-    for i in range(num_instruments):
-        max_students = int(instruments.iloc[i]["instrument_capacity"])  # Get instrument capacity
-        
-        for t in range(num_slots):
-            model.Add(
-                sum(gy[s, e, r, i, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t) in gy) +
-                sum(gy2[s, e, r, i, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t) in gy2) +
-                sum(gz[s, e, r, i, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t) in gz) +
-                sum(gz2[s, e, r, i, t] for s in range(num_students) for e in range(num_teachers) for r in range(num_rooms) if (s, e, r, i, t) in gz2)
-                <= max_students
-            )
-
-    return model, gx, gx2, gy, gy2, gz, gz2
-
-def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiquity, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms):
-    students_with_antiquity = antique_students(student_availability, antiquity)
+def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, registry, student_availability, antiquity, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms):
+    students_with_antiquity = antique_students(student_availability, antiquity, registry.grid)
     # antique_students should ONLY give a list of students with antiquity; i say this because antiquity has everyone,
     # but if someone has all 0 should not be included in antique_students so to not add an unavoidable day penalty
     print(students_with_antiquity)
-
-    # Define the time slot ranges for each day
-    day_slot_ranges = {
-        0: range(0, 20),    # Monday
-        1: range(20, 40),   # Tuesday
-        2: range(40, 60),   # Wednesday
-        3: range(60, 80),   # Thursday
-        4: range(80, 99),   # Friday  
-    }
+    antique_student_ids = list(students_with_antiquity.keys())
 
     first_class_time_var = {}
     deviation_var = {}
@@ -1144,32 +675,16 @@ def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiq
         if (row == 0).all():  # Check if all values in the row are 0
             continue
         else:
-            student_id = list(students_with_antiquity.keys())[s]
+            student_id = antique_student_ids[s]
             for d, start_t in students_with_antiquity[student_id]:
+                # All the classes of the student starting on day d
+                day_classes = registry.student_day(s, d)
+
                 if start_t == "none":
                     # Day mismatch penalty
                     day_penalties[(s, d)] = model.NewBoolVar(f'penalty_{s}_{d}')
                     
-                    scheduled_any = []
-                    for t in day_slot_ranges[d]:
-                        for c in range(num_courses):
-                            for e in range(num_teachers):
-                                for r in range(num_rooms):
-                                    if (s, e, r, c, t) in gx:
-                                        scheduled_any.append(gx.get((s, e, r, c, t), 0))
-                                    if (s, e, r, c, t) in gx2:
-                                        scheduled_any.append(gx2.get((s, e, r, c, t), 0))
-                        for i in range(num_instruments):
-                            for e in range(num_teachers):
-                                for r in range(num_rooms):
-                                    if (s, e, r, i, t) in gy:
-                                        scheduled_any.append(gy.get((s, e, r, i, t), 0))
-                                    if (s, e, r, i, t) in gy2:
-                                        scheduled_any.append(gy2.get((s, e, r, i, t), 0))
-                                    if (s, e, r, i, t) in gz:
-                                        scheduled_any.append(gz.get((s, e, r, i, t), 0))
-                                    if (s, e, r, i, t) in gz2:
-                                        scheduled_any.append(gz2.get((s, e, r, i, t), 0))
+                    scheduled_any = [var for _, _, var in day_classes]
 
                     # Penalize if any class is scheduled on this day
                     model.AddBoolOr(scheduled_any).OnlyEnforceIf(day_penalties[(s, d)])
@@ -1178,38 +693,16 @@ def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiq
                     model.Add(sum(scheduled_any) == 0).OnlyEnforceIf(day_penalties[(s, d)].Not())
                     
                 else:  # Time deviation penalty
-                    antique_time_index = antiquity.columns.get_loc(f'{["MON", "TUE", "WED", "THU", "FRI"][d]} {start_t}')
+                    antique_time_index = antiquity.columns.get_loc(f'{registry.grid.days[d]} {start_t}')
                     print(f'antique_time_index is {antique_time_index}')
 
                     deviation_penalties[(s, d)] = model.NewBoolVar(f'deviation_penalty_{s}_{d}')
 
                     # Find the earliest scheduled time slot
                     first_class_time_var = model.NewIntVar(0, num_slots - 1, f'first_class_time_{s}_{d}')
-                    
-                    scheduled_times = []
-                    
-                    for t in day_slot_ranges[d]:
-                        for c in range(num_courses):
-                            for e in range(num_teachers):
-                                for r in range(num_rooms):
-                                    if (s, e, r, c, t) in gx:
-                                        scheduled_times.append(t * gx[(s, e, r, c, t)])
-                                    if (s, e, r, c, t) in gx2:
-                                        scheduled_times.append(t * gx2[(s, e, r, c, t)])
-                        for i in range(num_instruments):
-                            for e in range(num_teachers):
-                                for r in range(num_rooms):
-                                    if (s, e, r, i, t) in gy:
-                                        scheduled_times.append(t * gy[(s, e, r, i, t)])
-                                    if (s, e, r, i, t) in gy2:
-                                        scheduled_times.append(t * gy2[(s, e, r, i, t)])
-                                    if (s, e, r, i, t) in gz:
-                                        scheduled_times.append(t * gz[(s, e, r, i, t)])
-                                    if (s, e, r, i, t) in gz2:
-                                        scheduled_times.append(t * gz2[(s, e, r, i, t)])
 
                     # Ensure first_class_time_var is set correctly
-                    if scheduled_times:
+                    if day_classes:
                         # Define a large value (upper bound for num_slots)
                         max_slot = num_slots - 1
 
@@ -1219,47 +712,13 @@ def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiq
                         # Use an auxiliary list that will be forced to contain only valid times
                         valid_times = []
 
-                        for t in day_slot_ranges[d]:
-                            for c in range(num_courses):
-                                for e in range(num_teachers):
-                                    for r in range(num_rooms):
-                                        if (s, e, r, c, t) in gx:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gx[(s, e, r, c, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gx[(s, e, r, c, t)].Not())
-
-                                        if (s, e, r, c, t) in gx2:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gx2[(s, e, r, c, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gx2[(s, e, r, c, t)].Not())
-
-                            for i in range(num_instruments):
-                                for e in range(num_teachers):
-                                    for r in range(num_rooms):
-                                        if (s, e, r, i, t) in gy:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gy[(s, e, r, i, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gy[(s, e, r, i, t)].Not())
-
-                                        if (s, e, r, i, t) in gy2:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gy2[(s, e, r, i, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gy2[(s, e, r, i, t)].Not())
-
-                                        if (s, e, r, i, t) in gz:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gz[(s, e, r, i, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gz[(s, e, r, i, t)].Not())
-
-                                        if (s, e, r, i, t) in gz2:
-                                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
-                                            model.Add(valid_times[-1] == t).OnlyEnforceIf(gz2[(s, e, r, i, t)])
-                                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(gz2[(s, e, r, i, t)].Not())
-
-                        if valid_times:
-                            model.AddMinEquality(first_class_time_var, valid_times)
-                        else:
-                            model.Add(first_class_time_var == max_slot)  # Default to max if no valid times exist
+                        for _, key, var in day_classes:
+                            t = key[4]
+                            valid_times.append(model.NewIntVar(0, max_slot, f'valid_time_{s}_{d}_{t}'))
+                            model.Add(valid_times[-1] == t).OnlyEnforceIf(var)
+                            model.Add(valid_times[-1] == max_slot).OnlyEnforceIf(var.Not())
+
+                        model.AddMinEquality(first_class_time_var, valid_times)
 
                         # Deviation calculations
                         deviation_var = model.NewIntVar(0, max_slot, f'deviation_{s}_{d}')
@@ -1275,60 +734,29 @@ def antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiq
     return model, gx, gx2, gy, gy2, gz, gz2, students_with_antiquity, day_penalties, deviation_penalties, first_class_time_var, deviation_var, students_with_antiquity
 
 
-def siblings_soft (model, gx, gx2, gy, gy2, gz, gz2, siblings_df, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms):
+def siblings_soft (model, gx, gx2, gy, gy2, gz, gz2, registry, siblings_df, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms):
     siblings = create_sibling_groups(siblings_df)
 
     # Initialize to avoid possible UnboundLocalError errors
     sibling_day_vars = []
     mismatch_vars = []
 
-    day_slot_ranges = {
-        0: range(0, 20),    # Monday
-        1: range(20, 40),   # Tuesday
-        2: range(40, 60),   # Wednesday
-        3: range(60, 80),   # Thursday
-        4: range(80, 99),   # Friday  
-    }
-
     sibling_day_penalties = {}
     
     for group in siblings:
         sibling_day_vars = {s: [] for s in group}
         
-        for d in range(5):  # Iterate over days
+        for d in range(registry.grid.num_days):  # Iterate over days
             for s in group:
                 has_class = model.NewBoolVar(f'sibling_{s}_day_{d}')
-                model.AddBoolOr([
-                    gx[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms) for c in range(num_courses) for t in day_slot_ranges[d] if (s, e, r, c, t) in gx
-                ] + [
-                    gx2[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms) for c in range(num_courses) for t in day_slot_ranges[d] if (s, e, r, c, t) in gx2
-                ] + [
-                    gy[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gy
-                ] + [
-                    gy2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gy2
-                ] + [
-                    gz[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gz
-                ] + [
-                    gz2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gz2
-                ]).OnlyEnforceIf(has_class)
-                model.Add(sum([
-                    gx[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms) for c in range(num_courses) for t in day_slot_ranges[d] if (s, e, r, c, t) in gx
-                ] + [
-                    gx2[s, e, r, c, t] for e in range(num_teachers) for r in range(num_rooms) for c in range(num_courses) for t in day_slot_ranges[d] if (s, e, r, c, t) in gx2
-                ] + [
-                    gy[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gy
-                ] + [
-                    gy2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gy2
-                ] + [
-                    gz[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gz
-                ] + [
-                    gz2[s, e, r, i, t] for e in range(num_teachers) for r in range(num_rooms) for i in range(num_instruments) for t in day_slot_ranges[d] if (s, e, r, i, t) in gz2
-                ]) == 0).OnlyEnforceIf(has_class.Not())
+                day_classes = [var for _, _, var in registry.student_day(s, d)]
+                model.AddBoolOr(day_classes).OnlyEnforceIf(has_class)
+                model.Add(sum(day_classes) == 0).OnlyEnforceIf(has_class.Not())
                 
                 sibling_day_vars[s].append(has_class)
         
         # Compute penalties for mismatched days
-        for d in range(5):
+        for d in range(registry.grid.num_days):
             mismatch_vars = []  # Store all mismatches for the day
             for i in range(len(group) - 1):
                 for j in range(i + 1, len(group)):
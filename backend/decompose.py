@@ -0,0 +1,215 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# ||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Decomposition |||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# create_model always builds one model for the whole school, even though many students never interact. With --decompose the instance
+# is first split along its interaction graph, where every student is linked to:
+#   - the teachers they could take a class with (the variable domain of create_model: requested class, qualification and a starting
+#     slot both of them are available at)
+#   - their siblings
+# Teachers and siblings are hard links (a contract spans every student of the teacher, a sibling penalty every student of the group), so
+# they always stay in one piece. Rooms are left out of the graph on purpose: they are shared by nearly everyone and would join the
+# whole school into one component, while two classes only clash over a room when they happen to overlap. The connected components are
+# packed into at most one cluster per search worker (balanced by number of class variables), and every cluster is built and solved as
+# its own CP-SAT model (create_model on the rows of its students and teachers) in a process pool.
+#
+# Reconciliation: the classes of every cluster are mapped back to the indexes of the whole model and hinted. Classes of different
+# clusters in the same room at overlapping slots are the only conflicts, so the students of those classes (and of any cluster without a
+# solution) are left free, and everybody else is frozen (see incremental.freeze_students). The whole model then only has to place the
+# students in conflict, and it falls back to a full solve if the frozen part does not fit (as incremental runs do). The clusters, their
+# solve times and the conflicts are reported as a "decomposition" progress event.
+#
+# The pool forks the run. Where processes can only be spawned (Windows), which would run model_appver.py again in every process, the
+# clusters are solved one after another in the run itself.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import ast
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+import constraints as cns
+from model_body_appver import create_model, SolutionPrinter
+from incremental import variables_by_student, freeze_students
+from registry import ALL_KINDS, FAMILY
+from time_grid import DEFAULT_GRID
+import progress
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+STUDENT_FRAMES = (0, 1, 2, 3, 9)  # student_availability, antiquity, priorities, siblings_df and course_continuity (create_model order)
+TEACHER_FRAMES = (4, 5)  # teacher_availability and teacher_info
+DURATION_COLUMNS = {"course": "course_duration_minutes_per_session", "instrument": "instrument_duration_minutes_per_session"}
+
+
+# |||||||||| INTERACTION GRAPH |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def instance_domain(frames, grid=DEFAULT_GRID):
+    ''' Variable domain of the whole instance, computed as create_model does before creating any variable. '''
+    student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity = frames
+    num_students, num_teachers = student_availability.shape[0], teacher_availability.shape[0]
+    num_courses, num_instruments, num_rooms = courses.shape[0], instruments.shape[0], rooms.shape[0]
+    *_, requested_classes = cns.continuity_and_priorization(priorities, course_continuity, student_availability, courses, instruments, num_students, num_courses)
+    st_valid_starting_slots, tch_valid_starting_slots = cns.student_class_duration(student_availability, teacher_availability, courses, instruments, num_courses, grid, num_instruments)
+    qualified_teachers = cns.teacher_qualifications(teacher_info, courses, instruments, num_teachers, num_courses, num_instruments)
+    feature_rooms = cns.features(courses, instruments, rooms, num_rooms, num_courses, num_instruments)
+    return cns.variable_domain(num_students, requested_classes, st_valid_starting_slots, tch_valid_starting_slots, qualified_teachers, feature_rooms)
+
+def interaction_components(domain, siblings_df):
+    ''' Connected components of the students, teachers and sibling links of an instance, as (students, teachers, class variables). '''
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    variables = defaultdict(int)
+    for keys in domain.values():
+        for s, e, r, k, t in keys:
+            union(("student", s), ("teacher", e))
+            variables[s] += 1
+
+    # Sibling lists hold student ids, rows are students in index order
+    student_index = {student_id: s for s, student_id in enumerate(siblings_df["student_id"])}
+    for s, siblings in enumerate(siblings_df["siblings"]):
+        if isinstance(siblings, str):
+            siblings = ast.literal_eval(siblings)
+        find(("student", s))
+        for sibling_id in siblings or []:
+            if sibling_id in student_index:
+                union(("student", s), ("student", student_index[sibling_id]))
+
+    components = defaultdict(lambda: ([], []))
+    for node in list(parent):
+        entity, index = node
+        components[find(node)][0 if entity == "student" else 1].append(index)
+    return [(sorted(students), sorted(teachers), sum(variables[s] for s in students))
+            for students, teachers in components.values() if students]
+
+def pack_clusters(components, num_clusters):
+    ''' Pack components into at most num_clusters clusters of about the same number of class variables (largest component first, into
+    the lightest cluster). Returns (students, teachers, class variables) of every non-empty cluster. '''
+    clusters = [([], [], 0) for _ in range(max(1, num_clusters))]
+    for students, teachers, variables in sorted(components, key=lambda component: -component[2]):
+        lightest = min(range(len(clusters)), key=lambda c: clusters[c][2])
+        cluster_students, cluster_teachers, cluster_variables = clusters[lightest]
+        clusters[lightest] = (cluster_students + students, cluster_teachers + teachers, cluster_variables + variables)
+    return [(sorted(students), sorted(teachers), variables) for students, teachers, variables in clusters if students]
+
+
+# |||||||||| CLUSTERS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def cluster_frames(frames, students, teachers):
+    ''' The create_model frames of a cluster: the rows of its students and teachers, renumbered from 0, and every course, instrument
+    and room. '''
+    frames = list(frames)
+    for position in STUDENT_FRAMES:
+        frames[position] = frames[position].iloc[students].reset_index(drop=True)
+    for position in TEACHER_FRAMES:
+        frames[position] = frames[position].iloc[teachers].reset_index(drop=True)
+    return frames
+
+def solve_cluster(frames, engine, grid, num_workers):
+    ''' Build and solve the model of a cluster. Returns the status, the objective, the wall time and the (kind, key) of every class
+    of the solution, with the indexes of the cluster. '''
+    model, gx, gx2, gy, gy2, gz, gz2 = create_model(*frames, engine=engine, grid=grid)[:7]
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = num_workers
+    status = solver.Solve(model, SolutionPrinter(gx, gx2, gy, gy2, gz, gz2))
+
+    classes, objective = [], None
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        objective = solver.ObjectiveValue()
+        variables = {'gx': gx, 'gx2': gx2, 'gy': gy, 'gy2': gy2, 'gz': gz, 'gz2': gz2}
+        classes = [(kind, key) for kind in ALL_KINDS for key, var in variables[kind].items() if solver.Value(var)]
+    return solver.StatusName(status), objective, round(solver.WallTime(), 3), classes
+
+def solve_clusters(frames, engine='grid', grid=DEFAULT_GRID, num_workers=8):
+    ''' Split an instance (the create_model frames) into clusters and solve them, in parallel where the platform can fork. Returns the
+    clusters as (students, teachers, status, objective, wall time) and the (kind, key) of every class of their solutions, with the
+    indexes of the whole instance, or None if the instance does not split. '''
+    components = interaction_components(instance_domain(frames, grid), frames[3])
+    clusters = pack_clusters(components, num_workers)
+    print(f"Decomposition: {len(components)} components in {len(clusters)} clusters of {[variables for *_, variables in clusters]} class variables")
+    if len(clusters) < 2:
+        print("The instance does not split, solving the whole model")
+        progress.emit('decomposition', components=len(components), clusters=len(clusters))
+        return None
+
+    processes = min(len(clusters), num_workers)
+    threads = max(1, num_workers // processes)  # CP-SAT workers of every cluster, within the CPU budget of the run
+    jobs = [(cluster_frames(frames, students, teachers), engine, grid, threads) for students, teachers, _ in clusters]
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Events are written by the run only: the forked processes drop their copy of the events file
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"), initializer=progress.open_events, initargs=(None,)) as pool:
+            results = list(pool.map(solve_cluster, *zip(*jobs)))
+    else:
+        results = [solve_cluster(*job) for job in jobs]
+
+    solved, classes = [], []
+    for (students, teachers, _), (status, objective, wall_time, cluster_classes) in zip(clusters, results):
+        solved.append((students, teachers, status, objective, wall_time))
+        # Back to the indexes of the whole instance: rooms, courses, instruments and slots are not renumbered
+        classes += [(kind, (students[s], teachers[e], r, k, t)) for kind, (s, e, r, k, t) in cluster_classes]
+    return {"components": len(components), "clusters": solved, "classes": classes}
+
+
+# |||||||||| RECONCILIATION ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def room_conflicts(decomposition, courses, instruments, grid=DEFAULT_GRID):
+    ''' Students of the classes of different clusters that use the same room at overlapping slots. '''
+    cluster_of = {s: c for c, (students, *_) in enumerate(decomposition["clusters"]) for s in students}
+    durations = {
+        "course": [grid.slots(minutes) for minutes in courses[DURATION_COLUMNS["course"]]],
+        "instrument": [grid.slots(minutes) for minutes in instruments[DURATION_COLUMNS["instrument"]]],
+    }
+
+    # Students of every session, and sessions of every cluster in every room and slot
+    sessions = defaultdict(set)
+    room_slots = defaultdict(lambda: defaultdict(set))
+    for kind, (s, e, r, k, t) in decomposition["classes"]:
+        family = FAMILY[kind]
+        session = (family, e, r, k, t)
+        sessions[session].add(s)
+        for slot in range(t, t + durations[family][k]):
+            room_slots[r, slot][cluster_of[s]].add(session)
+
+    conflicts = set()
+    for clusters in room_slots.values():
+        if len(clusters) > 1:
+            for cluster_sessions in clusters.values():
+                for session in cluster_sessions:
+                    conflicts |= sessions[session]
+    return conflicts
+
+def reconcile(model, gx, gx2, gy, gy2, gz, gz2, decomposition, courses, instruments, grid=DEFAULT_GRID):
+    ''' Hint the classes of the clusters on the whole model and freeze every student outside the room conflicts. Returns the hints
+    and the number of frozen variables. '''
+    variables = {'gx': gx, 'gx2': gx2, 'gy': gy, 'gy2': gy2, 'gz': gz, 'gz2': gz2}
+    solved = {s for students, _, status, *_ in decomposition["clusters"] if status in ("OPTIMAL", "FEASIBLE") for s in students}
+    student_variables = variables_by_student(gx, gx2, gy, gy2, gz, gz2)
+
+    # Every class variable of the students of solved clusters: 1 for their classes, 0 for the rest
+    hints = {var: 0 for s in solved for var in student_variables.get(s, [])}
+    for kind, key in decomposition["classes"]:
+        hints[variables[kind][key]] = 1
+
+    conflicts = room_conflicts(decomposition, courses, instruments, grid)
+    frozen_students = [s for s in solved if s not in conflicts and s in student_variables]
+    frozen_variables = freeze_students(model, frozen_students, student_variables, hints)
+
+    total = sum(len(student_vars) for student_vars in student_variables.values())
+    share = round(frozen_variables / total, 3) if total else None
+    clusters = [{"students": len(students), "teachers": len(teachers), "status": status, "objective": objective, "wall_time": wall_time}
+                for students, teachers, status, objective, wall_time in decomposition["clusters"]]
+    print(f"Clusters: {clusters}")
+    print(f"Room conflicts: {len(conflicts)} students. Frozen {len(frozen_students)} students, {frozen_variables} of {total} class variables ({share})")
+    progress.emit('decomposition', components=decomposition["components"], clusters=clusters, conflict_students=len(conflicts),
+                  frozen_students=len(frozen_students), frozen_variables=frozen_variables, variables=total, frozen_share=share)
+    return hints, frozen_variables
@@ -0,0 +1,128 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Response Formats |||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# The solution endpoints answer in the format asked for in the Accept header:
+#   text/csv                               CSV with a header row (the default, and what they always returned)
+#   application/json                       {"columns": [...], "rows": [[...], ...]}, the layout of the solution-bundle sections
+#   application/vnd.apache.arrow.stream    Arrow IPC stream, one record batch per batch of rows
+# Rows are encoded batch by batch as they come from a server side cursor, so a large solution is never held in memory as a whole.
+# pyarrow is optional: without it Arrow is not offered, and asking only for Arrow gets a 406.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import io
+import csv
+import json
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+# |||||||||| NEGOTIATION |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+CSV = "text/csv"
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+EXTENSIONS = {CSV: "csv", JSON: "json", ARROW: "arrow"}
+
+def supported_formats():
+    return [CSV, JSON, ARROW] if pa is not None else [CSV, JSON]
+
+def negotiate(accept, default=CSV):
+    ''' Format of the response for an Accept header: the supported media type with the highest q value (the first one listed on a
+    tie), the default for */* or no header at all, or None if none of the supported formats is acceptable. '''
+    if not accept or not accept.strip():
+        return default
+
+    ranges = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, position, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in supported_formats():
+            return media_type
+        if media_type == "*/*":
+            return default
+        if media_type == "text/*":
+            return CSV
+        if media_type == "application/*":
+            return JSON
+    return None
+
+
+# |||||||||| ENCODERS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# Arrow type of each Postgres type (by asyncpg type name). Anything else is sent as text.
+ARROW_TYPES = {
+    "int2": "int16", "int4": "int32", "int8": "int64",
+    "float4": "float32", "float8": "float64", "numeric": "float64",
+    "bool": "bool",
+    "text": "string", "varchar": "string", "bpchar": "string", "json": "string", "jsonb": "string",
+}
+
+def arrow_schema(columns):
+    return pa.schema([(name, getattr(pa, ARROW_TYPES.get(pg_type, "string"))()) for name, pg_type in columns])
+
+def arrow_value(value, arrow_type):
+    if value is None:
+        return None
+    if arrow_type == "string":
+        return value if isinstance(value, str) else str(value)
+    if arrow_type.startswith("float"):
+        return float(value)
+    return value
+
+def json_value(value):
+    ''' JSON encoding of the values json does not know: numeric columns as numbers, anything else (dates, times...) as text. '''
+    return float(value) if isinstance(value, Decimal) else str(value)
+
+async def encode(media_type, columns, batches):
+    ''' Body of a response in the given format, one chunk per batch of rows. columns are (name, Postgres type) pairs, and batches an
+    async iterator of lists of records. '''
+    names = [name for name, _ in columns]
+
+    if media_type == ARROW:
+        schema = arrow_schema(columns)
+        types = [ARROW_TYPES.get(pg_type, "string") for _, pg_type in columns]
+        sink = io.BytesIO()
+        writer = pa.ipc.new_stream(sink, schema)
+        async for batch in batches:
+            arrays = [pa.array([arrow_value(row[name], arrow_type) for row in batch], type=field.type)
+                      for name, arrow_type, field in zip(names, types, schema)]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        writer.close()
+        yield sink.getvalue()
+
+    elif media_type == JSON:
+        yield '{"columns":' + json.dumps(names, separators=(",", ":")) + ',"rows":['
+        first = True
+        async for batch in batches:
+            rows = ",".join(json.dumps([row[name] for name in names], separators=(",", ":"), default=json_value) for row in batch)
+            yield ("" if first else ",") + rows
+            first = False
+        yield "]}"
+
+    else:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(names)
+        async for batch in batches:
+            writer.writerows([row[name] for name in names] for row in batch)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
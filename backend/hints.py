@@ -0,0 +1,169 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Solver Hints ||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# A new run rarely starts from scratch: the term was often solved before with almost the same input, and most students took classes
+# last year at slots they will want again. Both are turned into CP-SAT hints ({variable: value}, see solve_model), so the search starts
+# next to a schedule that is already good instead of looking for one:
+#   solution    The classes of a saved solution (solution_assignments of its run). Its rows hold the indexes of that run, so they are
+#               translated to ids with the index mappings of the saved run and back to indexes with those of the current run: a student,
+#               teacher, room, course or instrument keeps its hint when others are added or removed. Every other class variable of a
+#               hinted student whose classes all hit is hinted to 0, so those students get a complete assignment.
+#   antiquity   Last year's classes of every student (see create_antiquity_starts): one variable of the same instrument (or of a
+#               course) starting at the same slot, for the students the saved solution did not hint.
+# Slots are hinted as they are, so a saved solution only helps runs on the same time grid. Hints never change the optimum, only where
+# the search starts. The share of the hints that land on a variable of the model is reported as a "hints" progress event, and the share
+# of hinted classes kept by the final schedule goes into the result event.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+from collections import defaultdict
+
+from db import connection
+from runs import TEMP_SOLUTION, solution_run, run_complete, same_grid
+from registry import COURSE_KINDS, INSTRUMENT_KINDS
+import progress
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+MAPPINGS = {  # Index mapping table and id column of every entity
+    "student": ("student_index_mapping", "student_id"),
+    "teacher": ("teacher_index_mapping", "teacher_id"),
+    "room": ("room_index_mapping", "room_id"),
+    "course": ("course_index_mapping", "course_id"),
+    "instrument": ("instrument_index_mapping", "instrument_id"),
+}
+FAMILY_KINDS = {"course": COURSE_KINDS, "instrument": INSTRUMENT_KINDS}  # In order of preference: weekly and first priority first
+CLASS_FAMILIES = {"Course": "course", "Instrument": "instrument"}  # Class names of solution_assignments, e.g. "Instrument 3"
+
+
+# |||||||||| MAPPINGS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def run_mappings(cursor, run_id):
+    ''' {entity: {index: (id, name)}} of every index mapping of a run. '''
+    mappings = {}
+    for entity, (table, column) in MAPPINGS.items():
+        cursor.execute(f"SELECT index, {column}, name FROM {table} WHERE run_id = %s", (run_id,))
+        mappings[entity] = {index: (entity_id, name) for index, entity_id, name in cursor.fetchall()}
+    return mappings
+
+def saved_assignments(cursor, run_id):
+    ''' (student, teacher, room, family, class, slot) of every class of a run, with ids instead of the indexes of that run. Rows whose
+    index is not in the mappings of the run come out with None. '''
+    mappings = run_mappings(cursor, run_id)
+    cursor.execute("""
+        SELECT student_id, teacher_id, room_id, class_name, start_time
+        FROM solution_assignments
+        WHERE run_id = %s
+    """, (run_id,))
+
+    def entity_id(entity, index):
+        return mappings[entity].get(index, (None, None))[0]
+
+    assignments = []
+    for s, e, r, class_name, t in cursor.fetchall():
+        label, _, k = (class_name or "").partition(" ")
+        family = CLASS_FAMILIES.get(label)
+        class_id = entity_id(family, int(k)) if family and k.isdigit() else None
+        assignments.append((entity_id("student", s), entity_id("teacher", e), entity_id("room", r), family, class_id, t))
+    return assignments
+
+
+# |||||||||| HINTS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def solution_hints(assignments, indexes, variables):
+    ''' Hints of the classes of a saved solution (as returned by saved_assignments) on the variables of the current model. indexes maps
+    every entity to {id: current index}. Returns the hints and the (rows, hits) counts. '''
+    hints, hinted_students, missed_students = {}, set(), set()
+    taken = set()  # (student, kind, class) already hinted: the second session of a class twice a week goes to gx2 (gy2, gz2)
+    hits = 0
+    for student_id, teacher_id, room_id, family, class_id, t in sorted(assignments, key=lambda row: row[-1]):
+        s, e, r = indexes["student"].get(student_id), indexes["teacher"].get(teacher_id), indexes["room"].get(room_id)
+        k = indexes[family].get(class_id) if family else None
+        if None in (s, e, r, k):
+            missed_students.add(s)
+            continue  # The student, teacher, room or class is not in the input anymore
+        key = (s, e, r, k, t)
+        kind = next((kind for kind in FAMILY_KINDS[family] if key in variables[kind] and (s, kind, k) not in taken), None)
+        if kind is None:
+            missed_students.add(s)
+            continue  # The class cannot be taken anymore (availability, qualifications or features changed)
+        hints[variables[kind][key]] = 1
+        taken.add((s, kind, k))
+        hinted_students.add(s)
+        hits += 1
+
+    # The rest of the classes of every student whose classes all hit are not taken. A student that lost a class is left free to
+    # take another one instead
+    complete_students = hinted_students - missed_students
+    for kind_variables in variables.values():
+        for (s, e, r, k, t), var in kind_variables.items():
+            if s in complete_students and var not in hints:
+                hints[var] = 0
+    return hints, (len(assignments), hits)
+
+def antiquity_hints(antiquity_starts, indexes, instrument_names, variables, skip_students=()):
+    ''' Hints of last year's classes (the antiquity_starts of preprocess_students): for every class and starting slot, the first
+    variable of the student of the same instrument (or of any course) starting at that slot. Returns the hints and the (rows, hits)
+    counts. '''
+    # Variables of every (student, family, slot), in order of preference
+    candidates = defaultdict(list)
+    for family, kinds in FAMILY_KINDS.items():
+        for kind in kinds:
+            for key, var in sorted(variables[kind].items()):
+                s, e, r, k, t = key
+                candidates[s, family, t].append((kind, k, var))
+
+    hints = {}
+    taken = set()  # (student, kind, class) already hinted, as in solution_hints
+    rows = hits = 0
+    for student_id, class_name, t in antiquity_starts[["student_id", "class", "start"]].itertuples(index=False):
+        s = indexes["student"].get(student_id)
+        if s is None or s in skip_students:
+            continue
+        rows += 1
+        i = instrument_names.get(class_name)
+        family = "instrument" if i is not None else "course"
+        match = next(((kind, k, var) for kind, k, var in candidates[s, family, t]
+                      if (family == "course" or k == i) and (s, kind, k) not in taken), None)
+        if match is not None:
+            kind, k, var = match
+            hints[var] = 1
+            taken.add((s, kind, k))
+            hits += 1
+    return hints, (rows, hits)
+
+def build_hints(user_id, run_id, gx, gx2, gy, gy2, gz, gz2, antiquity_starts=None, hint_solution=None):
+    ''' {variable: value} hints of the run run_id of the model: the classes of the saved solution hint_solution, if any (complete and
+    solved on the same time grid), and last year's classes of the other students, if antiquity_starts is given. The index mappings and
+    the time grid of the run must already be stored (see load_data and runs.set_run_grid). '''
+    variables = {"gx": gx, "gx2": gx2, "gy": gy, "gy2": gy2, "gz": gz, "gz2": gz2}
+    with connection() as conn:
+        cursor = conn.cursor()
+        current = run_mappings(cursor, run_id)
+        saved_run = solution_run(cursor, user_id, hint_solution) if hint_solution and hint_solution != TEMP_SOLUTION else None
+        if saved_run is not None and not run_complete(cursor, saved_run):
+            saved_run = None
+        elif saved_run is not None and not same_grid(cursor, saved_run, run_id):
+            print(f"Saved solution {hint_solution} was solved on another time grid, its classes are not hinted")
+            saved_run = None
+        assignments = saved_assignments(cursor, saved_run) if saved_run is not None else []
+        cursor.close()
+    indexes = {entity: {entity_id: index for index, (entity_id, _) in mapping.items()} for entity, mapping in current.items()}
+
+    hints = {}
+    if hint_solution:
+        hints, (rows, hits) = solution_hints(assignments, indexes, variables)
+        report_hints("solution", rows, hits, solution_id=hint_solution)
+
+    if antiquity_starts is not None:
+        hinted_students = {s for kind in variables.values() for (s, *_), var in kind.items() if var in hints}
+        instrument_names = {name.lower(): index for index, (_, name) in current["instrument"].items() if name}
+        extra, (rows, hits) = antiquity_hints(antiquity_starts, indexes, instrument_names, variables, hinted_students)
+        report_hints("antiquity", rows, hits)
+        hints.update({var: value for var, value in extra.items() if var not in hints})
+
+    return hints
+
+def report_hints(source, rows, hits, **fields):
+    rate = round(hits / rows, 3) if rows else None
+    print(f"Hints from {source}: {hits} of {rows} rows hit a variable of the model (rate {rate})")
+    progress.emit('hints', source=source, rows=rows, hits=hits, rate=rate, **fields)
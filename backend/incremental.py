@@ -0,0 +1,175 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# ||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Incremental Runs ||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# A mid-term roster tweak (three new students, one teacher with new hours) should not reschedule the whole school. With a reference
+# solution, the input of the run is compared with the input of the reference run, entity by entity (by id), and every student,
+# teacher, room, course and instrument comes out unchanged, modified, added or removed. Only the neighbourhood of the changes is
+# solved again:
+#   - added and modified students
+#   - the students of every class of a modified or removed teacher, room, course or instrument, and the classmates of removed students
+#   - the classmates (same class, teacher, room and starting slot) and the siblings of all of the above
+# Every other student keeps the classes of the reference solution: their class variables are fixed to the solution hints (see
+# hints.py), provided all of their classes are still in the model. Students without any class in the reference are left free too.
+# Added teachers, rooms, courses and instruments are only used by the students that are solved again.
+# The time slots of the reference only mean the same times on the same time grid: a reference solved on another grid freezes nothing.
+#
+# The fixes hold under an assumption literal, so if the frozen part turns out to be infeasible, model.ClearAssumptions() brings back
+# the whole model and the run is solved from scratch (with the hints). The share of the model that was frozen is reported as an
+# "incremental" progress event.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import json
+from collections import defaultdict
+
+from db import connection
+from runs import solution_run, run_complete, same_grid
+from load_input import INPUT_TABLES
+from hints import run_mappings, saved_assignments
+import progress
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+STATES = ("unchanged", "modified", "added", "removed")
+CLASS_TABLES = {"course": "courses", "instrument": "instruments"}  # Input table of every class family
+
+
+# |||||||||| DIFF |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def run_inputs(cursor, run_id):
+    ''' {table: {id: row}} of the input tables of a run, every row as a dict of its columns. '''
+    inputs = {}
+    for table_name, (id_column, columns) in INPUT_TABLES.items():
+        cursor.execute(f"SELECT {id_column}, {', '.join(columns)} FROM {table_name} WHERE run_id = %s", (run_id,))
+        inputs[table_name] = {row[0]: dict(zip(columns, row[1:])) for row in cursor.fetchall()}
+    return inputs
+
+def frame_inputs(frames):
+    ''' {table: {id: row}} of the input DataFrames of a run (see load_input.input_frames). '''
+    inputs = {}
+    for table_name, (id_column, columns) in INPUT_TABLES.items():
+        frame = frames[table_name]
+        inputs[table_name] = {row[id_column]: {column: row[column] for column in columns} for row in frame.to_dict('records')}
+    return inputs
+
+def signature(row, columns):
+    ''' Comparable form of an input row: JSON columns are compared by value, whether they come decoded or as text. '''
+    values = []
+    for column, kind in columns.items():
+        value = row.get(column)
+        if kind not in ('int', 'text') and isinstance(value, str):
+            value = json.loads(value)
+        values.append(json.dumps(value, sort_keys=True, default=str))
+    return tuple(values)
+
+def diff_inputs(reference, current):
+    ''' {table: {state: set of ids}} of two {table: {id: row}} inputs, for the states unchanged, modified, added and removed. '''
+    diff = {}
+    for table_name, (_, columns) in INPUT_TABLES.items():
+        old, new = reference.get(table_name, {}), current.get(table_name, {})
+        states = {state: set() for state in STATES}
+        for entity_id, row in new.items():
+            if entity_id not in old:
+                states["added"].add(entity_id)
+            elif signature(row, columns) == signature(old[entity_id], columns):
+                states["unchanged"].add(entity_id)
+            else:
+                states["modified"].add(entity_id)
+        states["removed"] = set(old) - set(new)
+        diff[table_name] = states
+    return diff
+
+
+# |||||||||| NEIGHBOURHOOD |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def affected_students(diff, assignments, current):
+    ''' Ids of the students to solve again, given the diff, the classes of the reference solution (see hints.saved_assignments) and
+    the current input. '''
+    changed = {table_name: states["modified"] | states["removed"] for table_name, states in diff.items()}
+
+    # Students of every class of the reference, and classes of every student
+    classes = defaultdict(set)
+    student_classes = defaultdict(set)
+    for student_id, teacher_id, room_id, family, class_id, t in assignments:
+        session = (teacher_id, room_id, family, class_id, t)
+        classes[session].add(student_id)
+        student_classes[student_id].add(session)
+
+    affected = diff["students"]["modified"] | diff["students"]["added"]
+    for (teacher_id, room_id, family, class_id, t), students in classes.items():
+        if (teacher_id in changed["teachers"] or room_id in changed["rooms"]
+                or (family in CLASS_TABLES and class_id in changed[CLASS_TABLES[family]])
+                or students & diff["students"]["removed"]):
+            affected |= students
+
+    # Classmates and siblings of every affected student
+    neighbours = set()
+    for student_id in affected:
+        for session in student_classes.get(student_id, ()):
+            neighbours |= classes[session]
+        siblings = current["students"].get(student_id, {}).get("siblings") or []
+        neighbours |= set(json.loads(siblings) if isinstance(siblings, str) else siblings)
+    return (affected | neighbours) & set(current["students"])
+
+
+# |||||||||| FREEZE ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def variables_by_student(gx, gx2, gy, gy2, gz, gz2):
+    ''' {student: [class variables]} of a model. '''
+    student_variables = defaultdict(list)
+    for variables in (gx, gx2, gy, gy2, gz, gz2):
+        for (s, *_), var in variables.items():
+            student_variables[s].append(var)
+    return student_variables
+
+def freeze_students(model, students, student_variables, hints):
+    ''' Fix the class variables of the given students to their hints, under an assumption literal (model.ClearAssumptions() frees
+    them again). Every class variable of those students must be hinted. Returns the number of frozen variables. '''
+    frozen_variables = 0
+    if students:
+        frozen = model.NewBoolVar('frozen')
+        for s in students:
+            for var in student_variables[s]:
+                model.AddImplication(frozen, var if hints[var] == 1 else var.Not())
+                frozen_variables += 1
+        model.AddAssumption(frozen)
+    return frozen_variables
+
+def freeze_unchanged(model, user_id, run_id, reference_solution, gx, gx2, gy, gy2, gz, gz2, hints, input_frames=None):
+    ''' Fix the class variables of every student outside the neighbourhood of the changes since reference_solution to their hints,
+    under an assumption literal. Returns the number of frozen variables (0 if nothing was frozen, e.g. when the reference was solved
+    on another time grid). The index mappings and the time grid of the run run_id must already be stored (see load_data). '''
+    with connection() as conn:
+        cursor = conn.cursor()
+        reference_run = solution_run(cursor, user_id, reference_solution)
+        if reference_run is None or not run_complete(cursor, reference_run):
+            print(f"Reference solution {reference_solution} not found or not complete, solving the whole model")
+            cursor.close()
+            return 0
+        if not same_grid(cursor, reference_run, run_id):
+            print(f"Reference solution {reference_solution} was solved on another time grid, solving the whole model")
+            cursor.close()
+            return 0
+        reference = run_inputs(cursor, reference_run)
+        assignments = saved_assignments(cursor, reference_run)
+        current = frame_inputs(input_frames) if input_frames else run_inputs(cursor, run_id)
+        student_index = {student_id: index for index, (student_id, _) in run_mappings(cursor, run_id)["student"].items()}
+        cursor.close()
+
+    diff = diff_inputs(reference, current)
+    free = {student_index[student_id] for student_id in affected_students(diff, assignments, current) if student_id in student_index}
+
+    # A student is frozen only if all of their class variables are hinted and at least one of them to 1
+    student_variables = variables_by_student(gx, gx2, gy, gy2, gz, gz2)
+    frozen_students = [
+        s for s, variables in student_variables.items()
+        if s not in free and all(var in hints for var in variables) and any(hints[var] == 1 for var in variables)
+    ]
+    frozen_variables = freeze_students(model, frozen_students, student_variables, hints)
+
+    total = sum(len(variables) for variables in student_variables.values())
+    summary = {table_name: {state: len(ids) for state, ids in states.items()} for table_name, states in diff.items()}
+    share = round(frozen_variables / total, 3) if total else None
+    print(f"Incremental run from {reference_solution}: {summary}")
+    print(f"Frozen {len(frozen_students)} of {len(student_variables)} students, {frozen_variables} of {total} class variables ({share})")
+    progress.emit('incremental', reference=reference_solution, diff=summary, frozen_students=len(frozen_students),
+                  students=len(student_variables), frozen_variables=frozen_variables, variables=total, frozen_share=share)
+    return frozen_variables
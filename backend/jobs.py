@@ -0,0 +1,517 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Jobs ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# Solver runs are jobs: /run-model submits one, a pool of worker threads picks them up (interactive runs first, then in order) and each
+# worker runs model_appver.py as a subprocess. Jobs are stored in the solver_jobs table, so their status survives a server restart
+# (queued jobs are queued again and jobs that were running are marked as failed). Every job points the temp_sol entry of its user to a
+# new run and writes only that run, which it marks complete once it succeeded (see runs.py). Jobs of the same user run one after the
+# other, while jobs of different users run concurrently.
+#
+# Concurrent runs share the CPU cores of the host: every running job gets a share of them proportional to the weight of its priority,
+# which sets its number of CP-SAT search workers when it starts. CP-SAT cannot change its number of workers during a solve, so whenever
+# a job starts or finishes the shares are recomputed and enforced by pinning the threads of every running solve to its share of the
+# cores (on platforms supporting CPU affinity). Solves never oversubscribe the host, and a solve squeezed onto fewer cores than its
+# workers when another job started gets them back when that job finishes. A share never grows past the workers of the solve, though:
+# cores freed while a solve runs with all of its workers only go to the jobs that start afterwards.
+#
+# By default (memory input mode) the worker validates the input, writes it to input.json in the job directory and the model
+# preprocesses it from there, while a background thread writes the input tables. The database input mode writes the input tables
+# first and lets the model read them back, as every run used to.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import os
+import sys
+import json
+import uuid
+import threading
+import traceback
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from db import connection
+from load_input import load_input_payload, stage_input_payload, persist_input
+from runs import finish_run
+import progress
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_SCRIPT = os.path.join(BACKEND_DIR, "model_appver.py")
+JOBS_DIR = os.environ.get("SOLVER_JOBS_DIR", os.path.join(BACKEND_DIR, "job_runs"))
+NUM_WORKERS = int(os.environ.get("SOLVER_WORKERS", "2"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+# Run options forwarded to model_appver.py as command line flags
+TIME_GRID_OPTIONS = ("days", "open", "close", "slot_minutes")
+
+# CPU budget: cores shared by all solves and weight of every priority
+AFFINITY = hasattr(os, "sched_getaffinity") and hasattr(os, "sched_setaffinity")
+HOST_CORES = sorted(os.sched_getaffinity(0)) if AFFINITY else list(range(os.cpu_count() or 1))
+SOLVER_CORES = int(os.environ.get("SOLVER_CORES", len(HOST_CORES)))
+PRIORITY_WEIGHTS = {"interactive": 3, "batch": 1}  # Interactive what-if runs vs. overnight full runs
+DEFAULT_PRIORITY = "interactive"
+
+# Input modes: "memory" hands the validated input to the model in a file and writes the input tables in the background, "database"
+# writes the input tables before the model starts and the model reads them back
+INPUT_MODES = ("memory", "database")
+DEFAULT_INPUT_MODE = "memory"
+
+JOBS_TABLE = """
+    CREATE TABLE IF NOT EXISTS solver_jobs (
+        job_id VARCHAR(36) PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        status VARCHAR(16) NOT NULL,
+        options JSONB,
+        payload JSONB,
+        workers INTEGER,
+        return_code INTEGER,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+"""
+
+
+# |||||||||| HELPER FUNCTIONS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def model_command(user_id, run_id, options, workers, events_path, input_path=None):
+    ''' Command line of the model_appver.py run of a job, writing to the run the job staged. '''
+    command = [
+        sys.executable, "-u", MODEL_SCRIPT, str(user_id), "--run-id", str(run_id), "--engine", str(options.get("engine", "grid")),
+        "--workers", str(workers), "--events", events_path,
+    ]
+    if input_path is not None:
+        command += ["--input", input_path]
+    if options.get("snapshot_interval"):
+        command += ["--snapshot-interval", str(options["snapshot_interval"])]
+    if options.get("hint_solution"):
+        command += ["--hint-solution", str(options["hint_solution"])]
+    if options.get("antiquity_hints") is False:
+        command.append("--no-antiquity-hints")
+    if options.get("reference_solution"):
+        command += ["--reference-solution", str(options["reference_solution"])]
+    if options.get("decompose"):
+        command.append("--decompose")
+    if options.get("weights"):
+        command += ["--weights", json.dumps(options["weights"])]
+    for option, value in options.get("time_grid", {}).items():
+        if option in TIME_GRID_OPTIONS:
+            command.append(f"--{option.replace('_', '-')}={','.join(value) if isinstance(value, list) else value}")
+    return command
+
+def job_log_path(job_id):
+    return os.path.join(JOBS_DIR, job_id, "output.log")
+
+def job_events_path(job_id):
+    return os.path.join(JOBS_DIR, job_id, "events.ndjson")
+
+def job_input_path(job_id):
+    return os.path.join(JOBS_DIR, job_id, "input.json")
+
+
+# |||||||||| CPU BUDGET ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def allocate_cores(weights, num_cores=SOLVER_CORES, caps=None):
+    ''' Split num_cores among jobs proportionally to their weights ({job_id: weight}), giving at least one core to every job and
+    never more than its cap ({job_id: max cores}, optional). Leftover cores go to the largest remainders first, one at a time, until
+    none is left or every job is at its cap. '''
+    caps = caps or {}
+    total_weight = sum(weights.values())
+    if not weights:
+        return {}
+
+    quotas = {job_id: num_cores * weight / total_weight for job_id, weight in weights.items()}
+    allocation = {job_id: max(1, min(int(quota), caps.get(job_id, num_cores))) for job_id, quota in quotas.items()}
+
+    leftover = num_cores - sum(allocation.values())
+    order = sorted(quotas, key=lambda job_id: quotas[job_id] - int(quotas[job_id]), reverse=True)
+    while leftover > 0:
+        growing = [job_id for job_id in order if allocation[job_id] < caps.get(job_id, num_cores)]
+        if not growing:
+            break
+        for job_id in growing[:leftover]:
+            allocation[job_id] += 1
+            leftover -= 1
+
+    return allocation
+
+def pin_process(pid, cores):
+    ''' Restrict every thread of a running process to the given cores. Threads started afterwards (the CP-SAT workers are started
+    when the solve begins) inherit the affinity of the thread starting them. '''
+    if not AFFINITY:
+        return
+    try:
+        threads = [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        threads = [pid]
+    for tid in threads:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except OSError:
+            pass  # The thread (or the whole process) already exited
+
+
+# |||||||||| JOB MANAGER |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+class JobManager:
+    ''' Queue of solver jobs and the pool of worker threads running them. Every job is a dictionary with the same fields as its
+    solver_jobs row (except for the payload, which is only kept until the job starts). '''
+
+    def __init__(self, num_workers=NUM_WORKERS):
+        self.num_workers = max(1, num_workers)
+        self.jobs = {}  # job_id -> job
+        self.pending = []  # Queued job ids, oldest first
+        self.payloads = {}  # job_id -> input data, until the job starts
+        self.processes = {}  # job_id -> running subprocess
+        self.running_users = set()
+        self.condition = threading.Condition()
+        self.workers = []
+        self.persister = ThreadPoolExecutor(max_workers=1)  # Writes the input tables of memory mode jobs, in submission order
+        self.persisting = {}  # user_id -> input write of the last memory mode job of the user
+
+    # |||||||||| PERSISTENCE ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+    def _execute(self, query, params=()):
+        ''' Run a statement on the solver_jobs table. The queue keeps working from memory if the database is unreachable. '''
+        try:
+            with connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                rows = cursor.fetchall() if cursor.description else None
+                conn.commit()
+                cursor.close()
+                return rows
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def _save(self, job, payload=None):
+        self._execute("""
+            INSERT INTO solver_jobs (job_id, user_id, status, options, payload, workers, return_code, error, created_at, started_at, finished_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (job_id) DO UPDATE SET
+                status = EXCLUDED.status, workers = EXCLUDED.workers, return_code = EXCLUDED.return_code, error = EXCLUDED.error,
+                started_at = EXCLUDED.started_at, finished_at = EXCLUDED.finished_at,
+                payload = CASE WHEN EXCLUDED.status = 'queued' THEN solver_jobs.payload END
+        """, (
+            job["job_id"], job["user_id"], job["status"], json.dumps(job["options"]),
+            json.dumps(payload) if payload is not None else None, job["workers"], job["return_code"], job["error"],
+            job["created_at"], job["started_at"], job["finished_at"],
+        ))
+
+    def _recover(self):
+        ''' Queue again the jobs left queued by a previous server, and fail the ones it left running. '''
+        self._execute(JOBS_TABLE)
+        self._execute("ALTER TABLE solver_jobs ADD COLUMN IF NOT EXISTS workers INTEGER")  # Tables created before the CPU budget
+        self._execute(
+            "UPDATE solver_jobs SET status = %s, error = %s, finished_at = %s, payload = NULL WHERE status = %s",
+            (FAILED, "Interrupted by a server restart", datetime.now(), RUNNING)
+        )
+        rows = self._execute("""
+            SELECT job_id, user_id, options, payload, created_at FROM solver_jobs WHERE status = %s ORDER BY created_at
+        """, (QUEUED,)) or []
+
+        for job_id, user_id, options, payload, created_at in rows:
+            job = self._new_job(job_id, user_id, options or {}, created_at)
+            self.jobs[job_id] = job
+            self.payloads[job_id] = payload or {}
+            self.pending.append(job_id)
+
+    # |||||||||| LIFECYCLE |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+    def start(self):
+        ''' Recover persisted jobs and start the worker threads. '''
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        with self.condition:
+            self._recover()
+        for w in range(self.num_workers):
+            worker = threading.Thread(target=self._work, name=f"solver-worker-{w}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    @staticmethod
+    def _new_job(job_id, user_id, options, created_at):
+        return {
+            "job_id": job_id,
+            "user_id": user_id,
+            "status": QUEUED,
+            "options": options,
+            "priority": options.get("priority", DEFAULT_PRIORITY),
+            "workers": None,  # CP-SAT search workers, set when the job starts
+            "cores": None,  # Current share of the cores while running (at most its workers once started)
+            "input": None,  # Rows loaded and entries rejected of every input table, once loaded
+            "input_persisted": None,  # Whether the input tables were written (memory mode writes them while the model runs)
+            "return_code": None,
+            "error": None,
+            "created_at": created_at,
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    def submit(self, user_id, input_data, options=None):
+        ''' Queue a solver run of the given input data and return its job. '''
+        options = options or {}
+        if options.get("priority", DEFAULT_PRIORITY) not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority '{options['priority']}', expected one of {list(PRIORITY_WEIGHTS)}")
+        if options.get("max_workers") is not None and int(options["max_workers"]) < 1:
+            raise ValueError("max_workers must be at least 1")
+        if options.get("input_mode", DEFAULT_INPUT_MODE) not in INPUT_MODES:
+            raise ValueError(f"Unknown input mode '{options['input_mode']}', expected one of {list(INPUT_MODES)}")
+        job = self._new_job(str(uuid.uuid4()), int(user_id), options, datetime.now())
+        with self.condition:
+            self.jobs[job["job_id"]] = job
+            self.payloads[job["job_id"]] = input_data
+            self.pending.append(job["job_id"])
+            self._save(job, input_data)
+            self.condition.notify_all()
+        return self.status(job["job_id"])
+
+    def _next_job(self):
+        ''' Oldest queued job of the highest priority whose user has no running job, if any. Must be called holding the condition. '''
+        by_priority = sorted(self.pending, key=lambda job_id: -PRIORITY_WEIGHTS[self.jobs[job_id]["priority"]])  # Stable: keeps order
+        for job_id in by_priority:
+            if self.jobs[job_id]["user_id"] not in self.running_users:
+                self.pending.remove(job_id)
+                return self.jobs[job_id]
+        return None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    self.condition.wait()
+                    job = self._next_job()
+
+                job["status"] = RUNNING
+                job["started_at"] = datetime.now()
+                self.running_users.add(job["user_id"])
+                payload = self.payloads.pop(job["job_id"], {})
+                self._save(job)
+
+            try:
+                self._run(job, payload)
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(job, FAILED, error=str(e))
+
+    def _run(self, job, payload):
+        job_dir = os.path.dirname(job_log_path(job["job_id"]))
+        os.makedirs(job_dir, exist_ok=True)
+
+        # A previous job of the user may still be writing its input tables, which this job is about to replace
+        self._wait_persisted(job["user_id"])
+
+        if job["options"].get("input_mode", DEFAULT_INPUT_MODE) == "memory":
+            input_path = job_input_path(job["job_id"])
+            report, validated, run_id = stage_input_payload(job["user_id"], payload, input_path)
+            with self.condition:
+                if job["status"] != CANCELLED:  # A job cancelled while staging never writes its input tables
+                    self.persisting[job["user_id"]] = self.persister.submit(self._persist, job, run_id, validated)
+        else:
+            input_path = None
+            report, run_id = load_input_payload(job["user_id"], payload)
+            job["input_persisted"] = True
+        with self.condition:
+            job["input"] = report
+
+        with open(job_log_path(job["job_id"]), "w", encoding="utf-8") as log:
+            with self.condition:
+                if job["status"] == CANCELLED:  # Cancelled while its input was being loaded
+                    self._finish(job, CANCELLED)
+                    return
+                # The search workers of the solve are its share of the cores among the jobs running right now
+                job["workers"] = self._allocation()[job["job_id"]]
+                self._save(job)
+
+                # Each job runs in its own directory, so the files written by the model do not clash between jobs
+                process = subprocess.Popen(
+                    model_command(job["user_id"], run_id, job["options"], job["workers"], job_events_path(job["job_id"]), input_path),
+                    cwd=job_dir,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
+                self.processes[job["job_id"]] = process
+                self._rebalance()
+
+            return_code = process.wait()
+
+        if return_code == 0 and job["status"] != CANCELLED:
+            self._complete(job, run_id)
+
+        with self.condition:
+            self.processes.pop(job["job_id"], None)
+            if job["status"] == CANCELLED:
+                self._finish(job, CANCELLED, return_code)
+            elif return_code == 0:
+                self._finish(job, SUCCEEDED, return_code)
+            else:
+                self._finish(job, FAILED, return_code, f"Model exited with code {return_code}")
+
+    def _finish(self, job, status, return_code=None, error=None):
+        with self.condition:
+            job["status"] = status
+            job["return_code"] = return_code
+            job["error"] = error
+            job["finished_at"] = datetime.now()
+            job["cores"] = None
+            self.running_users.discard(job["user_id"])
+            self._save(job)
+            self._rebalance()
+            self.condition.notify_all()
+
+    def _persist(self, job, run_id, validated):
+        ''' Write the input tables of a memory mode job into the run it staged. A failure only loses the stored copy of the input, not
+        the run. Skipped if the job was cancelled before the write started. '''
+        if job["status"] == CANCELLED:
+            job["input_persisted"] = False
+            return
+        try:
+            persist_input(run_id, job["user_id"], validated)
+            job["input_persisted"] = True
+        except Exception:
+            traceback.print_exc()
+            job["input_persisted"] = False
+
+    def _complete(self, job, run_id):
+        ''' Mark the run of a succeeded job complete once its input tables are stored, so it can be saved (see runs.py). A run whose
+        input could not be stored stays incomplete. '''
+        self._wait_persisted(job["user_id"])
+        if not job.get("input_persisted"):
+            return
+        with connection() as conn:
+            cursor = conn.cursor()
+            finish_run(cursor, run_id)
+            conn.commit()
+            cursor.close()
+
+    def _wait_persisted(self, user_id):
+        with self.condition:
+            future = self.persisting.get(user_id)
+        if future is not None:
+            wait([future])
+
+    def _allocation(self):
+        ''' Share of the cores of every running job. Must be called holding the condition. '''
+        running = {job_id: job for job_id, job in self.jobs.items() if job["status"] == RUNNING}
+        weights = {job_id: PRIORITY_WEIGHTS[job["priority"]] for job_id, job in running.items()}
+        caps = {job_id: int(job["options"]["max_workers"]) for job_id, job in running.items() if job["options"].get("max_workers")}
+        for job_id, job in running.items():
+            if job["workers"]:  # A started solve cannot use more cores than its search workers
+                caps[job_id] = min(caps.get(job_id, job["workers"]), job["workers"])
+        return allocate_cores(weights, SOLVER_CORES, caps)
+
+    def _rebalance(self):
+        ''' Recompute the share of every running job and pin its solve to as many cores (consecutive, so solves do not share cores
+        unless there are more jobs than cores). Must be called holding the condition. '''
+        allocation = self._allocation()
+        first = 0
+        for job_id, num_cores in allocation.items():
+            job = self.jobs[job_id]
+            job["cores"] = num_cores
+            cores = {HOST_CORES[(first + c) % len(HOST_CORES)] for c in range(num_cores)}
+            first += num_cores
+
+            process = self.processes.get(job_id)
+            if process is not None and process.poll() is None:
+                pin_process(process.pid, cores)
+
+    def cancel(self, job_id):
+        ''' Cancel a queued or running job. Returns the job, or None if it does not exist. '''
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] not in ACTIVE:
+                return self.status(job_id)
+
+            if job["status"] == QUEUED:
+                self.pending.remove(job_id)
+                self.payloads.pop(job_id, None)
+                job["status"] = CANCELLED
+                job["finished_at"] = datetime.now()
+                self._save(job)
+                return self.status(job_id)
+
+            job["status"] = CANCELLED  # The worker finishes the job once its process exits
+            process = self.processes.get(job_id)
+
+        if process is not None and process.poll() is None:
+            process.terminate()  # Graceful stop
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        return self.status(job_id)
+
+    # |||||||||| QUERIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+    def _from_db(self, job_id):
+        rows = self._execute("""
+            SELECT job_id, user_id, status, options, workers, return_code, error, created_at, started_at, finished_at
+            FROM solver_jobs WHERE job_id = %s
+        """, (job_id,))
+        if not rows:
+            return None
+        keys = ("job_id", "user_id", "status", "options", "workers", "return_code", "error", "created_at", "started_at", "finished_at")
+        job = dict(zip(keys, rows[0]))
+        job["priority"] = (job["options"] or {}).get("priority", DEFAULT_PRIORITY)
+        job["cores"] = None
+        job["input"] = None
+        job["input_persisted"] = None
+        return job
+
+    def status(self, job_id):
+        ''' JSON friendly copy of a job (from memory, or from the solver_jobs table for jobs of previous servers). '''
+        with self.condition:
+            job = dict(self.jobs[job_id]) if job_id in self.jobs else None
+            if job is not None and job["status"] == QUEUED:
+                job["queue_position"] = self.pending.index(job_id) + 1
+        if job is None:
+            job = self._from_db(job_id)
+            if job is None:
+                return None
+        for key in ("created_at", "started_at", "finished_at"):
+            if job[key] is not None:
+                job[key] = job[key].isoformat()
+        return job
+
+    def user_jobs(self, user_id):
+        rows = self._execute("SELECT job_id FROM solver_jobs WHERE user_id = %s ORDER BY created_at DESC", (user_id,))
+        if rows is None:  # Database unreachable: only the jobs of this server are known
+            with self.condition:
+                job_ids = [job_id for job_id, job in self.jobs.items() if job["user_id"] == int(user_id)]
+        else:
+            job_ids = [row[0] for row in rows]
+        return [job for job in (self.status(job_id) for job_id in job_ids) if job is not None]
+
+    def active_jobs(self, user_id):
+        with self.condition:
+            return [job_id for job_id, job in self.jobs.items() if job["user_id"] == int(user_id) and job["status"] in ACTIVE]
+
+    def is_finished(self, job_id):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return job is None or job["status"] not in ACTIVE
+
+    def output(self, job_id):
+        ''' Full output (stdout and stderr) of a job, or None if it has not started. '''
+        try:
+            with open(job_log_path(job_id), "r", encoding="utf-8", errors="replace") as log:
+                return log.read()
+        except FileNotFoundError:
+            return None
+
+    def read_output(self, job_id, offset=0):
+        ''' Output of a job written since the given byte offset (raw bytes, a character may be split at the end), and the offset to
+        read from next time. None if the job has not started. '''
+        try:
+            with open(job_log_path(job_id), "rb") as log:
+                log.seek(offset)
+                data = log.read()
+        except FileNotFoundError:
+            return None, offset
+        return data, offset + len(data)
+
+    def events(self, job_id, offset=0):
+        ''' Progress events written by a job since the given byte offset, and the offset to read from next time. '''
+        return progress.read_events(job_events_path(job_id), offset)
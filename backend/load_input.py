@@ -1,96 +1,231 @@
+import io
+import re
 import json
-import psycopg2
 import traceback
+import pandas as pd
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
-def replace_solution_entry(cursor, user_id, solution_id):
-    # Delete if exists
-    cursor.execute("DELETE FROM students WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM teachers WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM rooms WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM courses WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM instruments WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM solution_assignments WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM solution_insights WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM student_count WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM student_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM teacher_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM room_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM course_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-    cursor.execute("DELETE FROM instrument_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-
-    cursor.execute(
-        "DELETE FROM solutions WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    # Insert fresh
-    cursor.execute(
-        "INSERT INTO solutions (user_id, solution_id) VALUES (%s, %s)",
-        (user_id, solution_id)
-    )
-
-
-def load_data(file_path, table_name, cursor, user_id, solution_id='temp_sol'):
-    try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-    except Exception as e:
-        traceback.print_exc()
-        return
+from db import connection
+from runs import TEMP_SOLUTION, start_run
+
+# Columns of every input table: the id column of the entity, then every other column and how it is stored. The id (serial),
+# user_id, solution_id and run_id columns are set on ingestion, so they are ignored if an entry carries them.
+INPUT_TABLES = {
+    'students': ('student_id', {'name': 'text', 'availability': 'ranges', 'antiquity': 'antiquity', 'siblings': 'json', 'courses': 'json', 'instruments': 'json'}),
+    'teachers': ('teacher_id', {'name': 'text', 'availability': 'ranges', 'contract': 'json', 'courses': 'json', 'instruments': 'json'}),
+    'rooms': ('room_id', {'name': 'text', 'capacity': 'int', 'features': 'json'}),
+    'courses': ('course_id', {'name': 'text', 'duration': 'json', 'capacity': 'int', 'features': 'json'}),
+    'instruments': ('instrument_id', {'name': 'text', 'duration': 'json', 'capacity': 'int', 'features': 'json'}),
+}
+IGNORED_COLUMNS = {'id', 'user_id', 'solution_id', 'run_id'}
+NAME_LENGTH = 100  # VARCHAR(100)
+TIME_RANGE = re.compile(r'^\d{1,2}:\d{2}-\d{1,2}:\d{2}$')
+
+
+# Validation
+def to_int(value, column):
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or (isinstance(value, str) and not value.strip().lstrip('-').isdigit()):
+        raise ValueError(f"{column} must be an integer, got {value!r}")
+    return int(value)
 
-    success_count = 0
-    fail_count = 0
+def check_ranges(value, column):
+    ''' Availability entries are [day, "HH:MM-HH:MM"] pairs. '''
+    if not isinstance(value, list):
+        raise ValueError(f"{column} must be a list of [day, time range] entries")
+    for entry in value:
+        if not (isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str) and isinstance(entry[1], str)
+                and TIME_RANGE.match(entry[1])):
+            raise ValueError(f"{column} has an invalid [day, time range] entry: {entry!r}")
 
-    for i, entry in enumerate(data):
+def check_antiquity(value, column):
+    ''' Antiquity entries are [class, [day, "HH:MM-HH:MM"], ...] lists. '''
+    if not isinstance(value, list):
+        raise ValueError(f"{column} must be a list of [class, [day, time range], ...] entries")
+    for entry in value:
+        if not (isinstance(entry, list) and entry and isinstance(entry[0], str)):
+            raise ValueError(f"{column} has an invalid entry: {entry!r}")
+        check_ranges(entry[1:], column)
+
+def validate_entry(entry, id_column, columns):
+    ''' Row (tuple in id_column, *columns order) of an entry. Raises ValueError if the entry can not be stored. '''
+    if not isinstance(entry, dict):
+        raise ValueError(f"entry must be an object, got {type(entry).__name__}")
+    unknown = set(entry) - set(columns) - IGNORED_COLUMNS - {id_column}
+    if unknown:
+        raise ValueError(f"unknown columns {sorted(unknown)}")
+    if entry.get(id_column) is None:
+        raise ValueError(f"{id_column} is missing")
+
+    row = [to_int(entry[id_column], id_column)]
+    for column, kind in columns.items():
+        value = entry.get(column)
+        if value is None:  # Missing columns are stored as NULL, as they always were
+            row.append(None)
+        elif kind == 'int':
+            row.append(to_int(value, column))
+        elif kind == 'text':
+            if not isinstance(value, str) or len(value) > NAME_LENGTH:
+                raise ValueError(f"{column} must be a string of at most {NAME_LENGTH} characters")
+            row.append(value)
+        else:
+            if kind == 'ranges':
+                check_ranges(value, column)
+            elif kind == 'antiquity':
+                check_antiquity(value, column)
+            json.dumps(value)  # Raises TypeError for values JSONB can not store
+            row.append(value)
+    return tuple(row)
+
+def validate_entries(entries, table_name):
+    ''' Validate every entry of a table before anything is written: rows to store, and rejected entries (position, id and reason).
+    Entries repeating the id of a previous entry are rejected too. '''
+    id_column, columns = INPUT_TABLES[table_name]
+    rows, rejected, seen = [], [], set()
+    for index, entry in enumerate(entries or []):
+        entry_id = entry.get(id_column) if isinstance(entry, dict) else None
         try:
-            entry['user_id'] = user_id
-            entry['solution_id'] = solution_id
-
-            # Convert complex fields to JSON strings
-            if table_name in ['students', 'teachers']:
-                for field in ['availability', 'antiquity', 'siblings', 'courses', 'instruments', 'contract', 'features', 'duration']:
-                    if field in entry:
-                        entry[field] = json.dumps(entry[field])
-            elif table_name in ['rooms', 'courses', 'instruments']:
-                for field in ['features', 'duration']:
-                    if field in entry:
-                        entry[field] = json.dumps(entry[field])
-
-            keys = ', '.join(entry.keys())
-            values_placeholders = ', '.join(['%s'] * len(entry))
-            query = f"INSERT INTO {table_name} ({keys}) VALUES ({values_placeholders})"
-            cursor.execute(query, list(entry.values()))
-            success_count += 1
-        except Exception as e:
-            traceback.print_exc()
-            fail_count += 1
+            row = validate_entry(entry, id_column, columns)
+            if row[0] in seen:
+                raise ValueError(f"duplicate {id_column} {row[0]}")
+        except (ValueError, TypeError) as e:
+            rejected.append({'index': index, 'id': entry_id, 'error': str(e)})
+            continue
+        seen.add(row[0])
+        rows.append(row)
+    return rows, rejected
 
-def load_input_data(user_id):
-    conn = connect_to_db()
-    cursor = conn.cursor()
 
-    try:
-        replace_solution_entry(cursor, user_id, 'temp_sol')
+# Bulk loading
+def copy_value(value):
+    ''' Value in COPY text format: NULL is \\N, and backslashes, tabs and line breaks are escaped. '''
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def copy_rows(cursor, table_name, columns, rows):
+    ''' Stream every row of a table to Postgres with a single COPY. '''
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value) for value in row) + '\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN", buffer)
+
+def validate_payload(input_data):
+    ''' Rows and rejected entries of every input table of a payload ({table: [entries]}). '''
+    return {table_name: validate_entries(input_data.get(table_name, []), table_name) for table_name in INPUT_TABLES}
+
+def input_report(validated):
+    ''' Number of rows stored and rejected entries of every table of a validated payload. '''
+    report = {}
+    for table_name, (rows, rejected) in validated.items():
+        report[table_name] = {'rows': len(rows), 'rejected': rejected}
+
+        print(f"{table_name}: {len(rows)} rows loaded, {len(rejected)} rejected")
+        for entry in rejected:
+            print(f"  rejected {table_name} entry {entry['index']} ({entry['id']}): {entry['error']}")
+
+    return report
+
+def copy_tables(cursor, validated, user_id, run_id):
+    ''' Write every table of a validated payload to a run (see runs.py) with one COPY each. '''
+    for table_name, (rows, _) in validated.items():
+        id_column, columns = INPUT_TABLES[table_name]
+        json_columns = [kind not in ('int', 'text') for kind in columns.values()]
+        copy_rows(cursor, table_name, ['user_id', 'run_id', id_column, *columns], [
+            (user_id, run_id, row[0], *(json.dumps(value) if is_json and value is not None else value
+                                        for value, is_json in zip(row[1:], json_columns)))
+            for row in rows
+        ])
+
+def load_tables(cursor, input_data, user_id, solution_id=TEMP_SOLUTION):
+    ''' Start a new run of a solution entry with the given input data ({table: [entries]}). The whole payload is validated up
+    front, then every table is written with one COPY, so the caller commits (or rolls back) everything at once. Returns the number
+    of rows stored and the rejected entries of every table, and the id of the new run. '''
+    validated = validate_payload(input_data)
+    run_id = start_run(cursor, user_id, solution_id)
+    copy_tables(cursor, validated, user_id, run_id)
+    return input_report(validated), run_id
 
-        load_data('students.json', 'students', cursor, user_id)
-        load_data('teachers.json', 'teachers', cursor, user_id)
-        load_data('rooms.json', 'rooms', cursor, user_id)
-        load_data('courses.json', 'courses', cursor, user_id)
-        load_data('instruments.json', 'instruments', cursor, user_id)
 
+# In-memory fast path: the worker hands the validated payload to model_appver.py in a file (--input), so the model never reads the
+# input back from the database, and the input tables are written in the background while the model runs.
+def input_entries(validated):
+    ''' Entries ({table: [entries]}) that passed validation, with every column of their table. '''
+    entries = {}
+    for table_name, (rows, _) in validated.items():
+        id_column, columns = INPUT_TABLES[table_name]
+        entries[table_name] = [dict(zip([id_column, *columns], row)) for row in rows]
+    return entries
+
+def input_frames(input_data):
+    ''' DataFrames of the input tables as the preprocessing reads them from the database: every column, sorted by id. '''
+    frames = {}
+    for table_name, (id_column, columns) in INPUT_TABLES.items():
+        frame = pd.DataFrame(input_data.get(table_name, []), columns=[id_column, *columns])
+        frames[table_name] = frame.sort_values(id_column, kind='stable').reset_index(drop=True)
+    return frames
+
+def load_input_file(input_path):
+    ''' DataFrames of an input file written by stage_input_payload. '''
+    with open(input_path, 'r', encoding='utf-8') as file:
+        return input_frames(json.load(file))
+
+def clear_input_tables(cursor, run_id):
+    for table_name in INPUT_TABLES:
+        cursor.execute(f"DELETE FROM {table_name} WHERE run_id = %s", (run_id,))
+
+def stage_input_payload(user_id, input_data, input_path):
+    ''' Fast path of load_input_payload: validate the payload, write its valid entries to input_path and point the temp_sol entry
+    of the user to a new, empty run (as a full load does). The input tables of the run are left empty until persist_input writes
+    them. Returns the per table report, the validated payload and the id of the new run. '''
+    validated = validate_payload(input_data)
+    with open(input_path, 'w', encoding='utf-8') as file:
+        json.dump(input_entries(validated), file)
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        run_id = start_run(cursor, user_id)
+        conn.commit()
+        cursor.close()
+
+    return input_report(validated), validated, run_id
+
+def persist_input(run_id, user_id, validated):
+    ''' Replace the input tables of a run with an already validated payload, in a single transaction. The run is the one staged by
+    stage_input_payload, wherever temp_sol points by the time the tables are written. '''
+    with connection() as conn:
+        cursor = conn.cursor()
+        clear_input_tables(cursor, run_id)
+        copy_tables(cursor, validated, user_id, run_id)
         conn.commit()
-    except Exception as e:
-        conn.rollback()
+        cursor.close()
+
+def load_input_data(user_id):
+    ''' Load the input data files (students.json, teachers.json, rooms.json, courses.json and instruments.json) of the working
+    directory into the temp_sol entry of the user. '''
+    input_data = {}
+    for table_name in INPUT_TABLES:
+        try:
+            with open(f'{table_name}.json', 'r') as file:
+                input_data[table_name] = json.load(file)
+        except Exception:
+            traceback.print_exc()
+
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            report, _ = load_tables(cursor, input_data, user_id)
+            conn.commit()
+            cursor.close()
+            return report
+    except Exception:
         traceback.print_exc()
-    finally:
+
+def load_input_payload(user_id, input_data):
+    ''' Load the input data sent to /run-model (students, teachers, rooms, courses and instruments) into the temp_sol entry of the
+    user, in a single transaction. Returns the per table report of load_tables and the id of the new run. '''
+    with connection() as conn:
+        cursor = conn.cursor()
+        report, run_id = load_tables(cursor, input_data, user_id)
+        conn.commit()
         cursor.close()
-        conn.close()
+        return report, run_id
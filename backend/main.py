@@ -1,21 +1,27 @@
-from fastapi import FastAPI, Body
+from fastapi import FastAPI, Body, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, Response
 
 from pydantic import BaseModel
-import psycopg2
-import subprocess
-import threading
 import os
+import time
 import zipfile
 import tempfile
 import json
 import io
+import codecs
 import csv
+from contextlib import AsyncExitStack
 
 from auth import router as auth_router
 
-from load_input import load_data, replace_solution_entry, connect_to_db
+from db import connection, async_connection, close_async_pool
+from jobs import JobManager
+import progress
+import formats
+from cache import ResponseCache, cacheable, cached_response
+from runs import TEMP_SOLUTION, solution_run, run_complete, point_solution, drop_solution
+from time_grid import DEFAULT_GRID
 
 
 class APIcallRequest(BaseModel):
@@ -36,20 +42,76 @@ app.add_middleware(
 )
 
 
-process_ref = None # Store process reference
-lock = threading.Lock()  # Prevent race conditions when running/stopping the model
+job_manager = JobManager()  # Queue and worker pool of the solver runs
+STREAM_INTERVAL = 0.5  # Seconds between output polls while streaming a run
+response_cache = ResponseCache()  # Responses of the views of saved solutions (see cache.py)
+
+
+@app.on_event("startup")
+def start_job_manager():
+    job_manager.start()
+
+
+def run_options(payload):
+    ''' Model options of a /run-model payload: engine, optional days, open, close and slot_minutes time grid overrides, priority
+    ("interactive" or "batch", which weights the share of CPU cores of the run), an optional max_workers cap, input_mode ("memory",
+    the default, or "database", see jobs.py), an optional snapshot_interval (seconds between snapshots of the incumbent schedule,
+    see SolutionPrinter), an optional hint_solution (saved solution whose classes are hinted to the solver), antiquity_hints
+    (false to not hint last year's classes, see hints.py) and an optional reference_solution (saved solution whose classes are kept
+    where the input did not change, see incremental.py), optional objective weights ({component: weight} for some of the
+    components of OBJECTIVE_WEIGHTS, see model_body_appver.py) and decompose (true to solve the independent clusters of students in
+    parallel first, see decompose.py). '''
+    options = {"engine": payload.get("engine", "grid"), "time_grid": payload.get("time_grid", {})}
+    for option in ("priority", "max_workers", "input_mode", "snapshot_interval", "hint_solution", "antiquity_hints", "reference_solution",
+                   "weights", "decompose"):
+        if payload.get(option) is not None:
+            options[option] = payload[option]
+    return options
+
+
+def stream_media_type(request):
+    ''' Progress event format asked for in the Accept header: Server-Sent Events, NDJSON, or None for the plain text output. '''
+    accept = request.headers.get("accept", "")
+    if progress.SSE in accept:
+        return progress.SSE
+    if progress.NDJSON in accept:
+        return progress.NDJSON
+    return None
+
+
+def stream_events(job_id, media_type):
+    ''' Progress events of a job until it finishes: a job event whenever its status changes, an input event with the rows loaded
+    and rejected of every input table, the events written by its run (phases and incumbents, see progress.py) and a final status
+    event. '''
+    offset = 0
+    last_status = None
+    input_sent = False
+    while True:
+        finished = job_manager.is_finished(job_id)  # Checked before reading, so no event is lost after the job ends
+        job = job_manager.status(job_id)
+        if not finished and job["status"] != last_status:
+            last_status = job["status"]
+            yield progress.encode({"type": "job", "job_id": job_id, "status": last_status, "queue_position": job.get("queue_position"),
+                                   "workers": job["workers"]}, media_type)
+        if job.get("input") and not input_sent:
+            input_sent = True
+            yield progress.encode({"type": "input", "job_id": job_id, "tables": job["input"]}, media_type)
+        events, offset = job_manager.events(job_id, offset)
+        for event in events:
+            yield progress.encode(event, media_type)
+        if finished:
+            break
+        time.sleep(STREAM_INTERVAL)
+
+    yield progress.encode({"type": "status", "job_id": job_id, "status": job["status"], "error": job["error"],
+                           "return_code": job["return_code"]}, media_type)
+
+
+def event_response(job_id, media_type):
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Do not let proxies buffer the stream
+    return StreamingResponse(stream_events(job_id, media_type), media_type=media_type, headers=headers)
 
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
 
 @app.get("/")
 def read_root():
@@ -57,105 +119,279 @@ def read_root():
 
 
 @app.post("/run-model")
-def run_model(payload: dict = Body(...)):
-    user_id = payload["user_id"]
-    input_data = payload["data"]
+def run_model(request: Request, payload: dict = Body(...)):
+    ''' Queue a solver run and stream its progress until it finishes: typed progress events when the Accept header asks for
+    text/event-stream or application/x-ndjson, the raw output of the run otherwise. Either way the first line or event carries the
+    job id, which can be used with the /jobs endpoints (the run keeps going if the client disconnects). '''
+    try:
+        job = job_manager.submit(payload["user_id"], payload["data"], run_options(payload))
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    job_id = job["job_id"]
 
-    def load_input_data_directly(user_id, input_data):
-        conn = connect_to_db()
-        cursor = conn.cursor()
+    media_type = stream_media_type(request)
+    if media_type is not None:
+        return event_response(job_id, media_type)
 
-        try:
-            replace_solution_entry(cursor, user_id, 'temp_sol')
+    def stream_output():
+        yield f"Job {job_id} queued (position {job.get('queue_position', 1)})\n"
+
+        # Only the output written since the last poll is read. The decoder keeps a character split between two reads for the next one
+        offset = 0
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            finished = job_manager.is_finished(job_id)  # Checked before reading, so no output is lost after the job ends
+            data, offset = job_manager.read_output(job_id, offset)
+            text = decoder.decode(data or b"", final=finished)
+            if text:
+                yield text
+            if finished:
+                break
+            time.sleep(STREAM_INTERVAL)
+
+        status = job_manager.status(job_id)
+        yield f"Job {job_id} {status['status']}" + (f": {status['error']}" if status["error"] else "") + "\n"
 
-            load_data_from_memory(input_data.get('students', []), 'students', cursor, user_id)
-            load_data_from_memory(input_data.get('teachers', []), 'teachers', cursor, user_id)
-            load_data_from_memory(input_data.get('rooms', []), 'rooms', cursor, user_id)
-            load_data_from_memory(input_data.get('courses', []), 'courses', cursor, user_id)
-            load_data_from_memory(input_data.get('instruments', []), 'instruments', cursor, user_id)
+    return StreamingResponse(stream_output(), media_type="text/plain")
 
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise
+
+@app.post("/stop-model")
+def stop_model(payload: dict = Body(default={})):
+    ''' Cancel a job (job_id), or every queued and running job of a user (user_id). '''
+    if payload.get("job_id"):
+        job_ids = [payload["job_id"]]
+    elif payload.get("user_id") is not None:
+        job_ids = job_manager.active_jobs(payload["user_id"])
+    else:
+        return JSONResponse(content={"error": "job_id or user_id is required"}, status_code=400)
+
+    stopped = [job["job_id"] for job in (job_manager.cancel(job_id) for job_id in job_ids) if job and job["status"] == "cancelled"]
+    if stopped:
+        return {"message": "Model process stopped.", "job_ids": stopped}
+    return {"message": "No process is running."}
+
+
+# |||||||||| SOLVER JOBS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+@app.post("/jobs")
+def submit_job(payload: dict = Body(...)):
+    ''' Queue a solver run without streaming its output. Same payload as /run-model. '''
+    try:
+        return job_manager.submit(payload["user_id"], payload["data"], run_options(payload))
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+
+@app.get("/jobs")
+def list_jobs(user_id: int):
+    return job_manager.user_jobs(user_id)
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_manager.status(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return job
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str, request: Request):
+    ''' Progress events of a job, from its start, as Server-Sent Events (for EventSource clients) or NDJSON (the default). '''
+    if job_manager.status(job_id) is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return event_response(job_id, stream_media_type(request) or progress.NDJSON)
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    ''' Status and full output of a job. The schedule of a succeeded job is stored under the temp_sol solution of its user, and can
+    be read with the get-* endpoints until the user runs the model again. '''
+    job = job_manager.status(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    job["output"] = job_manager.output(job_id)
+    if job["status"] == "succeeded":
+        job["solution_id"] = "temp_sol"
+    return job
+
+
+# |||||||||| SOLUTION VIEWS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# Loading a solution in the UI fires the solution, insights, student count and the five name mapping requests at once. These read
+# only endpoints are async and run on the asyncpg pool (see db.py), so they don't compete for the threadpool of the sync endpoints.
+SAVED_KEYS = ("id", "user_id", "run_id")  # Columns of the saved tables that are not sent to the UI
+SOLUTION_ROWS = "run_id = (SELECT run_id FROM solutions WHERE user_id = $1 AND solution_id = $2)"  # Rows of a solution (see runs.py)
+STREAM_BATCH = 2000  # Rows fetched from the server side cursor at a time when streaming a solution
+SOLUTION_BUNDLE = {  # Section of the solution bundle -> table it is read from
+    "assignments": "solution_assignments",
+    "insights": "solution_insights",
+    "student_count": "student_count",
+    "student_names": "student_index_mapping",
+    "teacher_names": "teacher_index_mapping",
+    "room_names": "room_index_mapping",
+    "course_names": "course_index_mapping",
+    "instrument_names": "instrument_index_mapping",
+}
+
+
+async def fetch_rows(query, *args):
+    async with async_connection() as conn:
+        return await conn.fetch(query, *args)
+
+
+async def fetch_saved(table, user_id, solution_id):
+    ''' Rows of a table that belong to a solution entry of a user. '''
+    return await fetch_rows(f"SELECT * FROM {table} WHERE {SOLUTION_ROWS}", user_id, solution_id)
+
+
+def csv_text(rows, exclude=()):
+    ''' Rows as CSV, header first. JSONB columns come from asyncpg as JSON text, which is what the UI parses. '''
+    columns = [name for name in rows[0].keys() if name not in exclude]
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    writer.writerows([row[name] for name in columns] for row in rows)
+    return output.getvalue()
+
+
+def csv_response(rows, filename, exclude=()):
+    return Response(content=csv_text(rows, exclude), media_type=formats.CSV,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+async def saved_view(table, user_id, solution_id, filename, not_found, if_none_match=None):
+    ''' CSV view of a table of a solution entry. Saved solutions are served from the response cache once they were read. '''
+    if not cacheable(solution_id):
+        rows = await fetch_saved(table, user_id, solution_id)
+        return csv_response(rows, filename, exclude=SAVED_KEYS) if rows else {"message": not_found}
+
+    key = (user_id, solution_id, f"{table}:{formats.CSV}")
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation(user_id, solution_id)
+        rows = await fetch_saved(table, user_id, solution_id)
+        if not rows:
+            return {"message": not_found}
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        entry = response_cache.put(key, csv_text(rows, exclude=SAVED_KEYS).encode("utf-8"), formats.CSV, headers, generation)
+
+    return cached_response(entry, if_none_match)
+
+
+async def fetch_columnar(conn, table, user_id, solution_id):
+    ''' Rows of a table that belong to a solution entry, as {"columns": [...], "rows": [[...], ...]}. JSON columns are decoded, so
+    they reach the UI as objects. '''
+    statement = await conn.prepare(f"SELECT * FROM {table} WHERE {SOLUTION_ROWS}")
+    columns = [attribute for attribute in statement.get_attributes() if attribute.name not in SAVED_KEYS]
+    json_columns = {attribute.name for attribute in columns if attribute.type.name in ("json", "jsonb")}
+
+    rows = []
+    for record in await statement.fetch(user_id, solution_id):
+        rows.append([
+            json.loads(record[column.name]) if column.name in json_columns and record[column.name] is not None else record[column.name]
+            for column in columns
+        ])
+    return {"columns": [column.name for column in columns], "rows": rows}
+
+
+async def stream_rows(query, args, media_type, filename, exclude=(), fill=None):
+    ''' Response that streams the rows of a query in the given format (see formats.py), reading them from a server side cursor a
+    batch at a time. The connection is held until the last batch is sent. Returns None if the query has no rows. fill, if given, is
+    awaited with the encoded body and the response headers, e.g. to cache it, and returns either the response or the body to stream. '''
+    stack = AsyncExitStack()
+    try:
+        conn = await stack.enter_async_context(async_connection())
+        await stack.enter_async_context(conn.transaction(readonly=True))  # Cursors only live inside a transaction
+        statement = await conn.prepare(query)
+        cursor = await statement.cursor(*args)
+        first = await cursor.fetch(STREAM_BATCH)
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    if not first:
+        await stack.aclose()
+        return None
+
+    async def batches():
+        try:
+            batch = first
+            while batch:
+                yield batch
+                batch = await cursor.fetch(STREAM_BATCH)
         finally:
-            cursor.close()
-            conn.close()
-
-    def load_data_from_memory(data, table_name, cursor, user_id, solution_id='temp_sol'):
-        success_count = 0
-        fail_count = 0
-
-        for entry in data:
-            try:
-                entry['user_id'] = user_id
-                entry['solution_id'] = solution_id
-
-                if table_name in ['students', 'teachers']:
-                    for field in ['availability', 'antiquity', 'siblings', 'courses', 'instruments', 'contract', 'features', 'duration']:
-                        if field in entry:
-                            entry[field] = json.dumps(entry[field])
-                elif table_name in ['rooms', 'courses', 'instruments']:
-                    for field in ['features', 'duration']:
-                        if field in entry:
-                            entry[field] = json.dumps(entry[field])
-
-                keys = ', '.join(entry.keys())
-                values_placeholders = ', '.join(['%s'] * len(entry))
-                query = f"INSERT INTO {table_name} ({keys}) VALUES ({values_placeholders})"
-                cursor.execute(query, list(entry.values()))
-                success_count += 1
-            except Exception:
-                fail_count += 1
-                traceback.print_exc()
-
-    load_input_data_directly(user_id, input_data)
-
-    global process_ref
+            await stack.aclose()
 
-    def stream_output():
-        global process_ref
-        with lock:
-            if process_ref is not None:
-                yield "Another process is already running. Stop it first.\n"
-                return
-
-            process_ref = subprocess.Popen(
-                ["python", "-u", "model_appver.py", str(user_id)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-
-        for line in iter(process_ref.stdout.readline, ""):
-            yield line
-            process_ref.stdout.flush()
-
-        for line in iter(process_ref.stderr.readline, ""):
-            yield f"ERROR: {line}"
-            process_ref.stderr.flush()
-
-        with lock:
-            process_ref = None
+    columns = [(attribute.name, attribute.type.name) for attribute in statement.get_attributes() if attribute.name not in exclude]
+    headers = {"Content-Disposition": f"attachment; filename={filename}.{formats.EXTENSIONS[media_type]}"}
+    body = formats.encode(media_type, columns, batches())
+    if fill is not None:
+        body = await fill(body, headers)
+        if isinstance(body, Response):
+            return body
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
-    return StreamingResponse(stream_output(), media_type="text/plain")
 
+def not_acceptable():
+    return JSONResponse(status_code=406, content={"error": "Not acceptable", "formats": formats.supported_formats()})
+
+
+@app.on_event("shutdown")
+async def close_views_pool():
+    await close_async_pool()
 
-@app.post("/stop-model")
-def stop_model():
-    global process_ref
-    with lock: # Only one request can modidy process_ref at a time
-        if process_ref and process_ref.poll() is None:  # If running
-            process_ref.terminate()  # Graceful stop
-            process_ref.wait()  # Wait for cleanup
-            process_ref = None
-            return {"message": "Model process stopped."}
-        return {"message": "No process is running."}
+
+async def bundle_response(user_id, solution_id, if_none_match=None):
+    ''' Everything the solution screen shows (assignments, insights, student counts, the five index mappings and the time grid the
+    time slots refer to) in one response, read on one connection from one snapshot. Runs stored without their grid are drawn on the
+    default one. Answers 404 with the missing sections if the solution does not exist or is incomplete, so it also does the job of
+    validate-solution. '''
+    key = (user_id, solution_id, "bundle")
+    if cacheable(solution_id):
+        entry = response_cache.get(key)
+        if entry is not None:
+            return cached_response(entry, if_none_match)
+    generation = response_cache.generation(user_id, solution_id)
+
+    bundle = {"user_id": user_id, "solution_id": solution_id}
+    async with async_connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            for section, table in SOLUTION_BUNDLE.items():
+                bundle[section] = await fetch_columnar(conn, table, user_id, solution_id)
+            time_grid = await conn.fetchval(f"SELECT time_grid FROM solution_runs WHERE {SOLUTION_ROWS}", user_id, solution_id)
+    bundle["time_grid"] = json.loads(time_grid) if time_grid is not None else DEFAULT_GRID.spec()
+
+    missing = [section for section in SOLUTION_BUNDLE if not bundle[section]["rows"]]
+    if missing:
+        return JSONResponse(status_code=404, content={"error": "Saved solution not found or incomplete.", "missing": missing})
+
+    body = json.dumps(bundle, separators=(",", ":"), default=formats.json_value).encode("utf-8")
+    if not cacheable(solution_id):
+        return Response(content=body, media_type=formats.JSON)
+    return cached_response(response_cache.put(key, body, formats.JSON, generation=generation), if_none_match)
+
+
+@app.get("/solution-bundle")
+async def get_solution_bundle(user_id: int, solution_id: str, if_none_match: str = Header(default=None)):
+    ''' GET version of /solution-bundle, which the browser revalidates with If-None-Match on its own. '''
+    return await bundle_response(user_id, solution_id, if_none_match)
+
+
+@app.post("/solution-bundle")
+async def solution_bundle(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await bundle_response(request.user_id, request.solution_id, if_none_match)
 
 
 @app.post("/validate-solution")
-def validate_solution(payload: dict = Body(...)):
+async def validate_solution(payload: dict = Body(...)):
     user_id = payload["user_id"]
     solution_id = payload["solution_id"]
 
@@ -171,525 +407,203 @@ def validate_solution(payload: dict = Body(...)):
     ]
 
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-
-        for table in tables_required:
-            cursor.execute(
-                f"SELECT 1 FROM {table} WHERE user_id = %s AND solution_id = %s LIMIT 1",
-                (user_id, solution_id)
-            )
-            if not cursor.fetchone():
-                cursor.close()
-                conn.close()
-                return {"valid": False}
-
-        cursor.close()
-        conn.close()
+        async with async_connection() as conn:
+            for table in tables_required:
+                found = await conn.fetchval(
+                    f"SELECT 1 FROM {table} WHERE {SOLUTION_ROWS} LIMIT 1",
+                    int(user_id), solution_id
+                )
+                if found is None:
+                    return {"valid": False}
+
         return {"valid": True}
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.post("/get-solution")
-def get_solution(solutionId: str = Body(..., media_type="text/plain")):
-    conn = connect_to_db()
-    cursor = conn.cursor()
+async def get_solution(solutionId: str = Body(..., media_type="text/plain"), accept: str = Header(default="")):
+    ''' Assignments of the last run, as CSV, columnar JSON or Arrow depending on the Accept header. '''
+    media_type = formats.negotiate(accept)
+    if media_type is None:
+        return not_acceptable()
 
     try:
-        cursor.execute("""
+        response = await stream_rows("""
             SELECT class_name, start_time, end_time, room_id, max_capacity, current_capacity,
                    teacher_id, contract_type, load, student_id,
                    instrument_penalty, antiquity_day_penalty,
                    antiquity_deviation_penalty, sibling_mismatch_penalty
             FROM temp_solution_assignments
-        """)
-        rows = cursor.fetchall()
+        """, (), media_type, "model_solution_appver")
 
-        with open("C:/Users/joanm/Documents/SCHEDULER/debug_rows_count.txt", "w") as f:
-            f.write(f"Row count: {len(rows)}\n")
-
-        if not rows:
+        if response is None:
             return {"message": "No temporary solution available."}
 
-        colnames = [desc[0] for desc in cursor.description]
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(colnames)
-        writer.writerows(rows)
-        output.seek(0)
-
-        return StreamingResponse(output, media_type="text/csv", headers={
-            "Content-Disposition": "attachment; filename=model_solution_appver.csv"
-        })
+        return response
 
     except Exception as e:
         return {"message": f"An error occurred: {str(e)}"}
 
 
 @app.post("/custom-get-solution")
-def custom_get_solution(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("SELECT * FROM solution_assignments WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-        filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-        if not filtered_colnames:
-            return {"message": "Saved solution not found."}
-
-        col_str = ", ".join(filtered_colnames)
-        cursor.execute(
-            f"SELECT {col_str} FROM solution_assignments WHERE user_id = %s AND solution_id = %s",
-            (user_id, solution_id)
-        )
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {"message": "Saved solution not found."}
-
-        colnames = [desc[0] for desc in cursor.description]
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(colnames)
-        writer.writerows(rows)
-        output.seek(0)
+async def custom_get_solution(request: APIcallRequest, accept: str = Header(default=""), if_none_match: str = Header(default=None)):
+    ''' Assignments of a saved solution, as CSV, columnar JSON or Arrow depending on the Accept header. The first read of a saved
+    solution is read whole into the response cache and sent from there with its ETag, later ones come from the cache directly. A
+    solution too large for the cache, and temp_sol, are streamed. '''
+    media_type = formats.negotiate(accept)
+    if media_type is None:
+        return not_acceptable()
+
+    fill = None
+    if cacheable(request.solution_id):
+        key = (request.user_id, request.solution_id, f"solution_assignments:{media_type}")
+        entry = response_cache.get(key)
+        if entry is not None:
+            return cached_response(entry, if_none_match)
+        generation = response_cache.generation(request.user_id, request.solution_id)
+
+        async def fill(body, headers):
+            entry, body = await response_cache.fill(key, body, media_type, headers, generation)
+            return body if entry is None else cached_response(entry, if_none_match)
+
+    response = await stream_rows(
+        f"SELECT * FROM solution_assignments WHERE {SOLUTION_ROWS}", (request.user_id, request.solution_id),
+        media_type, "model_solution_appver", exclude=SAVED_KEYS, fill=fill
+    )
+    if response is None:
+        return {"message": "Saved solution not found."}
 
-        return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=model_solution_appver.csv"})
+    return response
 
-    except ValueError:
-        return {"message": "Invalid solution selection (must be integer)."}
 
 @app.get("/get-insights")
-def get_insights():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_solution_insights")
-    rows = cursor.fetchall()
-
+async def get_insights():
+    rows = await fetch_rows("SELECT * FROM temp_solution_insights")
     if not rows:
         return {"message": "No temporary insights available."}
 
-    colnames = [desc[0] for desc in cursor.description]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(colnames)
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=model_insights_appver.csv"})
+    return csv_response(rows, "model_insights_appver.csv")
 
 
 @app.post("/custom-get-insights")
-def custom_get_insights(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("SELECT * FROM solution_insights WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-        filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-        if not filtered_colnames:
-            return {"message": "Saved solution not found."}
-
-        col_str = ", ".join(filtered_colnames)
-        cursor.execute(
-            f"SELECT {col_str} FROM solution_insights WHERE user_id = %s AND solution_id = %s",
-            (user_id, solution_id)
-        )
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {"message": "Saved insights not found."}
-
-        colnames = [desc[0] for desc in cursor.description]
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(colnames)
-        writer.writerows(rows)
-        output.seek(0)
-
-        return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=model_insights_appver.csv"})
-
-    except ValueError:
-        return {"message": "Invalid solution selection (must be integer)."}
+async def custom_get_insights(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("solution_insights", request.user_id, request.solution_id, "model_insights_appver.csv",
+                            "Saved insights not found.", if_none_match)
 
 
 @app.get("/get-student-names")
-def get_student_names():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_student_index_mapping")
-    rows = cursor.fetchall()
-
+async def get_student_names():
+    rows = await fetch_rows("SELECT * FROM temp_student_index_mapping")
     if not rows:
         return {"message": "Student names not found."}
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=student_index_mapping.csv"})
+    return csv_response(rows, "student_index_mapping.csv")
 
 
 @app.post("/custom-get-student-names")
-def custom_get_student_names(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM student_index_mapping WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-    filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-    if not filtered_colnames:
-        return {"message": "Saved solution not found."}
-
-    # Step 2: Fetch only the filtered columns
-    col_str = ", ".join(filtered_colnames)
-    cursor.execute(
-        f"SELECT {col_str} FROM student_index_mapping WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    rows = cursor.fetchall()
-
-    if not rows:
-        return {"message": "Student names not found."}
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=student_index_mapping.csv"})
+async def custom_get_student_names(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("student_index_mapping", request.user_id, request.solution_id, "student_index_mapping.csv",
+                            "Student names not found.", if_none_match)
 
 
 @app.get("/get-teacher-names")
-def get_teacher_names():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_teacher_index_mapping")
-    rows = cursor.fetchall()
-
+async def get_teacher_names():
+    rows = await fetch_rows("SELECT * FROM temp_teacher_index_mapping")
     if not rows:
         return {"message": "Teacher names not found."}
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=teacher_index_mapping.csv"})
+    return csv_response(rows, "teacher_index_mapping.csv")
 
 
 @app.post("/custom-get-teacher-names")
-def custom_get_teacher_names(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM teacher_index_mapping WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-    filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-    if not filtered_colnames:
-        return {"message": "Saved solution not found."}
-
-    col_str = ", ".join(filtered_colnames)
-    cursor.execute(
-        f"SELECT {col_str} FROM teacher_index_mapping WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    rows = cursor.fetchall()
-
-    if not rows:
-        return {"message": "Teacher names not found."}
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=teacher_index_mapping.csv"})
+async def custom_get_teacher_names(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("teacher_index_mapping", request.user_id, request.solution_id, "teacher_index_mapping.csv",
+                            "Teacher names not found.", if_none_match)
 
 
 @app.get("/get-room-names")
-def get_room_names():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_room_index_mapping")
-    rows = cursor.fetchall()
-
+async def get_room_names():
+    rows = await fetch_rows("SELECT * FROM temp_room_index_mapping")
     if not rows:
         return {"message": "Room names not found."}
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=room_index_mapping.csv"})
+    return csv_response(rows, "room_index_mapping.csv")
 
 
 @app.post("/custom-get-room-names")
-def custom_get_room_names(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM room_index_mapping WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-    filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-    if not filtered_colnames:
-        return {"message": "Saved solution not found."}
-
-    col_str = ", ".join(filtered_colnames)
-    cursor.execute(
-        f"SELECT {col_str} FROM room_index_mapping WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    rows = cursor.fetchall()
-
-    if not rows:
-        return {"message": "Room names not found."}
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=room_index_mapping.csv"})
+async def custom_get_room_names(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("room_index_mapping", request.user_id, request.solution_id, "room_index_mapping.csv",
+                            "Room names not found.", if_none_match)
 
 
 @app.get("/get-course-names")
-def get_course_names():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_course_index_mapping")
-    rows = cursor.fetchall()
-
+async def get_course_names():
+    rows = await fetch_rows("SELECT * FROM temp_course_index_mapping")
     if not rows:
         return {"message": "Course names not found."}
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=course_index_mapping.csv"})
+    return csv_response(rows, "course_index_mapping.csv")
 
 
 @app.post("/custom-get-course-names")
-def custom_get_course_names(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM course_index_mapping WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-    filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-    if not filtered_colnames:
-        return {"message": "Saved solution not found."}
-
-    col_str = ", ".join(filtered_colnames)
-    cursor.execute(
-        f"SELECT {col_str} FROM course_index_mapping WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    rows = cursor.fetchall()
-
-    if not rows:
-        return {"message": "Course names not found."}
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=course_index_mapping.csv"})
+async def custom_get_course_names(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("course_index_mapping", request.user_id, request.solution_id, "course_index_mapping.csv",
+                            "Course names not found.", if_none_match)
 
 
 @app.get("/get-instrument-names")
-def get_instrument_names():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_instrument_index_mapping")
-    rows = cursor.fetchall()
-
+async def get_instrument_names():
+    rows = await fetch_rows("SELECT * FROM temp_instrument_index_mapping")
     if not rows:
         return {"message": "Instrument names not found."}
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=instrument_index_mapping.csv"})
+    return csv_response(rows, "instrument_index_mapping.csv")
 
 
 @app.post("/custom-get-instrument-names")
-def custom_get_instrument_names(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM instrument_index_mapping WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-    filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-    if not filtered_colnames:
-        return {"message": "Saved solution not found."}
-
-    # Step 2: Fetch only the filtered columns
-    col_str = ", ".join(filtered_colnames)
-    cursor.execute(
-        f"SELECT {col_str} FROM instrument_index_mapping WHERE user_id = %s AND solution_id = %s",
-        (user_id, solution_id)
-    )
-    rows = cursor.fetchall()
-
-    if not rows:
-        return {"message": "Instrument names not found."}
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([desc[0] for desc in cursor.description])
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=instrument_index_mapping.csv"})
+async def custom_get_instrument_names(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("instrument_index_mapping", request.user_id, request.solution_id, "instrument_index_mapping.csv",
+                            "Instrument names not found.", if_none_match)
 
 
 @app.get("/get-student-count")
-def get_student_count():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM temp_student_count")
-    rows = cursor.fetchall()
-
+async def get_student_count():
+    rows = await fetch_rows("SELECT * FROM temp_student_count")
     if not rows:
         return {"message": "No temporary student count available."}
 
-    colnames = [desc[0] for desc in cursor.description]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(colnames)
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=student_count.csv"})
+    return csv_response(rows, "student_count.csv")
 
 
 @app.post("/custom-get-student-count")
-def custom_get_student_count(request: APIcallRequest):
-    user_id = request.user_id
-    solution_id = request.solution_id
-    
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("SELECT * FROM student_count WHERE user_id = %s AND solution_id = %s LIMIT 1", (user_id, solution_id))
-        filtered_colnames = [desc[0] for desc in cursor.description if desc[0] not in ('solution_id', 'user_id', 'id')]
-        if not filtered_colnames:
-            return {"message": "Saved solution not found."}
-
-        col_str = ", ".join(filtered_colnames)
-        cursor.execute(
-        f"SELECT {col_str} FROM student_count WHERE user_id = %s AND solution_id = %s",
-            (user_id, solution_id)
-        )
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {"message": "Saved student count not found."}
-
-        colnames = [desc[0] for desc in cursor.description]
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(colnames)
-        writer.writerows(rows)
-        output.seek(0)
-
-        return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=student_count.csv"})
-
-    except ValueError:
-        return {"message": "Invalid solution selection (must be integer)."}
+async def custom_get_student_count(request: APIcallRequest, if_none_match: str = Header(default=None)):
+    return await saved_view("student_count", request.user_id, request.solution_id, "student_count.csv",
+                            "Saved student count not found.", if_none_match)
 
 
+# |||||||||| SAVED SOLUTIONS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 @app.post("/save-solution")
 def save_solution(payload: dict = Body(...)):
+    ''' Save the last run under a name, once it is complete. The name is pointed to the run of temp_sol (see runs.py), so nothing is
+    copied and saving takes the same time whatever the size of the solution. '''
     user_id = payload["user_id"]
     new_solution_id = payload["solution_id"]
-    temp_solution_id = "temp_sol"
-
-    tables = [
-        "solution_assignments",
-        "solution_insights",
-        "student_index_mapping",
-        "teacher_index_mapping",
-        "course_index_mapping",
-        "room_index_mapping",
-        "instrument_index_mapping",
-        "student_count",
-    ]
 
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO solutions (user_id, solution_id)
-            VALUES (%s, %s)
-            ON CONFLICT DO NOTHING
-        """, (user_id, new_solution_id))
-
-        for table in tables:
-            cursor.execute(f"SELECT * FROM {table} LIMIT 0")
-            cols = [desc[0] for desc in cursor.description]
-            insert_cols = [col for col in cols if col != "id"]
-
-            cursor.execute(f"""
-                DELETE FROM {table}
-                WHERE user_id = %s AND solution_id = %s
-            """, (user_id, new_solution_id))
-
-            insert_cols_str = ", ".join(insert_cols)
-            select_cols_str = ", ".join([
-                "%s AS user_id" if col == "user_id" else
-                "%s AS solution_id" if col == "solution_id" else
-                col
-                for col in insert_cols
-            ])
-
-            cursor.execute(f"""
-                INSERT INTO {table} ({insert_cols_str})
-                SELECT {select_cols_str}
-                FROM {table}
-                WHERE user_id = %s AND solution_id = %s
-            """, (user_id, new_solution_id, user_id, temp_solution_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+
+            run_id = solution_run(cursor, user_id, TEMP_SOLUTION)
+            if run_id is None:
+                return JSONResponse(status_code=404, content={"error": "No temporary solution to save."})
+            if not run_complete(cursor, run_id):  # Its job is still writing it, or failed
+                return JSONResponse(status_code=409, content={"error": "The last run has not finished."})
+            point_solution(cursor, user_id, new_solution_id, run_id)
+
+            conn.commit()
+            cursor.close()
+        response_cache.invalidate(int(user_id), new_solution_id)
         return {"message": f"Solution '{new_solution_id}' saved successfully from 'temp_sol'."}
 
     except Exception as e:
@@ -697,15 +611,9 @@ def save_solution(payload: dict = Body(...)):
 
 
 @app.get("/get-solutions-list")
-def get_solutions_list(user_id: str):
+async def get_solutions_list(user_id: int):
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT solution_id FROM solutions WHERE user_id = %s ORDER BY created_at DESC;", (user_id,))
-        rows = cursor.fetchall()
-        solution_ids = [row[0] for row in rows]
-        cursor.close()
-        conn.close()
+        rows = await fetch_rows("SELECT solution_id FROM solutions WHERE user_id = $1 ORDER BY created_at DESC;", user_id)
 
         solution_ids = [row[0] for row in rows if row[0] != "temp_sol"]
         return solution_ids
@@ -720,28 +628,14 @@ def delete_solution(payload: dict = Body(...)):
     solution_id = payload["solution_id"]
 
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-
-        tables = [
-            "solution_assignments",
-            "solution_insights",
-            "room_index_mapping",
-            "student_index_mapping",
-            "teacher_index_mapping",
-            "instrument_index_mapping",
-            "course_index_mapping",
-            "student_count"
-        ]
-
-        for table in tables:
-            cursor.execute(f"DELETE FROM {table} WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-
-        cursor.execute("DELETE FROM solutions WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+
+            drop_solution(cursor, user_id, solution_id)  # Its run is deleted too, unless another solution points to it
+
+            conn.commit()
+            cursor.close()
+        response_cache.invalidate(int(user_id), solution_id)
         return JSONResponse(status_code=200, content={"message": "Deleted successfully."})
 
     except Exception as e:
@@ -7,36 +7,34 @@
 # |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 import pandas as pd
 import json
-import psycopg2
 import numpy as np
 import math
 import sys
+import argparse
 import builtins
 
 
 # |||||||||| IMPORT FUNCTIONS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 import solution as sol
+from db import connection
+from runs import solution_run, set_run_grid
+import progress
 from model_body_appver import (
+    ENGINES,
     load_data,
     create_model,
+    set_objective,
+    previous_solution_hints,
     solve_warm_start,
     solve_model,
 )
+from hints import build_hints, report_hints
+from incremental import freeze_unchanged
+from decompose import solve_clusters, reconcile
+from model_cache import cached_create_model, store_solution
 
-from load_input import load_input_data
-
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
-conn = connect_to_db()
-cursor = conn.cursor()
+from load_input import load_input_data, load_input_file
+from time_grid import TimeGrid, DAYS, OPEN_TIME, CLOSE_TIME, SLOT_MINUTES
 
 DEBUG_FILE = r"c:\Users\joanm\Documents\SCHEDULER DATA\debug_file.txt"
 
@@ -57,24 +55,66 @@ def print(*args, **kwargs):
         f.write(output)
 
 def main():
-    user_id = None
-    if len(sys.argv) > 1:
-        user_id = sys.argv[1]
-    print(f"Received user_id: {user_id}")
-
-    return user_id
+    parser = argparse.ArgumentParser(description='Load, create and solve the schedule of a user.')
+    parser.add_argument('user_id', nargs='?', default=None)
+    parser.add_argument('--run-id', type=int, default=None, help='run holding the input, which the results are written to (default: the run of temp_sol)')
+    parser.add_argument('--engine', choices=ENGINES, default='grid', help='formulation used for overlaps and capacity')
+    parser.add_argument('--days', default=','.join(DAYS), help='comma separated days of the time grid')
+    parser.add_argument('--open', default=OPEN_TIME, help='opening time of every day (HH:MM)')
+    parser.add_argument('--close', default=CLOSE_TIME, help='closing time of every day (HH:MM)')
+    parser.add_argument('--slot-minutes', type=int, default=SLOT_MINUTES, help='length of a time slot in minutes')
+    parser.add_argument('--workers', type=int, default=8, help='number of CP-SAT search workers')
+    parser.add_argument('--events', default=None, help='file the progress events of the run are written to (NDJSON)')
+    parser.add_argument('--input', default=None, help='validated input file to preprocess instead of reading the input tables')
+    parser.add_argument('--snapshot-interval', type=float, default=0, help='seconds between snapshots of the incumbent schedule (0: none)')
+    parser.add_argument('--hint-solution', default=None, help='saved solution whose classes are hinted to the solver')
+    parser.add_argument('--no-antiquity-hints', action='store_true', help="do not hint last year's classes of the students")
+    parser.add_argument('--reference-solution', default=None, help='saved solution to keep, only solving again what the input changes touch')
+    parser.add_argument('--decompose', action='store_true', help='solve the independent clusters of students in parallel first')
+    parser.add_argument('--weights', type=json.loads, default=None, help='JSON weights of some objective components, e.g. {"antiquity_day": 5}')
+    args = parser.parse_args()
+    progress.open_events(args.events)
+    grid = TimeGrid(args.days.split(','), args.open, args.close, args.slot_minutes)
+    run_id = args.run_id
+    if run_id is None:
+        with connection() as conn:
+            cursor = conn.cursor()
+            run_id = solution_run(cursor, args.user_id)
+            cursor.close()
+    print(f"Received user_id: {args.user_id}")
+    print(f"Run: {run_id}")
+    print(f"Model engine: {args.engine}")
+    print(f"Time grid: {grid}")
+    print(f"Search workers: {args.workers}")
+
+    print(f"Input: {args.input or 'database'}")
+    print(f"Hints: {args.hint_solution or 'no saved solution'}, {'no antiquity' if args.no_antiquity_hints else 'antiquity'}")
+    print(f"Reference solution: {args.reference_solution or 'none (full run)'}")
+    print(f"Objective weights: {args.weights or 'default'}")
+    print(f"Decomposition: {'yes' if args.decompose else 'no'}")
+
+    return args.user_id, run_id, args.engine, grid, max(1, args.workers), args.input, max(0, args.snapshot_interval), args.hint_solution, not args.no_antiquity_hints, args.reference_solution, args.weights, args.decompose
     
 
 # |||||||||| LOAD, CREATE AND SOLVE ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 # Get user ID
-user_id = main()
+user_id, run_id, engine, grid, num_workers, input_path, snapshot_interval, hint_solution, use_antiquity_hints, reference_solution, weights, decompose = main()
 #user_id = '1' ####################### REMOVE
 
 # Load input data to the database
 #load_input_data(user_id)  # NOW DONE ON ENDPOINT
 
-# Load and preprocess input data from the database
-student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity = load_data(user_id)
+# The time grid is stored with the run, so its slots are read right when it is used as hints, as a reference or in the UI
+with connection() as conn:
+    cursor = conn.cursor()
+    set_run_grid(cursor, run_id, grid)
+    conn.commit()
+    cursor.close()
+
+# Load and preprocess input data (from the input file of the job, or from the database)
+with progress.phase('preprocess'):
+    input_frames = load_input_file(input_path) if input_path else None  # Input handed over by the job, if any
+    student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity, antiquity_starts = load_data(user_id, run_id, grid, input_frames)
 
 # Show all columns
 pd.set_option('display.max_columns', None)
@@ -82,21 +122,61 @@ pd.set_option('display.max_columns', None)
 print(priorities)
 print(course_continuity)
 
-# Create model
-model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w = create_model(student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity)
-
-warm_start_solution = {}
-# Generate warm start (DEACTIVATED)
-#warm_start_solution = solve_warm_start(warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w, student_availability, courses, instruments, num_students, num_teachers, num_rooms, num_slots, num_courses, num_instruments)
+# Solve the independent clusters of the instance in parallel (see decompose.py). An incremental run is already solved piecewise
+decomposition = None
+if decompose and not reference_solution:
+    with progress.phase('decompose'):
+        decomposition = solve_clusters((student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity), engine, grid, num_workers)
+
+# Create model (or load it from the model cache, see model_cache.py)
+with progress.phase('model'):
+    model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w = cached_create_model(student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity, engine=engine, grid=grid)
+
+# Objective weights of the run. The model (cached or not) is built with the default ones, and only its objective changes
+if weights:
+    print(f"Objective weights: {set_objective(model, weights)}")
+
+# Hint the classes of a saved solution and last year's classes (see hints.py). An incremental run is hinted with its reference. Without
+# a saved solution, a model loaded from the cache is hinted with the whole best solution of its last run (see model_cache.py)
+hint_solution = reference_solution or hint_solution
+with progress.phase('hints'):
+    hints = {} if hint_solution else previous_solution_hints(model, gx, gx2, gy, gy2, gz, gz2)
+    if hints:
+        report_hints("previous", len(hints), len(hints))
+    else:
+        hints = build_hints(user_id, run_id, gx, gx2, gy, gy2, gz, gz2, antiquity_starts if use_antiquity_hints else None, hint_solution)
+
+# Incremental run: keep the classes of the reference solution that the input changes do not touch (see incremental.py)
+frozen = 0
+if reference_solution:
+    with progress.phase('freeze'):
+        frozen = freeze_unchanged(model, user_id, run_id, reference_solution, gx, gx2, gy, gy2, gz, gz2, hints, input_frames)
+
+# Decomposed run: keep the classes of the clusters, only solving again the students in room conflicts (see decompose.py)
+if decomposition:
+    with progress.phase('reconcile'):
+        cluster_hints, frozen = reconcile(model, gx, gx2, gy, gy2, gz, gz2, decomposition, courses, instruments, grid)
+        hints.update(cluster_hints)  # Merged: the saved solution and antiquity hints stay on every variable the clusters do not hint
+# Generate warm start (DEACTIVATED, replaced by the hints)
+#hints = solve_warm_start(warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w, student_availability, courses, instruments, num_students, num_teachers, num_rooms, num_slots, num_courses, num_instruments)
 
 # Solve model
-solution, penalties = solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, warm_start_solution, student_availability)
+with progress.phase('solve'):
+    solution, penalties = solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, hints, student_availability, num_workers, snapshot_interval)
+    if solution is None and frozen:
+        # The classes kept from the reference (or the clusters) do not fit anymore: solve the whole model
+        print('No solution with the frozen classes, solving the whole model')
+        model.ClearAssumptions()
+        solution, penalties = solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, hints, student_availability, num_workers, snapshot_interval)
+    store_solution(model)  # Hint of the next run of the same model, whatever its weights
 print(f'raw solution: {solution}')
 
 # |||||||||| FORMAT AND STORE SOLUTION |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+store_start = progress.start_phase('store')
+
 # SOLUTION ANALYSIS (solution.py)
 #solution, penalties = sol.load_data()
-class_groups = sol.structure_data(solution, penalties, courses, instruments, teacher_info)
+class_groups = sol.structure_data(solution, penalties, courses, instruments, teacher_info, grid)
 print(f'raw class groups: {class_groups}')
 
 # Display students that are missing assignments
@@ -128,7 +208,7 @@ insights = {
     "Student Distribution Score": sol.student_distribution_score(class_groups),
     "Room Utilization Rate": sol.room_utilization_rate(class_groups),
     "Peak Hour Congestion": sol.peak_hour_congestion(class_groups),
-    "Room Underuse": sol.room_underuse(class_groups),
+    "Room Underuse": sol.room_underuse(class_groups, grid),
     "Missing Course Students": missing_course_students,
     "Missing Instrument Students": missing_instrument_students,
     "Antiquiy Penalties": antiquity_penalty_dict,
@@ -144,40 +224,40 @@ print(class_groups)
 # ///
 
 class_groups.to_csv("debug_model_solution.csv", index=False)
-conn = connect_to_db()
-cursor = conn.cursor()
+# The results are written to the run this input was loaded into (see runs.py), wherever temp_sol points by now
+with connection() as conn:
+    cursor = conn.cursor()
 
-cursor.execute("""
-    DELETE FROM solution_assignments
-    WHERE user_id = %s AND solution_id = %s
-""", (user_id, 'temp_sol'))
-
-for _, row in class_groups.iterrows():
     cursor.execute("""
-        INSERT INTO solution_assignments (
-            user_id, solution_id,
-            class_name, start_time, end_time, room_id, max_capacity, current_capacity,
-            teacher_id, contract_type, load, student_id,
-            instrument_penalty, antiquity_day_penalty,
-            antiquity_deviation_penalty, sibling_mismatch_penalty
-        ) VALUES (
-            %s, %s,
-            %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s,
-            %s, %s
-        )
-    """, (
-        user_id, 'temp_sol',
-        row["CLASS"], row["START TIME"], row["END TIME"], row["ROOM"], row["MAX CAPACITY"], row["CURRENT CAPACITY"],
-        row["TEACHER"], row["CONTRACT"], row["LOAD"], row["STUDENT"],
-        row["INSTRUMENT PENALTY"], row["ANTIQUITY DAY PENALTY"],
-        row["ANTIQUITY DEVIATION PENALTY"], row["SIBLING MISMATCH PENALTY"]
-    ))
-
-conn.commit()
-cursor.close()
-conn.close()
+        DELETE FROM solution_assignments
+        WHERE run_id = %s
+    """, (run_id,))
+
+    for _, row in class_groups.iterrows():
+        cursor.execute("""
+            INSERT INTO solution_assignments (
+                user_id, run_id,
+                class_name, start_time, end_time, room_id, max_capacity, current_capacity,
+                teacher_id, contract_type, load, student_id,
+                instrument_penalty, antiquity_day_penalty,
+                antiquity_deviation_penalty, sibling_mismatch_penalty
+            ) VALUES (
+                %s, %s,
+                %s, %s, %s, %s, %s, %s,
+                %s, %s, %s, %s,
+                %s, %s,
+                %s, %s
+            )
+        """, (
+            user_id, run_id,
+            row["CLASS"], row["START TIME"], row["END TIME"], row["ROOM"], row["MAX CAPACITY"], row["CURRENT CAPACITY"],
+            row["TEACHER"], row["CONTRACT"], row["LOAD"], row["STUDENT"],
+            row["INSTRUMENT PENALTY"], row["ANTIQUITY DAY PENALTY"],
+            row["ANTIQUITY DEVIATION PENALTY"], row["SIBLING MISMATCH PENALTY"]
+        ))
+
+    conn.commit()
+    cursor.close()
 
 # Prepare insights for CSV
 insights_data = {
@@ -247,26 +327,25 @@ values = (
 for i, v in enumerate(values):
     print(f"Value {i}: {v} (type: {type(v)})")
 
-conn = connect_to_db()
-cursor = conn.cursor()
+with connection() as conn:
+    cursor = conn.cursor()
 
-cursor.execute("""
-    DELETE FROM solution_insights
-    WHERE user_id = %s AND solution_id = %s
-""", (user_id, 'temp_sol'))
+    cursor.execute("""
+        DELETE FROM solution_insights
+        WHERE run_id = %s
+    """, (run_id,))
 
-cursor.execute("""
-    INSERT INTO solution_insights (
-        user_id, solution_id,
-        workload_balance_index, daily_workload_deviation, underutilized_teachers,
-        overloaded_teachers, student_distribution_score, room_utilization_rate,
-        peak_hour_congestion, room_underuse, missing_course_students, missing_instrument_students
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-""", (user_id, 'temp_sol') + values)
+    cursor.execute("""
+        INSERT INTO solution_insights (
+            user_id, run_id,
+            workload_balance_index, daily_workload_deviation, underutilized_teachers,
+            overloaded_teachers, student_distribution_score, room_utilization_rate,
+            peak_hour_congestion, room_underuse, missing_course_students, missing_instrument_students
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (user_id, run_id) + values)
 
-conn.commit()
-cursor.close()
-conn.close()
+    conn.commit()
+    cursor.close()
 
 # print in CMD to debug (remove afterwards)
 # ///
@@ -274,27 +353,28 @@ for key, value in insights.items():
     print(f"{key}:\n{value}\n")
 # ///
 
-student_count = sol.count_students_per_timeslot(class_groups)
+student_count = sol.count_students_per_timeslot(class_groups, grid)
 student_count_df = pd.DataFrame(list(student_count.items()), columns=["Time Slot", "Students"])
 #student_count_df.to_csv("student_count.csv", index=False, quotechar='"')
 
-conn = connect_to_db()
-cursor = conn.cursor()
+with connection() as conn:
+    cursor = conn.cursor()
 
-cursor.execute("""
-    DELETE FROM student_count
-    WHERE user_id = %s AND solution_id = %s
-""", (user_id, 'temp_sol'))
+    cursor.execute("""
+        DELETE FROM student_count
+        WHERE run_id = %s
+    """, (run_id,))
 
-for _, row in student_count_df.iterrows():
-    time_slot = int(row["Time Slot"]) if pd.notna(row["Time Slot"]) else None
-    students = int(row["Students"]) if pd.notna(row["Students"]) else None
+    for _, row in student_count_df.iterrows():
+        time_slot = int(row["Time Slot"]) if pd.notna(row["Time Slot"]) else None
+        students = int(row["Students"]) if pd.notna(row["Students"]) else None
 
-    cursor.execute("""
-        INSERT INTO student_count (time_slot, students, user_id, solution_id)
-        VALUES (%s, %s, %s, %s)
-    """, (time_slot, students, user_id, 'temp_sol'))
+        cursor.execute("""
+            INSERT INTO student_count (time_slot, students, user_id, run_id)
+            VALUES (%s, %s, %s, %s)
+        """, (time_slot, students, user_id, run_id))
+
+    conn.commit()
+    cursor.close()
 
-conn.commit()
-cursor.close()
-conn.close()
\ No newline at end of file
+progress.end_phase('store', store_start)
@@ -12,28 +12,30 @@ import logging
 import ast
 import time
 import json
-import psycopg2
 
 
 # |||||||||| IMPORT FUNCTIONS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 import constraints as cns
+from db import connection
+import progress
 
 from preprocess_school import load_school_data
 from preprocess_students import load_students_data
 from preprocess_teachers import load_teachers_data
+from time_grid import DEFAULT_GRID
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
+# Available formulations for overlaps and capacity (see create_model)
+ENGINES = ('grid', 'interval')
 
-conn = connect_to_db()
-cursor = conn.cursor()
+# Components of the objective and their default weights (see set_objective). Assignments are rewarded, the rest are penalties
+OBJECTIVE_WEIGHTS = {
+    'assignments': 10,
+    'instrument_priority': 7,
+    'sibling_mismatch': 4,
+    'antiquity_day': 2,
+    'antiquity_deviation': 1,
+}
+REWARDS = ('assignments',)
 
 
 # |||||||||| SETUP LOGGING ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
@@ -51,10 +53,13 @@ logging.basicConfig(filename="debug_log.txt", level=logging.DEBUG, filemode='w')
 
 
 # |||||||||| LOAD PREPROCESSED DATA |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
-def load_data(user_id):
-    rooms, courses, instruments, course_index_mapping, instrument_index_mapping, room_index_mapping = load_school_data(user_id)
-    teacher_availability, teacher_info, teacher_index_mapping = load_teachers_data(user_id)
-    student_availability, antiquity, priorities, siblings_df, course_continuity, student_index_mapping = load_students_data(user_id)
+def load_data(user_id, run_id, grid=DEFAULT_GRID, input_frames=None):
+    # The input is the one of the run (see runs.py), which the index mappings are written to. With input_frames (the run input as
+    # DataFrames, see load_input.input_frames) nothing is read back from the input tables
+    frames = input_frames or {}
+    rooms, courses, instruments, course_index_mapping, instrument_index_mapping, room_index_mapping = load_school_data(run_id, frames.get('rooms'), frames.get('courses'), frames.get('instruments'))
+    teacher_availability, teacher_info, teacher_index_mapping = load_teachers_data(run_id, grid, frames.get('teachers'))
+    student_availability, antiquity, priorities, siblings_df, course_continuity, student_index_mapping, antiquity_starts = load_students_data(run_id, grid, frames.get('students'))
     # Print all variables
     print("courses:", courses)
     print("instruments:", instruments)
@@ -102,64 +107,67 @@ def load_data(user_id):
     teacher_info = teacher_info.iloc[:2]
     rooms = rooms.iloc[:2]
 
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
-    # Delete existing rows for this user and solution in each mapping table before inserting
-    cursor.execute("DELETE FROM room_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, 'temp_sol'))
-    cursor.execute("DELETE FROM course_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, 'temp_sol'))
-    cursor.execute("DELETE FROM instrument_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, 'temp_sol'))
-    cursor.execute("DELETE FROM student_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, 'temp_sol'))
-    cursor.execute("DELETE FROM teacher_index_mapping WHERE user_id = %s AND solution_id = %s", (user_id, 'temp_sol'))
-
-    for _, row in room_index_mapping.iterrows():
-        cursor.execute("""
-            INSERT INTO room_index_mapping (index, user_id, solution_id, room_id, name)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (row['index'], user_id, 'temp_sol', row['room_id'], row['name']))
-
-    for _, row in course_index_mapping.iterrows():
-        cursor.execute("""
-            INSERT INTO course_index_mapping (index, user_id, solution_id, course_id, name)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (row['index'], user_id, 'temp_sol', row['course_id'], row['name']))
-
-    for _, row in instrument_index_mapping.iterrows():
-        cursor.execute("""
-            INSERT INTO instrument_index_mapping (index, user_id, solution_id, instrument_id, name)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (row['index'], user_id, 'temp_sol', row['instrument_id'], row['name']))
-
-    for _, row in student_index_mapping.iterrows():
-        cursor.execute("""
-            INSERT INTO student_index_mapping (index, user_id, solution_id, student_id, name)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (row['index'], user_id, 'temp_sol', row['student_id'], row['name']))
-
-    for _, row in teacher_index_mapping.iterrows():
-        cursor.execute("""
-            INSERT INTO teacher_index_mapping (index, user_id, solution_id, teacher_id, name)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (row['index'], user_id, 'temp_sol', row['teacher_id'], row['name']))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    return student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity
+    with connection() as conn:
+        cursor = conn.cursor()
+
+        # The mappings replace any rows the run already has
+        cursor.execute("DELETE FROM room_index_mapping WHERE run_id = %s", (run_id,))
+        cursor.execute("DELETE FROM course_index_mapping WHERE run_id = %s", (run_id,))
+        cursor.execute("DELETE FROM instrument_index_mapping WHERE run_id = %s", (run_id,))
+        cursor.execute("DELETE FROM student_index_mapping WHERE run_id = %s", (run_id,))
+        cursor.execute("DELETE FROM teacher_index_mapping WHERE run_id = %s", (run_id,))
+
+        for _, row in room_index_mapping.iterrows():
+            cursor.execute("""
+                INSERT INTO room_index_mapping (index, user_id, run_id, room_id, name)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (row['index'], user_id, run_id, row['room_id'], row['name']))
+
+        for _, row in course_index_mapping.iterrows():
+            cursor.execute("""
+                INSERT INTO course_index_mapping (index, user_id, run_id, course_id, name)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (row['index'], user_id, run_id, row['course_id'], row['name']))
+
+        for _, row in instrument_index_mapping.iterrows():
+            cursor.execute("""
+                INSERT INTO instrument_index_mapping (index, user_id, run_id, instrument_id, name)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (row['index'], user_id, run_id, row['instrument_id'], row['name']))
+
+        for _, row in student_index_mapping.iterrows():
+            cursor.execute("""
+                INSERT INTO student_index_mapping (index, user_id, run_id, student_id, name)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (row['index'], user_id, run_id, row['student_id'], row['name']))
+
+        for _, row in teacher_index_mapping.iterrows():
+            cursor.execute("""
+                INSERT INTO teacher_index_mapping (index, user_id, run_id, teacher_id, name)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (row['index'], user_id, run_id, row['teacher_id'], row['name']))
+
+        conn.commit()
+        cursor.close()
+
+    return student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity, antiquity_starts
 
 
 # |||||||||| CREATE MODEL |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
-def create_model(student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity):
+def create_model(student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity, engine='grid', grid=DEFAULT_GRID):
     ''' Function used to create the model, including variable, constraint and objective function definition. The model is later solved
-    using the solve_model function. '''
+    using the solve_model function. The engine argument selects how overlaps and capacity are modelled: 'grid' states them as linear
+    constraints over every covered time slot, 'interval' uses optional interval variables with NoOverlap constraints. Both engines share
+    the session layer, which bounds class capacity. The time grid must be the one the availability matrices were built with. '''
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown model engine '{engine}', expected one of {ENGINES}")
     
     # Create a Constraint Problem optimization model
     model = cp_model.CpModel()
 
     num_students = student_availability.shape[0]
     num_teachers = teacher_availability.shape[0]
-    num_slots = student_availability.shape[1] - 1
+    num_slots = grid.num_slots
     num_courses = courses.shape[0]
     num_instruments = instruments.shape[0]
     num_rooms = rooms.shape[0]
@@ -181,161 +189,145 @@ def create_model(student_availability, antiquity, priorities, siblings_df, teach
 
     # |||||||||| CONSTRAINTS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
     print('START')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.initialize_variables(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, student_availability, teacher_availability)
-    print('initialization')
-    model, gx, gx2, gy, gy2, gz, gz2, y_ins, z_ins, continuity, course_priorization = cns.continuity_and_priorization(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, priorities, course_continuity, student_availability, courses, instruments, num_students, num_courses, num_slots, num_instruments)
-    print('continuity')
-    model, gx, gx2, gy, gy2, gz, gz2, st_valid_starting_slots, tch_valid_starting_slots = cns.student_class_duration(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, student_availability, teacher_availability, courses, instruments, num_students, num_courses, num_slots, num_instruments)
-    print('duration')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.single_class_type(model, gx, gx2, gy, gy2, gz, gz2, priorities, student_availability, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_slots, num_instruments, y_ins, z_ins, continuity, course_priorization)
-    print('type')
+    # Every step is a phase of the progress events of the run (see progress.py)
+    # Variable domain: every infeasible (s, e, r, c/i, t) tuple is filtered out before any variable is created
+    with progress.phase('continuity'):
+        y_ins, z_ins, continuity, course_priorization, requested_classes = cns.continuity_and_priorization(priorities, course_continuity, student_availability, courses, instruments, num_students, num_courses)
+    with progress.phase('duration'):
+        st_valid_starting_slots, tch_valid_starting_slots = cns.student_class_duration(student_availability, teacher_availability, courses, instruments, num_courses, grid, num_instruments)
+    with progress.phase('features'):
+        qualified_teachers = cns.teacher_qualifications(teacher_info, courses, instruments, num_teachers, num_courses, num_instruments)
+        feature_rooms = cns.features(courses, instruments, rooms, num_rooms, num_courses, num_instruments)
+    with progress.phase('initialization'):
+        domain = cns.variable_domain(num_students, requested_classes, st_valid_starting_slots, tch_valid_starting_slots, qualified_teachers, feature_rooms)
+        model, gx, gx2, gy, gy2, gz, gz2, registry = cns.initialize_variables(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, num_courses, num_instruments, domain, grid)
+    with progress.phase('sessions'):
+        model, gx, gx2, gy, gy2, gz, gz2 = cns.class_sessions(model, gx, gx2, gy, gy2, gz, gz2, registry, courses, instruments)
+    with progress.phase('type'):
+        model, gx, gx2, gy, gy2, gz, gz2 = cns.single_class_type(model, gx, gx2, gy, gy2, gz, gz2, registry, priorities, student_availability, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_slots, num_instruments, y_ins, z_ins, continuity, course_priorization)
     warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w = model, gx, gx2, gy, gy2, gz, gz2  # Store the model and its variables before adding more constraints
-    print('warm')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.priority_assignment(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots)
-    print('priority')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.student_overlaps(model, gx, gx2, gy, gy2, gz, gz2, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots)    
-    # THE OVERLAPS CONSTRAINT IS EXTREMELY UNDEROPTIMIZED, BUT I AM PRETTY SURE IT WORKS AS EXPECTED AT LAST
-    print('overlaps')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.contract(model, gx, gx2, gy, gy2, gz, gz2, teacher_info, courses, instruments, num_teachers, num_courses, num_slots, num_instruments, num_students, num_rooms)
-    print('contract')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.features(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, rooms, num_rooms, num_courses, num_instruments, num_slots, num_students, num_teachers)
-    print('features')
-    model, gx, gx2, gy, gy2, gz, gz2 = cns.class_capacity(model, gx, gx2, gy, gy2, gz, gz2, courses, instruments, num_teachers, num_rooms, num_students, num_courses, num_instruments, num_slots)
-    print('capacity')
-    model, gx, gx2, gy, gy2, gz, gz2, students_with_antiquity, day_penalties, deviation_penalties, first_class_time_var, deviation_var, students_with_antiquity = cns.antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, student_availability, antiquity, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms)
-    print('antiquity')
-    model, gx, gx2, gy, gy2, gz, gz2, siblings, total_sibling_penalty, sibling_day_penalties, siblings, sibling_day_vars, mismatch_vars = cns.siblings_soft (model, gx, gx2, gy, gy2, gz, gz2, siblings_df, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms)
-    print('siblings')
+    with progress.phase('priority'):
+        model, gx, gx2, gy, gy2, gz, gz2 = cns.priority_assignment(model, gx, gx2, gy, gy2, gz, gz2, registry, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots)
+    with progress.phase('overlaps'):
+        if engine == 'interval':
+            model, gx, gx2, gy, gy2, gz, gz2 = cns.interval_overlaps(model, gx, gx2, gy, gy2, gz, gz2, registry, num_students, num_teachers, num_rooms)
+        else:
+            model, gx, gx2, gy, gy2, gz, gz2 = cns.student_overlaps(model, gx, gx2, gy, gy2, gz, gz2, registry, num_teachers, num_rooms, courses, instruments, num_students, num_courses, num_slots, num_instruments, st_valid_starting_slots, tch_valid_starting_slots)
+        model, gx, gx2, gy, gy2, gz, gz2 = cns.biweekly_same_day(model, gx, gx2, gy, gy2, gz, gz2, registry, courses, instruments, num_students, num_courses, num_instruments)
+    with progress.phase('contract'):
+        model, gx, gx2, gy, gy2, gz, gz2 = cns.contract(model, gx, gx2, gy, gy2, gz, gz2, registry, teacher_info, courses, instruments, num_teachers, num_courses, num_slots, num_instruments, num_students, num_rooms)
+    with progress.phase('antiquity'):
+        model, gx, gx2, gy, gy2, gz, gz2, students_with_antiquity, day_penalties, deviation_penalties, first_class_time_var, deviation_var, students_with_antiquity = cns.antiquity_soft(model, gx, gx2, gy, gy2, gz, gz2, registry, student_availability, antiquity, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms)
+    with progress.phase('siblings'):
+        model, gx, gx2, gy, gy2, gz, gz2, siblings, total_sibling_penalty, sibling_day_penalties, siblings, sibling_day_vars, mismatch_vars = cns.siblings_soft (model, gx, gx2, gy, gy2, gz, gz2, registry, siblings_df, courses, instruments, num_students, num_courses, num_slots, num_instruments, num_teachers, num_rooms)
     print('FINISH')
 
 
     # |||||||||| OBJECTIVE FUNCTION ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
-    # Weights for the objective components
-    assignment_weight = 10
-    instrument_priority_penalty_weight = 7
-    sibling_day_mismatch_weight = 4
-    day_weight = 2
-    deviation_weight = 1
+    # Every component of the objective is an integer variable kept on the model (model.objective_components), so the objective can be
+    # stated again with other weights without building the model again (see set_objective). A run with other weights loads the built
+    # model from the model cache and restates its objective; it is rebuilt only when the cache is off or the entry was evicted
     
+    # Only classes starting on a time slot the student is available at count towards the objective
+    student_values = student_availability.values
+
     # Total successful assignments (courses and instruments)
-    total_assignments = (
-        sum(
-            gx[s, e, r, c, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for c in range(num_courses)
-            for t in range(num_slots)
-            if (s, e, r, c, t) in gx and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gx2[s, e, r, c, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for c in range(num_courses)
-            for t in range(num_slots)
-            if (s, e, r, c, t) in gx2 and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gy[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gy and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gy2[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gy2 and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gz[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gz and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gz2[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gz2 and student_availability.iloc[s, t] == 1
-        )
-    )
+    total_assignments = [
+        var for _, (s, e, r, k, t), var in registry.items()
+        if student_values[s, t] == 1
+    ]
 
     # Total low-priority instrument assignment (z and z2) penalties according to instrument priorization
-    total_instrument_priority_penalty = (
-        sum(
-            gz[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gz and student_availability.iloc[s, t] == 1
-        ) +
-        sum(
-            gz2[s, e, r, i, t] for s in range(num_students)
-            for e in range(num_teachers)
-            for r in range(num_rooms)
-            for i in range(num_instruments)
-            for t in range(num_slots)
-            if (s, e, r, i, t) in gz2 and student_availability.iloc[s, t] == 1
-        )
-    )
+    total_instrument_priority_penalty = [
+        var for _, (s, e, r, i, t), var in registry.items(('gz', 'gz2'))
+        if student_values[s, t] == 1
+    ]
 
     # Total penalties for days when classes should not have been scheduled according to antiquity
-    total_day_penalties = sum(
-        day_penalties[(s, day)]
-        for (s, day) in day_penalties
-    )
+    total_day_penalties = list(day_penalties.values())
 
     # Total deviation penalties for starting times according in matching days according to antiquity
-    total_time_deviation_penalties = sum(
-        deviation_penalties[(s, day)]
-        for (s, day) in deviation_penalties
-    )
+    total_time_deviation_penalties = list(deviation_penalties.values())
+
+    model.objective_components = {
+        'assignments': component_variable(model, 'assignments', total_assignments),
+        'instrument_priority': component_variable(model, 'instrument_priority', total_instrument_priority_penalty),
+        'antiquity_day': component_variable(model, 'antiquity_day', total_day_penalties),
+        'antiquity_deviation': component_variable(model, 'antiquity_deviation', total_time_deviation_penalties),
+        'sibling_mismatch': total_sibling_penalty,  # Already a variable (see constraints.siblings_soft)
+    }
 
     # Objective function: maximize assignments while minimizing penalties (maximizing student satisfaction)
-    model.Maximize(
-        assignment_weight * total_assignments
-        - instrument_priority_penalty_weight * total_instrument_priority_penalty
-        - day_weight * total_day_penalties
-        - deviation_weight * total_time_deviation_penalties
-        - sibling_day_mismatch_weight * total_sibling_penalty
-    )
+    set_objective(model)
 
     return model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, warm_start_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w
 
 
+# |||||||||| OBJECTIVE |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def component_variable(model, name, terms):
+    ''' Integer variable equal to the sum of terms (Boolean variables, or the 0 and 1 constants some penalty dictionaries hold). '''
+    component = model.NewIntVar(0, len(terms), f'objective_{name}')
+    model.Add(component == sum(terms))
+    return component
+
+def set_objective(model, weights=None):
+    ''' State the objective of a model built by create_model from its components, with the weights given for some of them (the
+    default weights of OBJECTIVE_WEIGHTS for the rest). Replaces the previous objective. Returns the weights used. '''
+    weights = {**OBJECTIVE_WEIGHTS, **(weights or {})}
+    unknown = set(weights) - set(OBJECTIVE_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown objective components {sorted(unknown)}, expected some of {list(OBJECTIVE_WEIGHTS)}")
+
+    components = model.objective_components
+    model.Maximize(sum(
+        (1 if name in REWARDS else -1) * int(weight) * components[name]
+        for name, weight in weights.items()
+    ))
+    model.objective_weights = weights
+    return weights
+
+def previous_solution_hints(model, gx, gx2, gy, gy2, gz, gz2):
+    ''' {variable: value} hints of every variable of the model from the best solution of its previous solve (model.best_solution,
+    see solve_model), or {} if it was never solved. Class variables are hinted through their own objects, as every other hint. '''
+    values = getattr(model, 'best_solution', None)
+    if not values:
+        return {}
+    class_variables = {var.Index(): var for variables in (gx, gx2, gy, gy2, gz, gz2) for var in variables.values()}
+    num_variables = len(model.Proto().variables)
+    return {class_variables[index] if index in class_variables else model.GetIntVarFromProtoIndex(index): value
+            for index, value in enumerate(values[:num_variables])}
+
+
 # |||||||||| SOLVE MODEL ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def decode_assignments(value, gx, gx2, gy, gy2, gz, gz2):
+    ''' Rows [student, teacher, room, class, slot] of the classes of a solution, given the value of a variable in it (solver.Value
+    or the Value of a solution callback). Only the variables that exist are visited, and the rows come out in the order of the full
+    (s, e, r, c/i, t) scan they replace: courses then instruments, by key, in gx, gx2 (gy, gy2, gz, gz2) order for the same key. '''
+    assignments = []
+    for label, kinds in (("Course", (gx, gx2)), ("Instrument", (gy, gy2, gz, gz2))):
+        chosen = sorted((key, order) for order, variables in enumerate(kinds) for key, var in variables.items() if value(var) > 0)
+        assignments += [[s, e, r, f"{label} {k}", t] for (s, e, r, k, t), _ in chosen]
+    return assignments
+
 class SolutionPrinter(cp_model.CpSolverSolutionCallback):
-    def __init__(self, model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties):
+    ''' Follows the search without slowing it down: the solver threads wait while OnSolutionCallback runs, so it only records the
+    objective, bound and time of every incumbent (and stops the search once it stalls). The schedule is decoded once, from the final
+    response (see decode_assignments). With a snapshot_interval (seconds), the incumbent is also decoded at most that often and written
+    to schedule_snapshot.csv, so a run that is stopped early still leaves its latest schedule behind. '''
+
+    def __init__(self, gx, gx2, gy, gy2, gz, gz2, snapshot_interval=0, stall_limit=100):
         super().__init__()
-        self.gx = gx
-        self.gx2 = gx2
-        self.gy = gy
-        self.gy2 = gy2
-        self.gz = gz
-        self.gz2 = gz2
-        self.num_students = num_students
-        self.num_teachers = num_teachers
-        self.num_rooms = num_rooms
-        self.num_courses = num_courses
-        self.num_instruments = num_instruments
-        self.num_slots = num_slots
-        self.solution_count = 0  
-        self.final_solution = []  # Store only the last solution
+        self.variables = (gx, gx2, gy, gy2, gz, gz2)
+        self.snapshot_interval = snapshot_interval
+        self.stall_limit = stall_limit  # Seconds without improvement after which the search is stopped
+        self.solution_count = 0
+        self.history = []  # (solution, objective, bound, wall time) of every incumbent
 
         # Time tracking
         self.start_time = time.time()  # Start time of solver
         self.last_improvement_time = self.start_time  # Last improvement time
-        self.best_objective = float('inf')  # Track best objective value
+        self.last_snapshot_time = self.start_time
+        self.best_objective = float('-inf')  # Track best objective value (the objective is maximized)
 
     def OnSolutionCallback(self):
         """Called each time the solver finds a solution."""
@@ -346,54 +338,30 @@ class SolutionPrinter(cp_model.CpSolverSolutionCallback):
         # Get current objective value
         current_objective = self.ObjectiveValue()
 
-        # Check if this solution is an improvement
-        if current_objective < self.best_objective:
+        # Check if this solution is an improvement (it always is: CP-SAT only reports better solutions)
+        if current_objective > self.best_objective:
             self.best_objective = current_objective
             self.last_improvement_time = current_time  # Reset improvement timer
-            print(f"New solution {self.solution_count+1}: Objective = {self.best_objective}, Time = {elapsed_time:.2f}s")
-
-        # Stop if 100 seconds have passed without improvement
-        if time_since_last_improvement > 100:
-            print(f"Stopping solver after {elapsed_time:.2f}s (no improvement for 100s).")
-            self.StopSearch()  # Immediately stop solver
 
+        # Every solution is a new incumbent
         self.solution_count += 1
-        print(f"\n--- Solution {self.solution_count} ---\n")
-
-        # Overwrite previous solution
-        self.final_solution = []
-
-        # Print and store assigned courses
-        for s in range(self.num_students):
-            for e in range(self.num_teachers):
-                for r in range(self.num_rooms):
-                    for c in range(self.num_courses):
-                        for t in range(self.num_slots):
-                            if (s, e, r, c, t) in self.gx and self.Value(self.gx[s, e, r, c, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Course {c}, Room {r}, Time Slot {t}")
-                                self.final_solution.append([s, e, r, f"Course {c}", t])
-                            if (s, e, r, c, t) in self.gx2 and self.Value(self.gx2[s, e, r, c, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Course {c}, Room {r}, Time Slot {t}, SECOND")
-                                self.final_solution.append([s, e, r, f"Course {c}", t])
-
-        # Print and store assigned instruments
-        for s in range(self.num_students):
-            for e in range(self.num_teachers):
-                for r in range(self.num_rooms):
-                    for i in range(self.num_instruments):
-                        for t in range(self.num_slots):
-                            if (s, e, r, i, t) in self.gy and self.Value(self.gy[s, e, r, i, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Instrument {i}, Room {r}, Time Slot {t}")
-                                self.final_solution.append([s, e, r, f"Instrument {i}", t])
-                            if (s, e, r, i, t) in self.gy2 and self.Value(self.gy2[s, e, r, i, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Instrument {i}, Room {r}, Time Slot {t}, SECOND")
-                                self.final_solution.append([s, e, r, f"Instrument {i}", t])
-                            if (s, e, r, i, t) in self.gz and self.Value(self.gz[s, e, r, i, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Instrument {i} (Low Priority), Room {r}, Time Slot {t}")
-                                self.final_solution.append([s, e, r, f"Instrument {i}", t])
-                            if (s, e, r, i, t) in self.gz2 and self.Value(self.gz2[s, e, r, i, t]) > 0:
-                                print(f"Student {s}: Teacher {e}, Instrument {i}, Room {r}, Time Slot {t}, SECOND")
-                                self.final_solution.append([s, e, r, f"Instrument {i}", t])
+        bound = self.BestObjectiveBound()
+        wall_time = round(self.WallTime(), 3)
+        self.history.append((self.solution_count, current_objective, bound, wall_time))
+        print(f"New solution {self.solution_count}: Objective = {current_objective}, Bound = {bound}, Time = {elapsed_time:.2f}s")
+        progress.emit('incumbent', solution=self.solution_count, objective=current_objective, bound=bound,
+                      gap=progress.gap(current_objective, bound), wall_time=wall_time)
+
+        if self.snapshot_interval and current_time - self.last_snapshot_time >= self.snapshot_interval:
+            self.last_snapshot_time = current_time
+            snapshot = pd.DataFrame(decode_assignments(self.Value, *self.variables), columns=["STUDENT", "TEACHER", "ROOM", "CLASS", "START TIME"])
+            snapshot.to_csv("schedule_snapshot.csv", index=False)
+            progress.emit('snapshot', solution=self.solution_count, objective=current_objective, rows=len(snapshot))
+
+        # Stop if this improvement came more than stall_limit seconds after the previous one
+        if time_since_last_improvement > self.stall_limit:
+            print(f"Stopping solver after {elapsed_time:.2f}s (no improvement for {self.stall_limit}s).")
+            self.StopSearch()  # Immediately stop solver
 
 def solve_warm_start(warm_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w, student_availability, courses, instruments, num_students, num_teachers, num_rooms, num_slots, num_courses, num_instruments):
     assignment_weight = 10
@@ -487,29 +455,30 @@ def solve_warm_start(warm_model, gx_w, gx2_w, gy_w, gy2_w, gz_w, gz2_w, student_
 
     if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
         print("Warm start solution found!")
-        for key in gx.keys():
+        for key in gx_w.keys():
             if warm_solver.Value(gx_w[key]) > 0:
-                warm_start_solution[key] = 1  # Store assigned variables
-        for key in gx2.keys():
+                warm_start_solution[gx_w[key]] = 1  # Store assigned variables, as hints for solve_model
+        for key in gx2_w.keys():
             if warm_solver.Value(gx2_w[key]) > 0:
-                warm_start_solution[key] = 1
-        for key in gy.keys():
+                warm_start_solution[gx2_w[key]] = 1
+        for key in gy_w.keys():
             if warm_solver.Value(gy_w[key]) > 0:
-                warm_start_solution[key] = 1
-        for key in gy2.keys():
+                warm_start_solution[gy_w[key]] = 1
+        for key in gy2_w.keys():
             if warm_solver.Value(gy2_w[key]) > 0:
-                warm_start_solution[key] = 1
-        for key in gz.keys():
+                warm_start_solution[gy2_w[key]] = 1
+        for key in gz_w.keys():
             if warm_solver.Value(gz_w[key]) > 0:
-                warm_start_solution[key] = 1
-        for key in gz2.keys():
+                warm_start_solution[gz_w[key]] = 1
+        for key in gz2_w.keys():
             if warm_solver.Value(gz2_w[key]) > 0:
-                warm_start_solution[key] = 1
+                warm_start_solution[gz2_w[key]] = 1
 
     return warm_start_solution
 
-def solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, warm_start_solution, student_availability):
+def solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots, day_penalties, deviation_penalties, sibling_day_penalties, hints, student_availability, num_workers=8, snapshot_interval=0):
     print('----------STARTING SOLVER----------')
+    solution_df, penalties_df = None, None  # Returned as they are if no solution is found
 
     solver = cp_model.CpSolver()
 
@@ -519,45 +488,50 @@ def solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, nu
 
     solver.parameters.symmetry_level = 0
     #solver.parameters.relative_gap_limit = 0.5  # Stop if within 5% of best known solution CHANGE OR REMOVE IN THE FUTURE
-    solver.parameters.num_search_workers = 8  # Use multiple threads
+    solver.parameters.num_search_workers = num_workers  # Use multiple threads (as many as the CPU budget of the run allows)
     #solver.parameters.random_seed = 42  # Randomize search direction slightly
     #solver.parameters.max_time_in_seconds = 300  # Allow more search time to refine the solution
 
-    print('printing warm start solution:')
-    print(warm_start_solution)
-    if warm_start_solution:
-        partial_hint_keys = list(warm_start_solution.keys())[:len(warm_start_solution) // 2]  # Only hint at half of the variables
-        partial_hint_values = [warm_start_solution[key] for key in partial_hint_keys]
-
-        solver.SetHint(partial_hint_keys, partial_hint_values)
+    # Hints ({variable: value}, see hints.py) replace any hint of a previous solve of the same model
+    model.ClearHints()
+    for var, value in hints.items():
+        model.AddHint(var, value)
+    print(f'Hinted variables: {len(hints)}')
 
     # Create the callback instance
-    solution_printer = SolutionPrinter(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots,
-                                       day_penalties, deviation_penalties, sibling_day_penalties)
+    solution_printer = SolutionPrinter(gx, gx2, gy, gy2, gz, gz2, snapshot_interval)
 
     # Solve with callback
-    status = solver.SolveWithSolutionCallback(model, solution_printer)
+    status = solver.Solve(model, solution_printer)
+    result = {'status': solver.StatusName(status), 'solutions': solution_printer.solution_count, 'wall_time': round(solver.WallTime(), 3)}
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        result.update(objective=solver.ObjectiveValue(), bound=solver.BestObjectiveBound(),
+                      gap=progress.gap(solver.ObjectiveValue(), solver.BestObjectiveBound()))
+        components = getattr(model, 'objective_components', {})
+        result.update(components={name: solver.Value(var) for name, var in components.items()})
+        class_indexes = {var.Index() for variables in (gx, gx2, gy, gy2, gz, gz2) for var in variables.values()}
+        hinted = [var for var, value in hints.items() if value == 1 and var.Index() in class_indexes]
+        if hinted:  # Share of the hinted classes the final schedule kept
+            result.update(hints_kept=round(sum(solver.Value(var) for var in hinted) / len(hinted), 3))
+        model.best_solution = list(solver.ResponseProto().solution)  # Hint of the next run of the model (see model_cache.store_solution)
+    progress.emit('result', **result)
 
     if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
         print("\nSolution found.")
             
-        # Save the final solution
-        df = pd.DataFrame(solution_printer.final_solution, columns=["STUDENT", "TEACHER", "ROOM", "CLASS", "START TIME"])
+        # Save the final solution, decoded once from the final response
+        df = pd.DataFrame(decode_assignments(solver.Value, gx, gx2, gy, gy2, gz, gz2), columns=["STUDENT", "TEACHER", "ROOM", "CLASS", "START TIME"])
         df.to_csv("schedule_solution.csv", index=False)
         solution_df = df
         print("\nFinal solution saved to schedule_solution.csv")
 
+        # Students taking a lower priority instrument (only the gz and gz2 variables that exist)
+        availability = student_availability.to_numpy()
         students_with_priority_penalty = set()
-
-        for s in range(num_students):
-            for e in range(num_teachers):
-                for r in range(num_rooms):
-                    for i in range(num_instruments):
-                        for t in range(num_slots):
-                            if (s, e, r, i, t) in gz and solution_printer.Value(gz[s, e, r, i, t]) > 0 and student_availability.iloc[s, t] == 1:
-                                students_with_priority_penalty.add(s)
-                            if (s, e, r, i, t) in gz2 and solution_printer.Value(gz2[s, e, r, i, t]) > 0 and student_availability.iloc[s, t] == 1:
-                                students_with_priority_penalty.add(s)
+        for variables in (gz, gz2):
+            for (s, e, r, i, t), var in variables.items():
+                if availability[s, t] == 1 and solver.Value(var) > 0:
+                    students_with_priority_penalty.add(s)
 
         # Store penalties (ONLY for the final solution)
         penalties_data = []
@@ -566,15 +540,15 @@ def solve_model(model, gx, gx2, gy, gy2, gz, gz2, num_students, num_teachers, nu
             penalties_data.append([s, "INSTRUMENT PRIORITIZATION"])
 
         for (s, _), var in day_penalties.items():  # Ignore day (d)
-            if solution_printer.Value(var) > 0:
+            if solver.Value(var) > 0:
                 penalties_data.append([s, "ANTIQUITY DAY"])
 
         for (s, _), var in deviation_penalties.items():  # Ignore day (d)
-            if solution_printer.Value(var) > 0:
+            if solver.Value(var) > 0:
                 penalties_data.append([s, "ANTIQUITY DEVIATION"])
 
         for (group, _), penalty_var in sibling_day_penalties.items():  # Ignore day (d)
-            if solution_printer.Value(penalty_var) > 0:
+            if solver.Value(penalty_var) > 0:
                 for s in group:
                     penalties_data.append([s, "SIBLING MISMATCH"])
 
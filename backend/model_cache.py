@@ -0,0 +1,186 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Model Cache ||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# create_model builds the same CP-SAT model for the same preprocessed instance, and most of its time goes to generating constraints in
+# Python. Runs that only try another time limit, seed or number of workers on the same data load the built model from a local disk
+# cache instead. The key is a hash of the preprocessed DataFrames, the engine, the time grid and the source of the files that build the
+# model (so a code change never reuses a stale model). Every entry is one file holding the CpModelProto in text format (the only
+# format every supported ortools version parses back) and the proto index of every variable create_model returns, from which the
+# gx, gx2, gy, gy2, gz, gz2 and penalty dictionaries and the objective components are rebuilt. The objective weights are not part of
+# the key: re-weighting is a new run (the "weights" run option) that loads the same model and states the objective again (see
+# set_objective), so it only pays the build time when the cache is off or the entry was evicted. Every entry also keeps
+# the best solution of the last run of its model, which is still feasible under any weights and is hinted whole to the next run (see
+# store_solution). The cache is bounded by bytes: the least recently used entries are deleted once it grows larger than
+# MODEL_CACHE_MB (0 turns the cache off). Hits and misses are reported as "model_cache" progress events, with the time spent loading
+# or building the model.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+
+from ortools.sat.python import cp_model
+from google.protobuf import text_format
+
+from model_body_appver import create_model
+from time_grid import DEFAULT_GRID
+import progress
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", os.path.join(BACKEND_DIR, "model_cache"))
+CACHE_BYTES = int(float(os.environ.get("MODEL_CACHE_MB", "512")) * 1024 * 1024)
+MODEL_SOURCES = ("model_body_appver.py", "constraints.py", "registry.py", "time_grid.py")  # Files whose changes change the model
+EXTENSION = ".model"
+
+CLASS_VARIABLES = ("gx", "gx2", "gy", "gy2", "gz", "gz2")
+PENALTIES = ("day_penalties", "deviation_penalties", "sibling_day_penalties")
+
+
+# |||||||||| KEYS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def source_fingerprint():
+    digest = hashlib.blake2b(digest_size=16)
+    for name in MODEL_SOURCES:
+        with open(os.path.join(BACKEND_DIR, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+def instance_key(frames, engine, grid):
+    ''' Hash of a preprocessed instance (the DataFrames create_model takes, in order) and the model options. '''
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(source_fingerprint().encode())
+    digest.update(f"{engine}|{grid.slot_minutes}|{','.join(grid.labels)}".encode())
+    for frame in frames:
+        digest.update(frame.to_json(orient="split", default_handler=str).encode())
+    return digest.hexdigest()
+
+
+# |||||||||| ENCODING ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def proto_index(value):
+    ''' Proto index of a variable, or the value itself for the constants some penalty dictionaries hold. '''
+    return ("var", value.Index()) if hasattr(value, "Index") else ("value", value)
+
+def encode(model, variables, penalties, counts):
+    return {
+        "proto": str(model.Proto()),  # Text format in every ortools version
+        "variables": {kind: {key: var.Index() for key, var in variables[kind].items()} for kind in CLASS_VARIABLES},
+        "penalties": {name: {key: proto_index(value) for key, value in penalties[name].items()} for name in PENALTIES},
+        "objective": {name: var.Index() for name, var in model.objective_components.items()},
+        "counts": counts,
+        "num_variables": len(model.Proto().variables),
+        "solution": None,  # Best solution of the last run (see store_solution)
+    }
+
+def decode(entry):
+    ''' Model, class variable dictionaries, penalty dictionaries and counts of a cache entry. The model carries its objective
+    components and the best solution of the last run, as a model built by create_model and solved by solve_model would. '''
+    model = cp_model.CpModel()
+    proto = model.Proto()
+    if hasattr(proto, "parse_text_format"):  # ortools >= 9.15 wraps the proto natively
+        proto.parse_text_format(entry["proto"])
+    else:
+        text_format.Parse(entry["proto"], proto)
+
+    variables = {kind: {key: model.GetBoolVarFromProtoIndex(index) for key, index in indexes.items()}
+                 for kind, indexes in entry["variables"].items()}
+    penalties = {name: {key: model.GetIntVarFromProtoIndex(value) if kind == "var" else value for key, (kind, value) in values.items()}
+                 for name, values in entry["penalties"].items()}
+    model.objective_components = {name: model.GetIntVarFromProtoIndex(index) for name, index in entry["objective"].items()}
+    model.best_solution = entry["solution"]
+    return model, variables, penalties, entry["counts"]
+
+
+# |||||||||| CACHE |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def entry_path(key):
+    return os.path.join(CACHE_DIR, key + EXTENSION)
+
+def load(key):
+    ''' Cache entry of a key, or None. A hit marks the entry as recently used. '''
+    path = entry_path(key)
+    try:
+        with open(path, "rb") as file:
+            entry = pickle.load(file)
+        os.utime(path)
+        return entry
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None  # Missing, evicted while reading or truncated
+
+def store(key, entry):
+    ''' Write an entry atomically (concurrent runs never read half a file), then evict down to the size bound. '''
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(handle, "wb") as file:
+        pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, entry_path(key))
+    evict()
+
+def store_solution(model):
+    ''' Keep the best solution of a run (model.best_solution, see solve_model) in the cache entry of its model, if there is one.
+    Variables added after the model was built (such as the assumption of an incremental run) are left out. '''
+    key, values = getattr(model, "cache_key", None), getattr(model, "best_solution", None)
+    entry = load(key) if key and values else None
+    if entry is None:
+        return
+    entry["solution"] = values[:entry["num_variables"]]
+    store(key, entry)
+
+def evict(max_bytes=CACHE_BYTES):
+    ''' Delete the least recently used entries until the cache fits in max_bytes. '''
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(EXTENSION):
+            try:
+                stat = os.stat(os.path.join(CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+        total -= size
+
+
+# |||||||||| CACHED MODEL ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def cached_create_model(student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity, engine='grid', grid=DEFAULT_GRID):
+    ''' create_model, through the cache. Returns exactly what create_model returns. '''
+    frames = (student_availability, antiquity, priorities, siblings_df, teacher_availability, teacher_info, courses, instruments, rooms, course_continuity)
+    if CACHE_BYTES <= 0:
+        return create_model(*frames, engine=engine, grid=grid)
+
+    start = time.time()
+    key = instance_key(frames, engine, grid)
+    entry = load(key)
+    if entry is not None:
+        model, variables, penalties, counts = decode(entry)
+        model.cache_key = key  # Where the best solution of the run goes (see store_solution)
+        load_time = round(time.time() - start, 3)
+        print(f"Model cache hit {key[:12]}: loaded in {load_time}s, {'with' if model.best_solution else 'without'} a previous solution")
+        progress.emit('model_cache', hit=True, key=key, load_time=load_time, solution=bool(model.best_solution))
+        gx, gx2, gy, gy2, gz, gz2 = (variables[kind] for kind in CLASS_VARIABLES)
+        day_penalties, deviation_penalties, sibling_day_penalties = (penalties[name] for name in PENALTIES)
+        # The warm start model is the model itself (see create_model)
+        return (model, gx, gx2, gy, gy2, gz, gz2, *counts, day_penalties, deviation_penalties, sibling_day_penalties,
+                model, gx, gx2, gy, gy2, gz, gz2)
+
+    built = create_model(*frames, engine=engine, grid=grid)
+    build_time = round(time.time() - start, 3)
+    model, gx, gx2, gy, gy2, gz, gz2 = built[:7]
+    counts = built[7:13]  # num_students, num_teachers, num_rooms, num_courses, num_instruments, num_slots
+    day_penalties, deviation_penalties, sibling_day_penalties = built[13:16]
+    model.cache_key = key
+    store(key, encode(model, dict(zip(CLASS_VARIABLES, (gx, gx2, gy, gy2, gz, gz2))),
+                      dict(zip(PENALTIES, (day_penalties, deviation_penalties, sibling_day_penalties))), counts))
+    store_time = round(time.time() - start - build_time, 3)
+    print(f"Model cache miss {key[:12]}: built in {build_time}s, stored in {store_time}s")
+    progress.emit('model_cache', hit=False, key=key, build_time=build_time, store_time=store_time)
+    return built
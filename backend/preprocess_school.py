@@ -1,17 +1,8 @@
-import psycopg2
 import pandas as pd
 import json
 import numpy as np
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
+from db import connection
 
 # Map feature IDs to names
 FEATURE_MAP = {
@@ -37,34 +28,37 @@ def process_features_matrix(features, feature_map):
     return feature_matrix
 
 # Preprocess the rooms, courses, instruments data and save matrices
-def preprocess_school(user_id):
-    conn = connect_to_db()
-
-    rooms_query = """
-        SELECT room_id, capacity, features
-        FROM rooms
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY room_id
-    """
-    rooms = pd.read_sql_query(rooms_query, conn, params=(user_id, 'temp_sol'))
-
-    courses_query = """
-        SELECT course_id, capacity, duration, features
-        FROM courses
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY course_id
-    """
-    courses = pd.read_sql_query(courses_query, conn, params=(user_id, 'temp_sol'))
-
-    instruments_query = """
-        SELECT instrument_id, capacity, duration, features
-        FROM instruments
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY instrument_id
-    """
-    instruments = pd.read_sql_query(instruments_query, conn, params=(user_id, 'temp_sol'))
-
-    conn.close()
+def preprocess_school(run_id, rooms=None, courses=None, instruments=None):
+    ''' rooms, courses and instruments can be given as DataFrames of the run input (see load_input.input_frames), otherwise they
+    are read from the database. '''
+    if rooms is None or courses is None or instruments is None:
+        with connection() as conn:
+            rooms_query = """
+                SELECT room_id, capacity, features
+                FROM rooms
+                WHERE run_id = %s
+                ORDER BY room_id
+            """
+            rooms = pd.read_sql_query(rooms_query, conn, params=(run_id,))
+
+            courses_query = """
+                SELECT course_id, capacity, duration, features
+                FROM courses
+                WHERE run_id = %s
+                ORDER BY course_id
+            """
+            courses = pd.read_sql_query(courses_query, conn, params=(run_id,))
+
+            instruments_query = """
+                SELECT instrument_id, capacity, duration, features
+                FROM instruments
+                WHERE run_id = %s
+                ORDER BY instrument_id
+            """
+            instruments = pd.read_sql_query(instruments_query, conn, params=(run_id,))
+
+    else:
+        rooms, courses, instruments = rooms.copy(), courses.copy(), instruments.copy()
 
     # Generate the list of equipment feature IDs
     feature_ids = generate_feature_ids()
@@ -104,17 +98,18 @@ def preprocess_school(user_id):
 
     return rooms_matrix, courses_matrix, instruments_matrix
 
-def generate_course_index_csv(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT course_id, name
-        FROM courses
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY course_id
-    """
-    course_index_mapping = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-    conn.close()
+def generate_course_index_csv(run_id, courses=None):
+    if courses is None:
+        with connection() as conn:
+            query = """
+                SELECT course_id, name
+                FROM courses
+                WHERE run_id = %s
+                ORDER BY course_id
+            """
+            course_index_mapping = pd.read_sql_query(query, conn, params=(run_id,))
+    else:
+        course_index_mapping = courses[['course_id', 'name']].reset_index(drop=True)
 
     # Add index column
     course_index_mapping.insert(0, 'index', range(len(course_index_mapping)))
@@ -124,17 +119,18 @@ def generate_course_index_csv(user_id):
     
     return course_index_mapping
 
-def generate_instrument_index_csv(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT instrument_id, name
-        FROM instruments
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY instrument_id
-    """
-    instrument_index_mapping = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-    conn.close()
+def generate_instrument_index_csv(run_id, instruments=None):
+    if instruments is None:
+        with connection() as conn:
+            query = """
+                SELECT instrument_id, name
+                FROM instruments
+                WHERE run_id = %s
+                ORDER BY instrument_id
+            """
+            instrument_index_mapping = pd.read_sql_query(query, conn, params=(run_id,))
+    else:
+        instrument_index_mapping = instruments[['instrument_id', 'name']].reset_index(drop=True)
     
     # Add index column
     instrument_index_mapping.insert(0, 'index', range(len(instrument_index_mapping)))
@@ -144,17 +140,18 @@ def generate_instrument_index_csv(user_id):
 
     return instrument_index_mapping
 
-def generate_room_index_csv(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT room_id, name
-        FROM rooms
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY room_id
-    """
-    room_index_mapping = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-    conn.close()
+def generate_room_index_csv(run_id, rooms=None):
+    if rooms is None:
+        with connection() as conn:
+            query = """
+                SELECT room_id, name
+                FROM rooms
+                WHERE run_id = %s
+                ORDER BY room_id
+            """
+            room_index_mapping = pd.read_sql_query(query, conn, params=(run_id,))
+    else:
+        room_index_mapping = rooms[['room_id', 'name']].reset_index(drop=True)
     
     # Add index column
     room_index_mapping.insert(0, 'index', range(len(room_index_mapping)))
@@ -167,9 +164,9 @@ def generate_room_index_csv(user_id):
 
 # Run preprocessing
 #if __name__ == "__main__":
-def load_school_data(user_id):
-    rooms_matrix, courses_matrix, instruments_matrix = preprocess_school(user_id)
-    course_index_mapping = generate_course_index_csv(user_id)
-    instrument_index_mapping = generate_instrument_index_csv(user_id)
-    room_index_mapping = generate_room_index_csv(user_id)
+def load_school_data(run_id, rooms=None, courses=None, instruments=None):
+    rooms_matrix, courses_matrix, instruments_matrix = preprocess_school(run_id, rooms, courses, instruments)
+    course_index_mapping = generate_course_index_csv(run_id, courses)
+    instrument_index_mapping = generate_instrument_index_csv(run_id, instruments)
+    room_index_mapping = generate_room_index_csv(run_id, rooms)
     return rooms_matrix, courses_matrix, instruments_matrix, course_index_mapping, instrument_index_mapping, room_index_mapping
@@ -0,0 +1,70 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# ||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Slot Matrices |||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# Availability and antiquity matrices used to be built slot by slot: every time range was expanded into 15 minute labels with strptime,
+# and every label was then located with a linear time_slots.index search. Here every range is parsed once into (row, start slot, end
+# slot) integer arrays, and the whole matrix is filled at once by marking range boundaries and taking a cumulative sum.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import numpy as np
+
+from time_grid import to_minutes
+
+
+# |||||||||| HELPER FUNCTIONS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def parse_ranges(rows, grid):
+    ''' Parse the [day, "HH:MM-HH:MM"] entries of every row into (row, first slot, end slot) arrays. A range covers the grid slots
+    reached from its start in whole steps before its end, so ranges that are not aligned with the grid, or whose day is not in the
+    grid, cover no slot at all. '''
+    row_ids, day_ids, starts, ends = [], [], [], []
+    for row, entries in enumerate(rows):
+        for day, time_range in entries:
+            start_time, end_time = time_range.split('-')
+            start, end = to_minutes(start_time), to_minutes(end_time)
+            d = grid.day_index.get(day.upper())
+            if d is None or (start - grid.day_open[d]) % grid.slot_minutes != 0:
+                continue
+            row_ids.append(row)
+            day_ids.append(d)
+            starts.append(start)
+            ends.append(end)
+
+    day_ids = np.asarray(day_ids, dtype=np.int64)
+    day_open = np.asarray(grid.day_open, dtype=np.int64)[day_ids]
+    day_slots = np.asarray(grid.day_slots, dtype=np.int64)[day_ids]
+    day_start = np.asarray(grid.day_start, dtype=np.int64)[day_ids]
+
+    # Slots of the day whose start minute falls in [start, end)
+    start_slots = np.clip(-((day_open - np.asarray(starts, dtype=np.int64)) // grid.slot_minutes), 0, day_slots)
+    end_slots = np.clip(-((day_open - np.asarray(ends, dtype=np.int64)) // grid.slot_minutes), 0, day_slots)
+
+    return np.asarray(row_ids, dtype=np.int64), day_start + start_slots, day_start + end_slots
+
+def ranges_to_matrix(num_rows, row_ids, start_slots, end_slots, num_slots):
+    ''' Binary uint8 matrix with ones in every slot covered by at least one range. '''
+    valid = start_slots < end_slots
+
+    boundaries = np.zeros((num_rows, num_slots + 1), dtype=np.int32)
+    np.add.at(boundaries, (row_ids[valid], start_slots[valid]), 1)
+    np.add.at(boundaries, (row_ids[valid], end_slots[valid]), -1)
+
+    return (np.cumsum(boundaries[:, :num_slots], axis=1) > 0).astype(np.uint8)
+
+
+# |||||||||| SLOT MATRICES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def slot_matrix(ids, rows, grid):
+    ''' Matrix with the id of every row in the first column followed by its binary slot row (one column per time slot of the grid),
+    as built from lists of [day, time range] entries (one list per id). '''
+    ranges = parse_ranges(rows, grid)
+    matrix = ranges_to_matrix(len(rows), *ranges, grid.num_slots)
+    return np.column_stack((np.asarray(ids), matrix))
+
+def availability_rows(availabilities):
+    ''' Availability JSONB values are already lists of [day, time range] entries. '''
+    return [availability or [] for availability in availabilities]
+
+def antiquity_rows(antiquities):
+    ''' Antiquity JSONB values are lists of [class, [day, time range], ...] entries: only the time ranges are kept. '''
+    return [[time_range for _, *time_ranges in antiquity or [] for time_range in time_ranges] for antiquity in antiquities]
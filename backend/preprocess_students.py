@@ -1,61 +1,10 @@
-import psycopg2
 import pandas as pd
 import numpy as np
 import json
-from datetime import datetime, timedelta
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
-# Generate time slots for the matrix
-def generate_time_slots():
-    times = [f"{hour:02d}:{minute:02d}" for hour in range(16, 21) for minute in [0, 15, 30, 45]]
-    days = ['MON', 'TUE', 'WED', 'THU', 'FRI']
-    return [f"{day} {time}" for day in days for time in times]
-
-# Convert a time range string to a list of 15-minute intervals
-def time_range_to_slots(day, start_time, end_time, time_slots):
-    start = datetime.strptime(start_time, "%H:%M")
-    end = datetime.strptime(end_time, "%H:%M")
-    current = start
-    intervals = []
-    while current < end:
-        intervals.append(current.strftime("%H:%M"))
-        current += timedelta(minutes=15)
-    return [f"{day.upper()} {time}" for time in intervals if f"{day.upper()} {time}" in time_slots]
-
-# Process availability JSONB and convert to a binary row
-def process_availability(student_availability, time_slots):
-    availability_row = [0] * len(time_slots)
-    for entry in student_availability:
-        day, time_range = entry
-        start_time, end_time = time_range.split('-')
-        slots = time_range_to_slots(day, start_time, end_time, time_slots)
-        for slot in slots:
-            if slot in time_slots:
-                availability_row[time_slots.index(slot)] = 1
-    return availability_row
-
-# Process antiquity JSONB and convert to a binary row
-def process_antiquity(student_antiquity, time_slots):
-    antiquity_row = [0] * len(time_slots)
-    if student_antiquity:
-        for entry in student_antiquity:
-            _, *time_ranges = entry
-            for day, time_range in time_ranges:
-                start_time, end_time = time_range.split('-')
-                slots = time_range_to_slots(day, start_time, end_time, time_slots)
-                for slot in slots:
-                    if slot in time_slots:
-                        antiquity_row[time_slots.index(slot)] = 1
-    return antiquity_row
+from db import connection
+from time_grid import DEFAULT_GRID, to_minutes
+from preprocess_slots import slot_matrix, availability_rows, antiquity_rows
 
 # Check instrument continuity (match with antiquity)
 def check_continuity(antiquity, instrument):
@@ -137,20 +86,24 @@ def create_priority_matrix(students, courses, instruments):
     return pd.DataFrame(priority_data, columns=columns)
 
 # Create the availability matrix for students
-def create_availability_matrix(students, time_slots):
-    matrix = []
-    for _, student in students.iterrows():
-        availability_row = process_availability(student['availability'], time_slots)
-        matrix.append([student['student_id']] + availability_row)  # Add student_id as the first column
-    return np.array(matrix)
+def create_availability_matrix(students, grid):
+    return slot_matrix(students['student_id'], availability_rows(students['availability']), grid)  # student_id as the first column
 
 # Create the antiquity matrix for students
-def create_antiquity_matrix(students, time_slots):
-    matrix = []
+def create_antiquity_matrix(students, grid):
+    return slot_matrix(students['student_id'], antiquity_rows(students['antiquity']), grid)  # student_id as the first column
+
+# Starting time slots of last year's classes, used to hint the solver (see hints.py)
+def create_antiquity_starts(students, grid):
+    starts = []
     for _, student in students.iterrows():
-        antiquity_row = process_antiquity(student['antiquity'], time_slots)
-        matrix.append([student['student_id']] + antiquity_row)  # Add student_id as the first column
-    return np.array(matrix)
+        for class_name, *time_ranges in student['antiquity'] or []:
+            for day, time_range in time_ranges:
+                d = grid.day_index.get(day.upper())
+                start = grid.slot(d, to_minutes(time_range.split('-')[0])) if d is not None else None
+                if start is not None:
+                    starts.append({'student_id': student['student_id'], 'class': class_name.lower(), 'start': start})
+    return pd.DataFrame(starts, columns=['student_id', 'class', 'start'])
 
 # Extract sibling relationships
 def create_sibling_table(students):
@@ -191,18 +144,21 @@ def calculate_next_course(students):
     return pd.DataFrame(course_continuity)
 
 # Main preprocessing function
-def preprocess_students(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT student_id, name, availability, antiquity, siblings, courses, instruments
-        FROM students
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY student_id
-    """
-    students = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-
-    conn.close()
+def preprocess_students(run_id, grid=DEFAULT_GRID, students=None):
+    ''' students can be given as a DataFrame of the run input (see load_input.input_frames), otherwise it is read from the
+    database. '''
+    if students is None:
+        with connection() as conn:
+            query = """
+                SELECT student_id, name, availability, antiquity, siblings, courses, instruments
+                FROM students
+                WHERE run_id = %s
+                ORDER BY student_id
+            """
+            students = pd.read_sql_query(query, conn, params=(run_id,))
+
+    else:
+        students = students.copy()
     
     # Convert JSONB columns to Python lists
     for field in ['availability', 'antiquity', 'siblings', 'courses', 'instruments']:
@@ -212,17 +168,14 @@ def preprocess_students(user_id):
     courses = ["music theory 1", "music theory 2", "music theory 3", "choir"]
     instruments = ["guitar", "piano", "drums", "violin", "flute", "clarinet", "cello", "trumpet"]
     
-    # Generate time slots
-    time_slots = generate_time_slots()
-    
     # Create and save availability matrix
-    availability_matrix = create_availability_matrix(students, time_slots)
-    availability_df = pd.DataFrame(availability_matrix, columns=['student_id'] + time_slots)
+    availability_matrix = create_availability_matrix(students, grid)
+    availability_df = pd.DataFrame(availability_matrix, columns=['student_id'] + grid.labels)
     #availability_df.to_csv("student_availability_matrix.csv", index=False)
 
     # Create and save antiquity matrix
-    antiquity_matrix = create_antiquity_matrix(students, time_slots)
-    antiquity_df = pd.DataFrame(antiquity_matrix, columns=['student_id'] + time_slots)
+    antiquity_matrix = create_antiquity_matrix(students, grid)
+    antiquity_df = pd.DataFrame(antiquity_matrix, columns=['student_id'] + grid.labels)
     #antiquity_df.to_csv("student_antiquity_matrix.csv", index=False)
     
     # Create and save priority table
@@ -237,22 +190,24 @@ def preprocess_students(user_id):
     course_antiquity_table = calculate_next_course(students)
     #course_antiquity_table.to_csv("course_antiquity_table.csv", index=False)
 
-    return availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table
-
-def generate_student_index_csv(user_id):
-    conn = connect_to_db()
+    # Create the starting slots of last year's classes
+    antiquity_starts = create_antiquity_starts(students, grid)
 
-    conn = connect_to_db()
+    return availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table, antiquity_starts
 
-    query = """
-        SELECT student_id, name
-        FROM students
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY student_id
-    """
-    student_index_mapping = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
+def generate_student_index_csv(run_id, students=None):
+    if students is None:
+        with connection() as conn:
+            query = """
+                SELECT student_id, name
+                FROM students
+                WHERE run_id = %s
+                ORDER BY student_id
+            """
+            student_index_mapping = pd.read_sql_query(query, conn, params=(run_id,))
 
-    conn.close()
+    else:
+        student_index_mapping = students[['student_id', 'name']].reset_index(drop=True)
     
     # Add index column
     student_index_mapping.insert(0, 'index', range(len(student_index_mapping)))
@@ -265,7 +220,7 @@ def generate_student_index_csv(user_id):
   
 # Run preprocessing
 #if __name__ == "__main__":
-def load_students_data(user_id):
-    availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table = preprocess_students(user_id)
-    student_index_mapping = generate_student_index_csv(user_id)
-    return availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table, student_index_mapping
+def load_students_data(run_id, grid=DEFAULT_GRID, students=None):
+    availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table, antiquity_starts = preprocess_students(run_id, grid, students)
+    student_index_mapping = generate_student_index_csv(run_id, students)
+    return availability_df, antiquity_df, priority_table, sibling_table, course_antiquity_table, student_index_mapping, antiquity_starts
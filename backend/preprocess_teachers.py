@@ -1,55 +1,14 @@
-import psycopg2
 import pandas as pd
 import numpy as np
 import json
-from datetime import datetime, timedelta
 
-# Database connection
-def connect_to_db():
-    return psycopg2.connect(
-        dbname="scheduling_app",
-        user="postgres",
-        password="221214",
-        host="localhost",
-        port="5432"
-    )
-
-# Generate time slots for the matrix (same as for students)
-def generate_time_slots():
-    times = [f"{hour:02d}:{minute:02d}" for hour in range(16, 21) for minute in [0, 15, 30, 45]]
-    days = ['MON', 'TUE', 'WED', 'THU', 'FRI']
-    return [f"{day} {time}" for day in days for time in times]
-
-# Convert a time range string to a list of 15-minute intervals (same as for students)
-def time_range_to_slots(day, start_time, end_time, time_slots):
-    start = datetime.strptime(start_time, "%H:%M")
-    end = datetime.strptime(end_time, "%H:%M")
-    current = start
-    intervals = []
-    while current < end:
-        intervals.append(current.strftime("%H:%M"))
-        current += timedelta(minutes=15)
-    return [f"{day.upper()} {time}" for time in intervals if f"{day.upper()} {time}" in time_slots]
-
-# Process availability JSON and convert to a binary row
-def process_availability(teacher_availability, time_slots):
-    availability_row = [0] * len(time_slots)
-    for entry in teacher_availability:
-        day, time_range = entry
-        start_time, end_time = time_range.split('-')
-        slots = time_range_to_slots(day, start_time, end_time, time_slots)
-        for slot in slots:
-            if slot in time_slots:
-                availability_row[time_slots.index(slot)] = 1
-    return availability_row
+from db import connection
+from time_grid import DEFAULT_GRID
+from preprocess_slots import slot_matrix, availability_rows
 
 # Create the availability matrix for teachers
-def create_availability_matrix(teachers, time_slots):
-    matrix = []
-    for _, teacher in teachers.iterrows():
-        availability_row = process_availability(teacher['availability'], time_slots)
-        matrix.append([teacher['teacher_id']] + availability_row)
-    return np.array(matrix)
+def create_availability_matrix(teachers, grid):
+    return slot_matrix(teachers['teacher_id'], availability_rows(teachers['availability']), grid)  # teacher_id as the first column
 
 # Convert courses and instruments to binary matrices
 def process_teacher_details(teachers, courses, instruments, course_mapping, instrument_mapping):
@@ -75,29 +34,29 @@ def process_teacher_details(teachers, courses, instruments, course_mapping, inst
     return pd.DataFrame(teacher_data, columns=columns)
 
 # Preprocess teacher data
-def preprocess_teachers(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT teacher_id, name, availability, contract, courses, instruments
-        FROM teachers
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY teacher_id
-    """
-    teachers = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-
-    conn.close()
+def preprocess_teachers(run_id, grid=DEFAULT_GRID, teachers=None):
+    ''' teachers can be given as a DataFrame of the run input (see load_input.input_frames), otherwise it is read from the
+    database. '''
+    if teachers is None:
+        with connection() as conn:
+            query = """
+                SELECT teacher_id, name, availability, contract, courses, instruments
+                FROM teachers
+                WHERE run_id = %s
+                ORDER BY teacher_id
+            """
+            teachers = pd.read_sql_query(query, conn, params=(run_id,))
+
+    else:
+        teachers = teachers.copy()
     
     # Convert JSONB columns to Python lists
     for field in ['availability', 'contract', 'courses', 'instruments']:
         teachers[field] = teachers[field].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
     
-    # Generate time slots
-    time_slots = generate_time_slots()
-    
     # Create and save availability matrix
-    availability_matrix = create_availability_matrix(teachers, time_slots)
-    availability_df = pd.DataFrame(availability_matrix, columns=['teacher_id'] + time_slots)
+    availability_matrix = create_availability_matrix(teachers, grid)
+    availability_df = pd.DataFrame(availability_matrix, columns=['teacher_id'] + grid.labels)
     #availability_df.to_csv("teacher_availability_matrix.csv", index=False)
     
     # Course and instrument mappings
@@ -129,18 +88,19 @@ def preprocess_teachers(user_id):
 
     return availability_df, teacher_details_matrix
 
-def generate_teacher_index_csv(user_id):
-    conn = connect_to_db()
-
-    query = """
-        SELECT teacher_id, name
-        FROM teachers
-        WHERE user_id = %s AND solution_id = %s
-        ORDER BY teacher_id
-    """
-    teacher_index_mapping = pd.read_sql_query(query, conn, params=(user_id, 'temp_sol'))
-
-    conn.close()
+def generate_teacher_index_csv(run_id, teachers=None):
+    if teachers is None:
+        with connection() as conn:
+            query = """
+                SELECT teacher_id, name
+                FROM teachers
+                WHERE run_id = %s
+                ORDER BY teacher_id
+            """
+            teacher_index_mapping = pd.read_sql_query(query, conn, params=(run_id,))
+
+    else:
+        teacher_index_mapping = teachers[['teacher_id', 'name']].reset_index(drop=True)
     
     # Add index column
     teacher_index_mapping.insert(0, 'index', range(len(teacher_index_mapping)))
@@ -153,7 +113,7 @@ def generate_teacher_index_csv(user_id):
     
 # Run preprocessing
 #if __name__ == "__main__":
-def load_teachers_data(user_id):
-    availability_df, teacher_details_matrix = preprocess_teachers(user_id)
-    teacher_index_mapping = generate_teacher_index_csv(user_id)
+def load_teachers_data(run_id, grid=DEFAULT_GRID, teachers=None):
+    availability_df, teacher_details_matrix = preprocess_teachers(run_id, grid, teachers)
+    teacher_index_mapping = generate_teacher_index_csv(run_id, teachers)
     return availability_df, teacher_details_matrix, teacher_index_mapping
@@ -0,0 +1,95 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Progress Events ||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# The output of a solver run is mostly debug prints (whole DataFrames included), which is fine for a log but useless for showing
+# progress. So model_appver.py also writes typed progress events, one JSON object per line, to the file given with --events, and the
+# API streams them as NDJSON or Server-Sent Events. Every event has a type and the seconds elapsed since the run started:
+#   {"type": "phase", "phase": "antiquity", "state": "start"}                       A step of the run starts
+#   {"type": "phase", "phase": "antiquity", "state": "end", "duration": 0.12}       ... and ends
+#   {"type": "incumbent", "solution": 3, "objective": 240, "bound": 250, "gap": 0.04}    The solver found a better schedule
+#   {"type": "snapshot", "solution": 3, "objective": 240, "rows": 310}                  The incumbent was written to schedule_snapshot.csv
+#   {"type": "hints", "source": "solution", "rows": 310, "hits": 296, "rate": 0.955}   Hints were built (see hints.py)
+#   {"type": "incremental", "reference": "week_3", "frozen_share": 0.91, ...}          Part of the model was frozen (see incremental.py)
+#   {"type": "decomposition", "clusters": [...], "conflict_students": 4, ...}           The clusters were solved (see decompose.py)
+#   {"type": "result", "status": "OPTIMAL", "objective": 242, "bound": 242, "gap": 0}    The solver finished (with the value of every
+#                                                                                        objective component and hints_kept, the
+#                                                                                        share of hinted classes it kept, if hinted)
+# The API adds job events ({"type": "job", "status": "queued", ...}), the input report ({"type": "input", "tables": {...}}) and a final
+# {"type": "status", "status": "succeeded", ...}.
+# Without --events (runs from the command line) every emit is a no-op.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+# |||||||||| EVENT LOG |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+_events = None  # Open events file of the run, if any
+_start = time.time()
+_lock = threading.Lock()  # Solution callbacks run on solver threads
+
+def open_events(path):
+    ''' Start writing the events of this run to the given file. '''
+    global _events, _start
+    _events = open(path, "a", encoding="utf-8", buffering=1) if path else None
+    _start = time.time()
+
+def emit(event_type, **fields):
+    ''' Append an event to the events file. Every event is flushed right away, so it can be streamed while the run goes on. '''
+    if _events is None:
+        return
+    event = {"type": event_type, "elapsed": round(time.time() - _start, 3), **fields}
+    with _lock:
+        _events.write(json.dumps(event, default=str) + "\n")
+        _events.flush()
+
+def start_phase(name):
+    ''' Emit the start event of a step of the run and return its start time, to be passed to end_phase. '''
+    emit("phase", phase=name, state="start")
+    return time.time()
+
+def end_phase(name, start):
+    emit("phase", phase=name, state="end", duration=round(time.time() - start, 3))
+
+@contextmanager
+def phase(name):
+    ''' Emit start and end events (with the duration) of a step of the run. '''
+    start = start_phase(name)
+    try:
+        yield
+    finally:
+        end_phase(name, start)
+
+def gap(objective, bound):
+    ''' Relative gap between an objective value and its bound, as CP-SAT computes it. '''
+    return round(abs(bound - objective) / max(1.0, abs(objective)), 4)
+
+
+# |||||||||| STREAMING |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+def read_events(path, offset=0):
+    ''' Events written to the file since the given byte offset, and the offset to read from next time. A line still being written
+    (no trailing newline yet) is left for the next read. '''
+    try:
+        with open(path, "rb") as events_file:
+            events_file.seek(offset)
+            data = events_file.read()
+    except FileNotFoundError:
+        return [], offset
+
+    complete = data[:data.rfind(b"\n") + 1]
+    events = [json.loads(line) for line in complete.decode("utf-8").splitlines() if line.strip()]
+    return events, offset + len(complete)
+
+def encode(event, media_type=NDJSON):
+    ''' One event as an NDJSON line or as a Server-Sent Event (named after its type). '''
+    data = json.dumps(event, default=str)
+    if media_type == SSE:
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
@@ -0,0 +1,131 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Variable Registry |||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# The decision variables (gx, gx2, gy, gy2, gz, gz2) are sparse: most (s, e, r, c/i, t) tuples never get a variable. Every constraint
+# used to loop over the full s x e x r x c/i x t product and probe the dictionaries for each tuple, so building the model took longer
+# than solving it. The registry stores every created literal once and keeps secondary indexes so that constraints only ever visit the
+# variables that actually exist.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+from collections import defaultdict
+
+from time_grid import DEFAULT_GRID
+
+
+# |||||||||| CLASS TYPES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+COURSE_KINDS = ('gx', 'gx2')
+INSTRUMENT_KINDS = ('gy', 'gy2', 'gz', 'gz2')
+ALL_KINDS = COURSE_KINDS + INSTRUMENT_KINDS
+
+# Class family of every variable kind: courses (c) and instruments (i) are indexed separately
+FAMILY = {kind: 'course' for kind in COURSE_KINDS}
+FAMILY.update({kind: 'instrument' for kind in INSTRUMENT_KINDS})
+
+
+# |||||||||| REGISTRY ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+class VariableRegistry:
+    ''' Stores every created class literal together with secondary indexes by student, (teacher, slot), (room, slot), (class, slot),
+    (student, day) and session. Keys follow the usual (s, e, r, c/i, t) layout, where t is the starting time slot of the class. The gx,
+    gx2, gy, gy2, gz and gz2 dictionaries are shared by reference, so they always hold exactly the registered variables.
+
+    The class literals are memberships: student s joins the class opened by teacher e in room r at slot t. That class is the session
+    (family, e, r, c/i, t), which is shared by every student and every kind of the same family (a weekly gx and a biweekly gx2 of the
+    same course, or a first priority gy and a lower priority gz of the same instrument, can be the same class). '''
+
+    def __init__(self, gx, gx2, gy, gy2, gz, gz2, course_durations, instrument_durations, grid=DEFAULT_GRID):
+        self.variables = {'gx': gx, 'gx2': gx2, 'gy': gy, 'gy2': gy2, 'gz': gz, 'gz2': gz2}
+        self.durations = {'course': list(course_durations), 'instrument': list(instrument_durations)}
+        self.grid = grid
+
+        # Every index maps its key to a {(kind, key): var} dictionary, which keeps removals O(1)
+        self.by_student = defaultdict(dict)
+        self.by_teacher_slot = defaultdict(dict)
+        self.by_room_slot = defaultdict(dict)
+        self.by_class_slot = defaultdict(dict)
+        self.by_student_day = defaultdict(dict)
+        self.by_session = defaultdict(dict)
+
+        # Session literals, keyed by (family, e, r, c/i, t)
+        self.sessions = {}
+
+    def __len__(self):
+        return sum(len(variables) for variables in self.variables.values())
+
+    def day(self, t):
+        ''' Day a starting time slot belongs to. '''
+        return self.grid.day_of(t)
+
+    def duration(self, kind, k):
+        ''' Number of time slots a class of the given kind and index (c or i) spans. '''
+        return self.durations[FAMILY[kind]][k]
+
+    def _indexes(self, kind, key):
+        s, e, r, k, t = key
+        return (
+            self.by_student[s],
+            self.by_teacher_slot[e, t],
+            self.by_room_slot[r, t],
+            self.by_class_slot[FAMILY[kind], k, t],
+            self.by_student_day[s, self.day(t)],
+            self.by_session[FAMILY[kind], e, r, k, t],
+        )
+
+    def add(self, model, kind, key):
+        ''' Create the BoolVar for (kind, key) and register it in every index. '''
+        s, e, r, k, t = key
+        var = model.NewBoolVar(f'{kind}_s{s}_e{e}_r{r}_{"c" if FAMILY[kind] == "course" else "i"}{k}_t{t}')
+        self.variables[kind][key] = var
+        for index in self._indexes(kind, key):
+            index[kind, key] = var
+        return var
+
+    def remove(self, kind, key):
+        ''' Drop (kind, key) from the variable dictionary and every index. Unknown keys are ignored. '''
+        if self.variables[kind].pop(key, None) is None:
+            return
+        for index in self._indexes(kind, key):
+            index.pop((kind, key), None)
+
+    def add_session(self, model, session):
+        ''' Create the BoolVar of a session (family, e, r, c/i, t), which is true when the class is actually scheduled. '''
+        family, e, r, k, t = session
+        var = model.NewBoolVar(f'session_{family}_e{e}_r{r}_{"c" if family == "course" else "i"}{k}_t{t}')
+        self.sessions[session] = var
+        return var
+
+    def session_keys(self):
+        ''' Every (family, e, r, c/i, t) session with at least one registered member. '''
+        return [session for session, members in self.by_session.items() if members]
+
+    def session_duration(self, session):
+        return self.durations[session[0]][session[3]]
+
+    @staticmethod
+    def _select(index, kinds):
+        if kinds is None:
+            return [(kind, key, var) for (kind, key), var in index.items()]
+        return [(kind, key, var) for (kind, key), var in index.items() if kind in kinds]
+
+    def items(self, kinds=ALL_KINDS):
+        ''' All registered (kind, key, var) triplets of the requested kinds. '''
+        return [(kind, key, var) for kind in kinds for key, var in self.variables[kind].items()]
+
+    def student(self, s, kinds=None):
+        return self._select(self.by_student.get(s, {}), kinds)
+
+    def teacher_slot(self, e, t, kinds=None):
+        return self._select(self.by_teacher_slot.get((e, t), {}), kinds)
+
+    def room_slot(self, r, t, kinds=None):
+        return self._select(self.by_room_slot.get((r, t), {}), kinds)
+
+    def class_slot(self, family, k, t, kinds=None):
+        return self._select(self.by_class_slot.get((family, k, t), {}), kinds)
+
+    def student_day(self, s, d, kinds=None):
+        return self._select(self.by_student_day.get((s, d), {}), kinds)
+
+    def session_members(self, session, kinds=None):
+        return self._select(self.by_session.get(session, {}), kinds)
@@ -0,0 +1,114 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Solution Runs |||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# The rows of a model run (its input tables, assignments, insights, student count and index mappings) are stored once, under the
+# run_id of a row of solution_runs, and never copied. A solution is a named pointer to a run: a row of solutions maps
+# (user_id, solution_id) to a run_id. temp_sol points to the latest run of the user, which every new run moves on, and saving a
+# solution only points a new name at the run of temp_sol, so several saves of the same run share its rows.
+#
+# A run is written by the job that started it only, whatever temp_sol points to meanwhile, and it is complete once the job succeeded and
+# its input tables are stored. Only a complete run can be saved, so the rows of a saved solution never change. The time grid of the run
+# is stored with it: the time slots of its assignments only mean the same in another run (as hints, or as the reference of an
+# incremental run) solved on the same grid.
+#
+# A run is deleted once no solution points to it anymore: when temp_sol moves on from an unsaved run, or when the last solution
+# pointing to a run is deleted or pointed somewhere else.
+#
+# Queries read the rows of a solution through its pointer:
+#     SELECT * FROM students WHERE run_id = (SELECT run_id FROM solutions WHERE user_id = %s AND solution_id = %s)
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import json
+
+
+# |||||||||| SETTINGS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+TEMP_SOLUTION = "temp_sol"
+RUN_TABLES = [  # Tables holding the rows of a run
+    "students",
+    "teachers",
+    "rooms",
+    "courses",
+    "instruments",
+    "solution_assignments",
+    "solution_insights",
+    "student_count",
+    "student_index_mapping",
+    "teacher_index_mapping",
+    "room_index_mapping",
+    "course_index_mapping",
+    "instrument_index_mapping",
+]
+
+
+# |||||||||| RUNS AND POINTERS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+def solution_run(cursor, user_id, solution_id=TEMP_SOLUTION):
+    ''' run_id a solution of a user points to, or None if the user has no such solution. '''
+    cursor.execute("SELECT run_id FROM solutions WHERE user_id = %s AND solution_id = %s", (user_id, solution_id))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def run_complete(cursor, run_id):
+    ''' Whether a run is complete (see finish_run). '''
+    cursor.execute("SELECT complete FROM solution_runs WHERE run_id = %s", (run_id,))
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+def run_grid(cursor, run_id):
+    ''' Time grid a run was solved on (see time_grid.TimeGrid.spec), or None if it is not known. '''
+    cursor.execute("SELECT time_grid FROM solution_runs WHERE run_id = %s", (run_id,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def set_run_grid(cursor, run_id, grid):
+    cursor.execute("UPDATE solution_runs SET time_grid = %s WHERE run_id = %s", (json.dumps(grid.spec()), run_id))
+
+def same_grid(cursor, run_id, other_run_id):
+    ''' Whether two runs were solved on the same, known, time grid. '''
+    grid = run_grid(cursor, run_id)
+    return grid is not None and grid == run_grid(cursor, other_run_id)
+
+def start_run(cursor, user_id, solution_id=TEMP_SOLUTION):
+    ''' Create an empty run and point a solution (temp_sol by default) to it. Returns the run_id of the new run. '''
+    cursor.execute("INSERT INTO solution_runs (user_id) VALUES (%s) RETURNING run_id", (user_id,))
+    run_id = cursor.fetchone()[0]
+    point_solution(cursor, user_id, solution_id, run_id)
+    return run_id
+
+def finish_run(cursor, run_id):
+    ''' Mark a run complete: its job succeeded and its input tables are stored, so it can be saved and used as a reference. '''
+    cursor.execute("UPDATE solution_runs SET complete = TRUE WHERE run_id = %s", (run_id,))
+
+def point_solution(cursor, user_id, solution_id, run_id):
+    ''' Point a solution to a run, creating the solution if needed. The run it pointed to before is released. '''
+    previous = solution_run(cursor, user_id, solution_id)
+    cursor.execute("""
+        INSERT INTO solutions (user_id, solution_id, run_id)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (user_id, solution_id) DO UPDATE SET run_id = EXCLUDED.run_id, created_at = CURRENT_TIMESTAMP
+    """, (user_id, solution_id, run_id))
+    if previous is not None and previous != run_id:
+        release_run(cursor, previous)
+
+def drop_solution(cursor, user_id, solution_id):
+    ''' Delete a solution and release its run. Returns whether the solution existed. '''
+    cursor.execute("DELETE FROM solutions WHERE user_id = %s AND solution_id = %s RETURNING run_id", (user_id, solution_id))
+    row = cursor.fetchone()
+    if row is None:
+        return False
+    release_run(cursor, row[0])
+    return True
+
+def release_run(cursor, run_id):
+    ''' Delete every row of a run if no solution points to it anymore. Returns whether the run was deleted. '''
+    # Locking the run first makes a concurrent save of it wait for this transaction (and fail if the run is gone)
+    cursor.execute("SELECT 1 FROM solution_runs WHERE run_id = %s FOR UPDATE", (run_id,))
+    cursor.execute("SELECT 1 FROM solutions WHERE run_id = %s LIMIT 1", (run_id,))
+    if cursor.fetchone() is not None:
+        return False
+
+    for table in RUN_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE run_id = %s", (run_id,))
+    cursor.execute("DELETE FROM solution_runs WHERE run_id = %s", (run_id,))
+    return True
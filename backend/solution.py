@@ -11,6 +11,8 @@ import logging
 import ast
 import re
 
+from time_grid import DEFAULT_GRID
+
 
 # |||||||||| LOAD SCHEDULER SOLUTION ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 def load_data():
@@ -29,7 +31,7 @@ def safe_eval(val):
     except (ValueError, SyntaxError):
         return [0]  # Default to [0] if parsing fails
 
-def structure_data(solution, penalties, courses, instruments, teacher_info):
+def structure_data(solution, penalties, courses, instruments, teacher_info, grid=DEFAULT_GRID):
     ''' Group by ROOM, CLASS, START TIME, TEACHER, and aggregate student lists.
     Each student entry consists of a dictionary of penalties with the following structure: 
     {student: {"instrument_prioritization": count, "antiquity_day": count, "antiquity_deviation": count, "sibling_mismatch": count}}.
@@ -62,15 +64,15 @@ def structure_data(solution, penalties, courses, instruments, teacher_info):
         student_penalty_dict[student][penalty_mapping[penalty_type]] += 1
 
     # Map class durations and capacities from courses and instruments (convert minutes to time slots)
-    course_durations = {c: courses.iloc[c]["course_duration_minutes_per_session"] // 15 for c in range(len(courses))}
-    instrument_durations = {i: instruments.iloc[i]["instrument_duration_minutes_per_session"] // 15 for i in range(len(instruments))}
+    course_durations = {c: grid.slots(courses.iloc[c]["course_duration_minutes_per_session"]) for c in range(len(courses))}
+    instrument_durations = {i: grid.slots(instruments.iloc[i]["instrument_duration_minutes_per_session"]) for i in range(len(instruments))}
     course_capacities = {c: courses.iloc[c]["course_capacity"] for c in range(len(courses))}
     instrument_capacities = {i: instruments.iloc[i]["instrument_capacity"] for i in range(len(instruments))}
 
     # Parse contract column for teacher max weekly hours
     teacher_info['contract']
 
-    teacher_contracts = {t: teacher_info.iloc[t]['contract'][0] // 15 for t in range(len(teacher_info))}
+    teacher_contracts = {t: teacher_info.iloc[t]['contract'][0] // grid.slot_minutes for t in range(len(teacher_info))}
 
     # Group schedule solution by ROOM, CLASS, START TIME, TEACHER
     class_groups = solution.groupby(["ROOM", "CLASS", "START TIME", "TEACHER"]).agg({"STUDENT": list}).reset_index()
@@ -176,7 +178,7 @@ def peak_hour_congestion(class_groups):
     
     return peak_hours
 
-def room_underuse(class_groups):
+def room_underuse(class_groups, grid=DEFAULT_GRID):
     ''' Detects underused rooms, along with total usage time (in full time slots) across all week. '''
     # 7 time slots of duration equals to a range like 2-8, since both ends are always counted.
     class_groups = class_groups.assign(DURATION=class_groups["END TIME"] - class_groups["START TIME"] + 1)
@@ -184,8 +186,8 @@ def room_underuse(class_groups):
     # Calculate the total usage for each room
     room_usage = class_groups.groupby("ROOM")["DURATION"].sum()
     
-    # Calculate the maximum possible usage (assuming 100 as the max possible)
-    max_possible_usage = 100  # You can replace this with the actual maximum if needed
+    # Calculate the maximum possible usage (every time slot of the week)
+    max_possible_usage = grid.num_slots
     
     # Normalize the usage to the percentage of maximum possible usage
     actual_room_usage = (room_usage / max_possible_usage)
@@ -420,9 +422,9 @@ def update_sibling_penalties(class_groups, missmatch_days):
 
 import numpy as np
 
-def count_students_per_timeslot(class_groups):
+def count_students_per_timeslot(class_groups, grid=DEFAULT_GRID):
     # Initialize a dictionary to store the number of students at each time slot
-    student_count = {t: 0 for t in range(100)}
+    student_count = {t: 0 for t in range(grid.num_slots)}
     
     # Iterate through each row of the dataframe
     for _, row in class_groups.iterrows():
@@ -0,0 +1,5 @@
+# The backend modules import each other as top-level modules (they run from the backend directory), so the tests do too
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
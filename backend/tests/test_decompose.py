@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from decompose import pack_clusters, room_conflicts
+from time_grid import TimeGrid
+
+GRID = TimeGrid(slot_minutes=15)
+COURSES = pd.DataFrame({"course_duration_minutes_per_session": [60]})  # 4 slots
+INSTRUMENTS = pd.DataFrame({"instrument_duration_minutes_per_session": [30]})  # 2 slots
+
+
+@pytest.mark.parametrize("components, num_clusters, expected", [
+    # Largest component first, into the lightest cluster
+    ([([0], [0], 10), ([1], [1], 6), ([2], [2], 5)], 2, [([0], [0], 10), ([1, 2], [1, 2], 11)]),
+    # Never more clusters than components
+    ([([0, 1], [0], 4)], 3, [([0, 1], [0], 4)]),
+    # A single cluster holds everything
+    ([([2], [1], 1), ([0, 1], [0], 3)], 1, [([0, 1, 2], [0, 1], 4)]),
+    ([], 2, []),
+])
+def test_pack_clusters(components, num_clusters, expected):
+    assert sorted(pack_clusters(components, num_clusters)) == sorted(expected)
+
+
+def decomposition(*clusters):
+    ''' Decomposition of solved clusters, each given as {student: [(kind, (e, r, k, t))]}. '''
+    solved, classes = [], []
+    for cluster in clusters:
+        solved.append((sorted(cluster), [], "OPTIMAL", 0, 0))
+        classes += [(kind, (s, e, r, k, t)) for s, student_classes in cluster.items() for kind, (e, r, k, t) in student_classes]
+    return {"components": len(clusters), "clusters": solved, "classes": classes}
+
+
+@pytest.mark.parametrize("clusters, expected", [
+    # Same room, overlapping slots, different clusters: both classes are in conflict
+    (({0: [("gx", (0, 0, 0, 10))]}, {1: [("gy", (1, 0, 0, 12))]}), {0, 1}),
+    # Back to back in the same room
+    (({0: [("gx", (0, 0, 0, 10))]}, {1: [("gy", (1, 0, 0, 14))]}), set()),
+    # Different rooms
+    (({0: [("gx", (0, 0, 0, 10))]}, {1: [("gy", (1, 1, 0, 10))]}), set()),
+    # The same room and slots within one cluster is a shared class, not a conflict
+    (({0: [("gx", (0, 0, 0, 10))], 1: [("gx", (0, 0, 0, 10))]},), set()),
+    # Every student of a conflicting class is freed, students of other classes are not
+    (({0: [("gx", (0, 0, 0, 10))], 2: [("gx", (0, 0, 0, 10))], 3: [("gy", (0, 1, 0, 10))]}, {1: [("gz", (1, 0, 0, 13))]}), {0, 1, 2}),
+])
+def test_room_conflicts(clusters, expected):
+    assert room_conflicts(decomposition(*clusters), COURSES, INSTRUMENTS, GRID) == expected
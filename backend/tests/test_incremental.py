@@ -0,0 +1,76 @@
+import pytest
+
+from incremental import diff_inputs, affected_students
+
+EMPTY = {"unchanged": set(), "modified": set(), "added": set(), "removed": set()}
+
+
+def students(**rows):
+    ''' Input with only a students table, given as s<id>=row. '''
+    return {"students": {int(key[1:]): row for key, row in rows.items()}}
+
+
+@pytest.mark.parametrize("reference, current, expected", [
+    # Same row, new row, changed row and dropped row
+    (
+        students(s1={"name": "Ana"}, s2={"name": "Bo"}, s3={"name": "Cy"}),
+        students(s1={"name": "Ana"}, s2={"name": "Bob"}, s4={"name": "Di"}),
+        {"unchanged": {1}, "modified": {2}, "added": {4}, "removed": {3}},
+    ),
+    # JSON columns compare by value, whether they come as text (database) or decoded (input file)
+    (
+        students(s1={"siblings": "[2, 3]", "availability": '{"MON": ["16:00-18:00"]}'}),
+        students(s1={"siblings": [2, 3], "availability": {"MON": ["16:00-18:00"]}}),
+        {**EMPTY, "unchanged": {1}},
+    ),
+    (students(s1={"siblings": [2, 3]}), students(s1={"siblings": [3, 2]}), {**EMPTY, "modified": {1}}),
+    # Columns outside the input tables are ignored
+    (students(s1={"name": "Ana", "id": 7}), students(s1={"name": "Ana", "id": 8}), {**EMPTY, "unchanged": {1}}),
+    ({}, students(s1={}), {**EMPTY, "added": {1}}),
+])
+def test_diff_inputs(reference, current, expected):
+    diff = diff_inputs(reference, current)
+    assert diff["students"] == expected
+    assert all(diff[table_name] == EMPTY for table_name in ("teachers", "rooms", "courses", "instruments"))
+
+
+def diff(**changes):
+    ''' Diff with the given {state: ids} per table (e.g. students_added={5}), every other state empty. '''
+    result = {table_name: {state: set() for state in EMPTY} for table_name in ("students", "teachers", "rooms", "courses", "instruments")}
+    for key, ids in changes.items():
+        table_name, state = key.split("_")
+        result[table_name][state] = set(ids)
+    return result
+
+
+# (student, teacher, room, family, class, slot) of the reference: students 1 and 2 share a course class, 3 has an instrument class
+# with another teacher in another room, and 4 has a course class of their own
+ASSIGNMENTS = [
+    (1, 10, 100, "course", 1000, 4),
+    (2, 10, 100, "course", 1000, 4),
+    (3, 11, 101, "instrument", 2000, 8),
+    (4, 10, 100, "course", 1001, 12),
+]
+CURRENT = {"students": {1: {}, 2: {}, 3: {"siblings": "[5]"}, 4: {}, 5: {"siblings": [3]}}}
+
+
+@pytest.mark.parametrize("changes, expected", [
+    ({}, set()),
+    # A modified student brings their classmates along
+    ({"students_modified": {1}}, {1, 2}),
+    # An added student brings their siblings along, whether siblings come as text or decoded
+    ({"students_added": {5}}, {3, 5}),
+    ({"students_modified": {3}}, {3, 5}),
+    # Every student of a class of a modified or removed teacher, room or class
+    ({"teachers_modified": {11}}, {3, 5}),
+    ({"rooms_removed": {100}}, {1, 2, 4}),
+    ({"courses_modified": {1001}}, {4}),
+    ({"instruments_modified": {1000}}, set()),  # Course and instrument ids are separate
+    # Classmates of a removed student, who is not part of the current input anymore
+    ({"students_removed": {2}}, {1}),
+])
+def test_affected_students(changes, expected):
+    current = CURRENT
+    if "students_removed" in changes:
+        current = {"students": {s: row for s, row in CURRENT["students"].items() if s not in changes["students_removed"]}}
+    assert affected_students(diff(**changes), ASSIGNMENTS, current) == expected
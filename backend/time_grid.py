@@ -0,0 +1,120 @@
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||| SCHEDULER:  Time Grid ||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# The week the model schedules is a grid of time slots: a list of days, each with its own opening and closing time, split into slots of
+# a fixed number of minutes. Time slots are numbered consecutively across the week (Monday first), so a class starting at slot t
+# belongs to the day whose slot range contains t. The model size grows linearly with the number of slots, so a coarser grid (30 minute
+# slots) is a cheap way of running fast what-if solves, while the default 15 minute grid is used for final runs.
+
+
+# |||||||||| IMPORT LIBRARIES |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+import math
+import numpy as np
+from datetime import datetime
+from functools import lru_cache
+
+
+# |||||||||| DEFAULTS ||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+DAYS = ('MON', 'TUE', 'WED', 'THU', 'FRI')
+OPEN_TIME = '16:00'
+CLOSE_TIME = '21:00'
+SLOT_MINUTES = 15
+
+
+# |||||||||| HELPER FUNCTIONS |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+@lru_cache(maxsize=None)
+def to_minutes(time):
+    ''' Minutes since midnight of an "HH:MM" string. Only a handful of distinct times exist, so parsing is cached. '''
+    parsed = datetime.strptime(time, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+def to_time(minutes):
+    ''' "HH:MM" string of a number of minutes since midnight. '''
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# |||||||||| TIME GRID |||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+class TimeGrid:
+    ''' Days, opening and closing time of every day and slot length of the schedule. Opening and closing times are the same for every
+    day unless hours maps some days to their own (open, close) pair. Every lookup (slot to day, minute or label, day and minute to slot,
+    day ranges and whether a class fits within a single day) is precomputed, so they are all O(1). '''
+
+    def __init__(self, days=DAYS, open_time=OPEN_TIME, close_time=CLOSE_TIME, slot_minutes=SLOT_MINUTES, hours=None):
+        hours = hours or {}
+        self.days = tuple(day.upper() for day in days)
+        self.slot_minutes = int(slot_minutes)
+        if self.slot_minutes <= 0:
+            raise ValueError(f"Slot length must be a positive number of minutes, got {slot_minutes}")
+
+        # Opening minute and number of slots of every day
+        self.day_open = []
+        self.day_slots = []
+        for day in self.days:
+            day_open, day_close = hours.get(day, (open_time, close_time))
+            day_open, day_close = to_minutes(day_open), to_minutes(day_close)
+            if day_close <= day_open:
+                raise ValueError(f"{day} closes at {to_time(day_close)}, before it opens at {to_time(day_open)}")
+            self.day_open.append(day_open)
+            self.day_slots.append((day_close - day_open) // self.slot_minutes)
+
+        self.num_days = len(self.days)
+        self.day_start = [sum(self.day_slots[:d]) for d in range(self.num_days)]
+        self.num_slots = sum(self.day_slots)
+        self.day_index = {day: d for d, day in enumerate(self.days)}
+
+        # Slot to day, to minute of the day and to the first slot after its day
+        self.slot_day = np.repeat(np.arange(self.num_days), self.day_slots)
+        self.slot_minute = np.concatenate([
+            self.day_open[d] + self.slot_minutes * np.arange(self.day_slots[d]) for d in range(self.num_days)
+        ]).astype(np.int64) if self.num_slots else np.zeros(0, dtype=np.int64)
+        self.slot_day_end = np.asarray([self.day_start[d] + self.day_slots[d] for d in self.slot_day], dtype=np.int64)
+
+        self.labels = [f"{self.days[d]} {to_time(int(minute))}" for d, minute in zip(self.slot_day, self.slot_minute)]
+
+    def __repr__(self):
+        return f"TimeGrid(days={self.days}, slot_minutes={self.slot_minutes}, num_slots={self.num_slots})"
+
+    def spec(self):
+        ''' JSON form of the grid (days, opening and closing time of every day and slot length), as stored with a run (see runs.py).
+        The closing time is the end of the last slot of the day, so two grids have the same spec if and only if they have the same
+        slots. '''
+        return {
+            "days": list(self.days),
+            "open": [to_time(self.day_open[d]) for d in range(self.num_days)],
+            "close": [to_time(self.day_open[d] + self.day_slots[d] * self.slot_minutes) for d in range(self.num_days)],
+            "slot_minutes": self.slot_minutes,
+        }
+
+    def day_of(self, t):
+        ''' Day a time slot belongs to. '''
+        return int(self.slot_day[t])
+
+    def minute_of(self, t):
+        ''' Minute of the day a time slot starts at. '''
+        return int(self.slot_minute[t])
+
+    def label(self, t):
+        return self.labels[t]
+
+    def slot(self, d, minute):
+        ''' Time slot starting at the given minute of day d, or None if no slot starts there. '''
+        offset, remainder = divmod(minute - self.day_open[d], self.slot_minutes)
+        if remainder or not 0 <= offset < self.day_slots[d]:
+            return None
+        return self.day_start[d] + offset
+
+    def day_range(self, d):
+        ''' Time slots of day d. '''
+        return range(self.day_start[d], self.day_start[d] + self.day_slots[d])
+
+    def fits_same_day(self, t, duration):
+        ''' Whether a class of the given duration (in slots) starting at slot t ends on the same day it starts. '''
+        return 0 <= t < self.num_slots and t + duration <= self.slot_day_end[t]
+
+    def slots(self, minutes):
+        ''' Number of time slots a class of the given duration (in minutes) spans. Partial slots are rounded up. '''
+        return math.ceil(minutes / self.slot_minutes)
+
+
+DEFAULT_GRID = TimeGrid()
@@ -0,0 +1,26 @@
+-- COMPOSITE (user_id, solution_id) INDEXES
+-- Every read, save, delete and input load filters the input and solution tables by user_id AND solution_id, which without an index
+-- is a sequential scan over every solution ever saved. Safe to run on a live database and to run again:
+--     psql "$DATABASE_URL" -f db/migrations/001_solution_indexes.sql
+-- CREATE INDEX CONCURRENTLY does not lock writes, but it cannot run inside a transaction, so do not run this file with psql -1. If a
+-- build is interrupted it leaves an INVALID index behind, which IF NOT EXISTS skips: drop it and run the file again.
+
+-- Input tables
+CREATE INDEX CONCURRENTLY IF NOT EXISTS students_user_id_solution_id_idx ON students (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS teachers_user_id_solution_id_idx ON teachers (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rooms_user_id_solution_id_idx ON rooms (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS courses_user_id_solution_id_idx ON courses (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS instruments_user_id_solution_id_idx ON instruments (user_id, solution_id);
+
+-- Saved solutions
+CREATE INDEX CONCURRENTLY IF NOT EXISTS solution_assignments_user_id_solution_id_idx ON solution_assignments (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS solution_insights_user_id_solution_id_idx ON solution_insights (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS student_index_mapping_user_id_solution_id_idx ON student_index_mapping (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS teacher_index_mapping_user_id_solution_id_idx ON teacher_index_mapping (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS room_index_mapping_user_id_solution_id_idx ON room_index_mapping (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS course_index_mapping_user_id_solution_id_idx ON course_index_mapping (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS instrument_index_mapping_user_id_solution_id_idx ON instrument_index_mapping (user_id, solution_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS student_count_user_id_solution_id_idx ON student_count (user_id, solution_id);
+
+ANALYZE students, teachers, rooms, courses, instruments, solution_assignments, solution_insights, student_index_mapping,
+    teacher_index_mapping, room_index_mapping, course_index_mapping, instrument_index_mapping, student_count;
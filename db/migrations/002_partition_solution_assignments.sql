@@ -0,0 +1,38 @@
+-- OPTIONAL: HASH PARTITIONING OF solution_assignments BY user_id
+-- solution_assignments holds a row per class and student of every saved solution, by far the largest table. Partitioning it by
+-- user_id keeps every partition (and its (user_id, solution_id) index) to a fraction of the users, and a solution is read and
+-- deleted within a single partition. Worth it once there are many users with many saved solutions; 001 is enough before that.
+-- Rewrites the table and locks it while it runs, so run it in one transaction during a quiet moment:
+--     psql "$DATABASE_URL" -1 -f db/migrations/002_partition_solution_assignments.sql
+-- The primary key of a partitioned table must include the partition key, so it becomes (user_id, id). ids keep coming from the same
+-- sequence.
+
+ALTER TABLE solution_assignments RENAME TO solution_assignments_unpartitioned;
+ALTER INDEX solution_assignments_pkey RENAME TO solution_assignments_unpartitioned_pkey;
+ALTER TABLE solution_assignments_unpartitioned DROP CONSTRAINT IF EXISTS solution_assignments_user_id_solution_id_fkey;
+ALTER INDEX IF EXISTS solution_assignments_user_id_solution_id_idx RENAME TO solution_assignments_unpartitioned_user_id_solution_id_idx;
+
+CREATE TABLE solution_assignments (
+    LIKE solution_assignments_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (user_id, id),
+    CONSTRAINT solution_assignments_user_id_solution_id_fkey
+        FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+) PARTITION BY HASH (user_id);
+
+DO $$
+BEGIN
+    FOR remainder IN 0..7 LOOP
+        EXECUTE format(
+            'CREATE TABLE solution_assignments_p%s PARTITION OF solution_assignments FOR VALUES WITH (MODULUS 8, REMAINDER %s)',
+            remainder, remainder
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO solution_assignments SELECT * FROM solution_assignments_unpartitioned;
+CREATE INDEX solution_assignments_user_id_solution_id_idx ON solution_assignments (user_id, solution_id);
+
+ALTER SEQUENCE solution_assignments_id_seq OWNED BY solution_assignments.id;
+DROP TABLE solution_assignments_unpartitioned;
+
+ANALYZE solution_assignments;
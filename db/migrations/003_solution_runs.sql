@@ -0,0 +1,63 @@
+-- SOLUTION RUNS: SAVE A SOLUTION WITHOUT COPYING IT
+-- The rows of a solution move from (user_id, solution_id) to the run_id of a new solution_runs table, and solutions becomes a table
+-- of named pointers to runs (see backend/runs.py). Every existing solution gets a run of its own holding its rows. From then on,
+-- saving a solution only points a new name to the run of temp_sol instead of copying every row of it.
+-- Rewrites every solution table, so run it in one transaction during a quiet moment, with the API stopped:
+--     psql "$DATABASE_URL" -1 -f db/migrations/003_solution_runs.sql
+-- The (user_id, solution_id) indexes of 001 go away with the solution_id column, replaced by indexes on run_id. If
+-- solution_assignments was partitioned by 002 it stays partitioned by user_id; a run is then looked up in every partition.
+-- Rows of the input tables without a solution (solution_id NULL) could never be read, and are dropped.
+
+CREATE TABLE solution_runs (
+    run_id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(user_id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE solutions ADD COLUMN run_id INTEGER;
+UPDATE solutions SET run_id = nextval('solution_runs_run_id_seq');
+INSERT INTO solution_runs (run_id, user_id, created_at) SELECT run_id, user_id, created_at FROM solutions;
+ALTER TABLE solutions ALTER COLUMN run_id SET NOT NULL;
+ALTER TABLE solutions ADD CONSTRAINT solutions_run_id_fkey FOREIGN KEY (run_id) REFERENCES solution_runs(run_id);
+CREATE INDEX solutions_run_id_idx ON solutions (run_id);
+
+DO $$
+DECLARE
+    solution_table TEXT;
+BEGIN
+    FOREACH solution_table IN ARRAY ARRAY[
+        'students', 'teachers', 'rooms', 'courses', 'instruments', 'solution_assignments', 'solution_insights', 'student_count',
+        'student_index_mapping', 'teacher_index_mapping', 'room_index_mapping', 'course_index_mapping', 'instrument_index_mapping'
+    ] LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN run_id INTEGER', solution_table);
+        EXECUTE format(
+            'UPDATE %I AS t SET run_id = s.run_id FROM solutions AS s WHERE s.user_id = t.user_id AND s.solution_id = t.solution_id',
+            solution_table
+        );
+        EXECUTE format('DELETE FROM %I WHERE run_id IS NULL', solution_table);
+        -- Drops the foreign key to solutions, the (user_id, solution_id) index and the primary key of the mapping tables with it
+        EXECUTE format('ALTER TABLE %I DROP COLUMN solution_id', solution_table);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN run_id SET NOT NULL', solution_table);
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)',
+            solution_table, solution_table || '_run_id_fkey'
+        );
+    END LOOP;
+END $$;
+
+ALTER TABLE student_count ADD PRIMARY KEY (run_id, time_slot);
+ALTER TABLE student_index_mapping ADD PRIMARY KEY (run_id, index);
+ALTER TABLE teacher_index_mapping ADD PRIMARY KEY (run_id, index);
+ALTER TABLE room_index_mapping ADD PRIMARY KEY (run_id, index);
+ALTER TABLE course_index_mapping ADD PRIMARY KEY (run_id, index);
+ALTER TABLE instrument_index_mapping ADD PRIMARY KEY (run_id, index);
+
+CREATE INDEX students_run_id_idx ON students (run_id);
+CREATE INDEX teachers_run_id_idx ON teachers (run_id);
+CREATE INDEX rooms_run_id_idx ON rooms (run_id);
+CREATE INDEX courses_run_id_idx ON courses (run_id);
+CREATE INDEX instruments_run_id_idx ON instruments (run_id);
+CREATE INDEX solution_assignments_run_id_idx ON solution_assignments (run_id);
+CREATE INDEX solution_insights_run_id_idx ON solution_insights (run_id);
+
+ANALYZE;
@@ -0,0 +1,8 @@
+-- COMPLETE RUNS: ONLY SAVE A RUN ONCE ITS JOB IS DONE
+-- A run is written by its job until the job succeeds and the input tables of the run are stored; the job then marks it complete
+-- (see backend/runs.py). /save-solution refuses a run that is not complete, so a saved solution never points to a half-written run.
+-- Run it while no job is running: every existing run then comes from a finished job, and is marked complete:
+--     psql "$DATABASE_URL" -1 -f db/migrations/004_solution_runs_complete.sql
+
+ALTER TABLE solution_runs ADD COLUMN complete BOOLEAN NOT NULL DEFAULT FALSE;
+UPDATE solution_runs SET complete = TRUE;
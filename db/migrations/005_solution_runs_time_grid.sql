@@ -0,0 +1,9 @@
+-- TIME GRID OF A RUN
+-- The time slots of the assignments of a run are indexes into the time grid it was solved on, so the grid (days, opening and closing
+-- time of every day and slot length, see backend/time_grid.py) is stored with the run. Hints and incremental runs only reuse the
+-- slots of a saved solution solved on the grid of the new run, and the UI draws a solution on its own grid.
+-- The grid of the existing runs is not known, so they are left without one: they are no longer used as hints or references, and
+-- the UI draws them on the default grid, as before. Safe to run on a live database:
+--     psql "$DATABASE_URL" -f db/migrations/005_solution_runs_time_grid.sql
+
+ALTER TABLE solution_runs ADD COLUMN time_grid JSONB;
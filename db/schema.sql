@@ -20,8 +20,12 @@ DROP TABLE IF EXISTS room_index_mapping CASCADE;
 DROP TABLE IF EXISTS solution_insights CASCADE;
 DROP TABLE IF EXISTS solution_assignments CASCADE;
 
+-- Drop solver jobs
+DROP TABLE IF EXISTS solver_jobs CASCADE;
+
 -- Drop solution tracking and users last
 DROP TABLE IF EXISTS solutions CASCADE;
+DROP TABLE IF EXISTS solution_runs CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
 
@@ -35,10 +39,22 @@ CREATE TABLE IF NOT EXISTS users (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- SAVED SOLUTIONS
+-- RUNS AND SAVED SOLUTIONS (see backend/runs.py)
+-- The rows of every run of the model are stored once, under its run_id. A solution is a name pointing to a run: temp_sol points to
+-- the latest run of the user, and saving a solution points a new name to that run once it is complete (its job succeeded and its
+-- input tables are stored). time_grid is the grid the run was solved on (see backend/time_grid.py).
+CREATE TABLE solution_runs (
+    run_id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(user_id),
+    complete BOOLEAN NOT NULL DEFAULT FALSE,
+    time_grid JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE solutions (
     user_id INTEGER REFERENCES users(user_id),
     solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL REFERENCES solution_runs(run_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (user_id, solution_id)
 );
@@ -48,69 +64,69 @@ CREATE TABLE students (
     student_id INTEGER,
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     name VARCHAR(100),
     availability JSONB,
     antiquity JSONB,
     siblings JSONB,
     courses JSONB,
     instruments JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE teachers (
     teacher_id INTEGER,
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     name VARCHAR(100),
     availability JSONB,
     contract JSONB,
     courses JSONB,
     instruments JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE rooms (
     room_id INTEGER,
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     name VARCHAR(100),
     capacity INT,
     features JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE courses (
     course_id INTEGER,
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     name VARCHAR(100),
     duration JSONB,
     capacity INT,
     features JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE instruments (
     instrument_id INTEGER,
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     name VARCHAR(100),
     duration JSONB,
     capacity INT,
     features JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 -- TABLES FOR SAVED SOLUTIONS
 CREATE TABLE solution_assignments (
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     class_name VARCHAR(100),
     start_time INTEGER,
     end_time INTEGER,
@@ -125,13 +141,13 @@ CREATE TABLE solution_assignments (
     antiquity_day_penalty INTEGER,
     antiquity_deviation_penalty INTEGER,
     sibling_mismatch_penalty INTEGER,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE solution_insights (
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     workload_balance_index FLOAT,
     daily_workload_deviation JSONB,
     underutilized_teachers JSONB,
@@ -142,64 +158,90 @@ CREATE TABLE solution_insights (
     room_underuse JSONB,
     missing_course_students JSONB,
     missing_instrument_students JSONB,
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE room_index_mapping (
     index INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     room_id INTEGER,
     name VARCHAR(100),
-    PRIMARY KEY (solution_id, index),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, index),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE student_index_mapping (
     index INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     student_id INTEGER,
     name VARCHAR(100),
-    PRIMARY KEY (solution_id, index),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, index),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE teacher_index_mapping (
     index INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     teacher_id INTEGER,
     name VARCHAR(100),
-    PRIMARY KEY (solution_id, index),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, index),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE instrument_index_mapping (
     index INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     instrument_id INTEGER,
     name VARCHAR(100),
-    PRIMARY KEY (solution_id, index),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, index),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE course_index_mapping (
     index INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     course_id INTEGER,
     name VARCHAR(100),
-    PRIMARY KEY (solution_id, index),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, index),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
 );
 
 CREATE TABLE student_count (
     time_slot INTEGER,
     user_id INTEGER,
-    solution_id VARCHAR(63),
+    run_id INTEGER NOT NULL,
     students INTEGER,
-    PRIMARY KEY (solution_id, time_slot),
-    FOREIGN KEY (user_id, solution_id) REFERENCES solutions(user_id, solution_id)
+    PRIMARY KEY (run_id, time_slot),
+    FOREIGN KEY (run_id) REFERENCES solution_runs(run_id)
+);
+
+-- INDEXES: every query reads or deletes the rows of a run (the primary key of the mapping and student_count tables starts with
+-- run_id), and releasing a run looks for the solutions pointing to it (see db/migrations/003_solution_runs.sql)
+CREATE INDEX solutions_run_id_idx ON solutions (run_id);
+CREATE INDEX students_run_id_idx ON students (run_id);
+CREATE INDEX teachers_run_id_idx ON teachers (run_id);
+CREATE INDEX rooms_run_id_idx ON rooms (run_id);
+CREATE INDEX courses_run_id_idx ON courses (run_id);
+CREATE INDEX instruments_run_id_idx ON instruments (run_id);
+CREATE INDEX solution_assignments_run_id_idx ON solution_assignments (run_id);
+CREATE INDEX solution_insights_run_id_idx ON solution_insights (run_id);
+
+-- SOLVER JOBS (see backend/jobs.py)
+CREATE TABLE solver_jobs (
+    job_id VARCHAR(36) PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    options JSONB,
+    payload JSONB,
+    workers INTEGER,
+    return_code INTEGER,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
 );
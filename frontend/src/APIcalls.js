@@ -12,7 +12,8 @@ const fetchWithHandling = async (url, options = {}) => {
 export const runModel = (userId, inputData, signal) => {
   return fetchWithHandling(`${API_BASE}/run-model`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    // Ask for typed progress events (one JSON object per line) instead of the raw model output
+    headers: { "Content-Type": "application/json", Accept: "application/x-ndjson" },
     body: JSON.stringify({
       user_id: userId,
       data: inputData,  // This is the full input JSON
@@ -21,8 +22,12 @@ export const runModel = (userId, inputData, signal) => {
   });
 };
 
-export const stopModel = () => {
-  return fetchWithHandling(`${API_BASE}/stop-model`, { method: "POST" });
+export const stopModel = (userId) => {
+  return fetchWithHandling(`${API_BASE}/stop-model`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ user_id: userId }),
+  });
 };
 
 export const validateSolution = (userId, solutionId) => {
@@ -94,6 +99,19 @@ export const customFetchNameMapping = (modifiedEndpoint, userId, solutionId) =>
   });
 };
 
+// Everything the solution screen shows, in one request. Resolves to null if the solution does not exist or is incomplete.
+// A GET, so the browser keeps the response and revalidates it with its ETag when the solution is opened again
+export const fetchSolutionBundle = async (userId, solutionId) => {
+  const params = new URLSearchParams({ user_id: userId, solution_id: solutionId });
+  const response = await fetch(`${API_BASE}/solution-bundle?${params}`);
+  if (response.status === 404) return null;
+  if (!response.ok) {
+    const text = await response.text();
+    throw new Error(`HTTP ${response.status}: ${text}`);
+  }
+  return response.json();
+};
+
 export const saveSolution = (userId, solutionId) => {
   return fetchWithHandling(`${API_BASE}/save-solution`, {
     method: "POST",
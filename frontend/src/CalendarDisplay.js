@@ -3,6 +3,8 @@ import "react-big-calendar/lib/css/react-big-calendar.css";
 import Modal from "react-modal";
 import moment from "moment";
 
+import { gridHours } from './timeGrid';
+
 // CSS
 import './CalendarDisplay.css';
 
@@ -20,9 +22,11 @@ const CalendarDisplay = ({
   instrumentNames,
   roomNames,
   studentNames,
+  timeGrid,
 }) => {
   
 const days = ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"];
+const hours = gridHours(timeGrid); // The calendar spans from the earliest opening to the latest closing of the grid
 
     return (
         <>
@@ -43,10 +47,6 @@ const days = ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"];
                     ),
                     }}
                     events={events.map(event => {
-                    // Add 15 minutes to each event's end time
-                    const endTime = new Date(event.end);
-                    endTime.setMinutes(endTime.getMinutes() + 15);
-                    
                     // Extract type (Course or Instrument) and ID
                     const [type, id] = event.title.split(" ").slice(0, 2); // Extracts "Course X" or "Instrument Y"
                     const index = Number(id); // Convert to a number for lookup
@@ -64,7 +64,6 @@ const days = ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"];
                     return {
                         ...event,
                         cleanTitle: name, // Use only the name, with "Class" added for instruments
-                        end: endTime, // Add 15 minutes to the end time
                     };
                     })}
                     
@@ -73,8 +72,8 @@ const days = ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"];
                     views={["week"]}
                     defaultView="week"
                     toolbar={false}
-                    min={new Date(2000, 0, 3, 16, 0, 0)} // Start at 16:00
-                    max={new Date(2000, 0, 3, 21, 0, 0)} // End at 21:00
+                    min={new Date(2000, 0, 3, 0, hours.open, 0)}
+                    max={new Date(2000, 0, 3, 0, hours.close, 0)}
                     step={30} // 15-minute intervals
                     timeslots={1}
                     formats={{
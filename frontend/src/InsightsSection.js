@@ -24,6 +24,8 @@ import {
   GaugeChart,  
 } from './insightsCharts';
 
+import { gridSlots, toTime } from './timeGrid';
+
 // CSS
 import './FlippableCard.css';
 
@@ -48,23 +50,16 @@ const FlippableCard = ({ title, frontContent, backContent }) => {
 };
 
 // Helper function fot the Peak Hour Congestion card
-const convertTimeSlotToRealTime = (slot) => {
-    const days = ["Mon", "Tue", "Wed", "Thu", "Fri"];
-    const startHour = 16;
-    const intervalMinutes = 15;
-    
-    const dayIndex = Math.floor(slot / 20);
-    const timeIndex = slot % 20;
-  
-    if (dayIndex < 0 || dayIndex > 4) return "Invalid Time";
-  
-    const hours = startHour + Math.floor(timeIndex / 4);
-    const minutes = (timeIndex % 4) * intervalMinutes;
-  
-    return `${days[dayIndex]} ${hours.toString().padStart(2, "0")}:${minutes.toString().padStart(2, "0")}`;
+const convertTimeSlotToRealTime = (slot, slots) => {
+    if (!slots[slot]) return "Invalid Time";
+
+    const { day, minute } = slots[slot];
+    return `${day.charAt(0)}${day.slice(1).toLowerCase()} ${toTime(minute)}`;
   };
 
-const InsightsSection = ({ insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames }) => {
+const InsightsSection = ({ insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames, timeGrid }) => {
+    const slots = gridSlots(timeGrid); // Day and minute every time slot of the solution starts at
+
     // Card titles
   const insightTitles = [
     "Peak Hour Congestion",
@@ -195,6 +190,7 @@ const InsightsSection = ({ insightsData, studentCount, studentNames, teacherName
                             <PeakHourMatrix 
                                 label="Missing Instrument Students"
                                 studentCount={studentCount}
+                                timeGrid={timeGrid}
                             />
                         </div>
                         ) : title === "Missing Course Students" ? (
@@ -335,7 +331,7 @@ const InsightsSection = ({ insightsData, studentCount, studentNames, teacherName
                                         .sort((a, b) => b[1] - a[1]) // Sort by student count in descending order
                                         .map(([timeSlot, studentCount]) => (
                                             <div key={timeSlot} className="list-item">
-                                                <span className="list-id">{convertTimeSlotToRealTime(Number(timeSlot))}</span>
+                                                <span className="list-id">{convertTimeSlotToRealTime(Number(timeSlot), slots)}</span>
                                                 <span className="score">{studentCount}</span>
                                             </div>
                                         ))
@@ -10,13 +10,11 @@ import TopBar from './TopBar';
 import {
   runModel,
   stopModel,
-  validateSolution,
-  customFetchSolutionCSV,
-  customFetchInsightsCSV,
-  customFetchStudentCountData,
-  customFetchNameMapping,
+  fetchSolutionBundle,
 } from './APIcalls';
 
+import { DEFAULT_TIME_GRID } from './timeGrid';
+
 // CSS
 import './App.css';
 
@@ -50,6 +48,7 @@ function MainScreen() {
     const [roomNames, setRoomNames] = useState([]);
     const [courseNames, setCourseNames] = useState([]);
     const [instrumentNames, setInstrumentNames] = useState([]);
+    const [timeGrid, setTimeGrid] = useState(DEFAULT_TIME_GRID);
     const [isRunning, setIsRunning] = useState(false);
     const [isHoveredRun, setIsHoveredRun] = useState(false);
     const [isHoveredLoad, setIsHoveredLoad] = useState(false);
@@ -187,24 +186,8 @@ function MainScreen() {
     const handleLoadSolution  = async (solutionId) => {
         try {
             // API Call
-            const res = await validateSolution(loggedInUserId, solutionId);
-
-            if (!res.ok) {
-                throw new Error(`HTTP ${res.status}: ${await res.text()}`);
-            }
-
-            const data = await res.json();
-
-            if (data.valid === true) {
-                await Promise.all([
-                    fetchSolutionData('True', solutionId),
-                    fetchInsightsData('True', solutionId),
-                    fetchStudentCount('True', solutionId),
-                    fetchData('True', solutionId)
-                ]);
-            
-            setLoadedSolution(true);
-
+            if (await loadSolutionBundle(solutionId)) {
+                setLoadedSolution(true);
             } else {
                 alert("Invalid solution folder: it does not exist or is incomplete.");
             }
@@ -218,6 +201,30 @@ function MainScreen() {
         loadedFiles.map(f => [f.file.name.replace('.json', ''), f.content])
     );
 
+    // Called from runModelWithState: one line of output per progress event
+    const formatProgressEvent = (event) => {
+        switch (event.type) {
+            case "job":
+                return event.status === "queued"
+                    ? `Queued (position ${event.queue_position})`
+                    : `Running (${event.workers} search workers)`;
+            case "input":
+                return Object.entries(event.tables).map(([table, { rows, rejected }]) =>
+                    `${table}: ${rows} loaded` + (rejected.length ? `, ${rejected.length} rejected (${rejected.map((r) => r.error).join("; ")})` : "")
+                ).join("\n");
+            case "phase":
+                return event.state === "end" ? `${event.phase}: ${event.duration.toFixed(2)}s` : null;
+            case "incumbent":
+                return `Solution ${event.solution}: objective ${event.objective}, bound ${event.bound}, gap ${(event.gap * 100).toFixed(1)}% (${event.elapsed.toFixed(1)}s)`;
+            case "result":
+                return `Solver finished: ${event.status}` + (event.objective !== undefined ? ` (objective ${event.objective})` : "");
+            case "status":
+                return `Run ${event.status}` + (event.error ? `: ${event.error}` : "");
+            default:
+                return null;
+        }
+    };
+
     // Called from handleRunModel
     const runModelWithState = async () => {
         try {
@@ -232,17 +239,31 @@ function MainScreen() {
             // API Call
             const response = await runModel(loggedInUserId, filesDict, controllerRef.current.signal);
         
+            // The response is a stream of progress events, one JSON object per line
             const reader = response.body.getReader();
             const decoder = new TextDecoder();
+            let buffer = "";
+            let finalStatus = null;
             let done = false;
         
             while (!done) {
                 const { value, done: doneReading } = await reader.read();
-                setOutput((prevOutput) => prevOutput + decoder.decode(value, { stream: true }));
                 done = doneReading;
+                buffer += decoder.decode(value, { stream: !done });
+
+                // Keep the last (possibly incomplete) line for the next chunk
+                const lines = buffer.split("\n");
+                buffer = lines.pop();
+                const events = lines.filter((line) => line.trim()).map((line) => JSON.parse(line));
+                events.filter((event) => event.type === "status").forEach((event) => { finalStatus = event.status; });
+                const text = events.map(formatProgressEvent).filter(Boolean);
+                if (text.length) {
+                    setOutput((prevOutput) => prevOutput + text.join("\n") + "\n");
+                }
             }
 
-            if (!controllerRef.current.signal.aborted) {
+            // Only a run that stored its solution can be explored
+            if (!controllerRef.current.signal.aborted && finalStatus === "succeeded") {
                 setModelFinishedRunning(true);
                 setIsContainerClickable(true);
             }
@@ -274,7 +295,7 @@ function MainScreen() {
         try {
             // Stop the model and recieve confirmation
             // API Call
-            const response = await stopModel();
+            const response = await stopModel(loggedInUserId);
             const data = await response.json();
             // Show stopping confirmation
             setOutput((prevOutput) => prevOutput + `\n${data.message}`);
@@ -285,211 +306,84 @@ function MainScreen() {
         }
     };
 
-    // Called from handleContainerClick
-    const fetchData = async (customval, selection) => {
-        // Extract label names
-        try {
-            await Promise.all([
-                processNameMapping("get-student-names", setStudentNames, customval, selection),
-                processNameMapping("get-teacher-names", setTeacherNames, customval, selection),
-                processNameMapping("get-room-names", setRoomNames, customval, selection),
-                processNameMapping("get-course-names", setCourseNames, customval, selection),
-                processNameMapping("get-instrument-names", setInstrumentNames, customval, selection),
-            ]);
-            console.log("successfully fetched labels")
-        } catch (error) {
-            console.error("Error fetching name mappings:", error);
-        }
-    };
-
-    // Called from handleContainerClick
-    const fetchAndParseCSV = async (fetchFunc, ...args) => {
-        // Helper function to extract data from CSV files and return rows
-        try {
-            // API Call
-            const response = await fetchFunc(...args);
-            if (!response.ok) throw new Error("Failed to fetch CSV");
-
-            const text = await response.text();
-            const rows = text.trim().split("\n").filter(row => row.trim() !== "");
+    // Called from handleLoadSolution and handleContainerClick
+    const loadSolutionBundle = async (selection) => {
+        // Fetches everything the solution screen shows in one request. Returns false if the solution does not exist or is incomplete
+        const bundle = await fetchSolutionBundle(loggedInUserId, selection);
+        if (!bundle) return false;
+
+        // Values as the solution screen expects them (the text of each CSV cell)
+        const toText = (row) => row.map((value) => (value === null || value === undefined ? "" : String(value)));
+
+        const { assignments } = bundle;
+        setSolutionData({
+            chartLabels: assignments.columns,
+            chartData: assignments.rows.length,
+            tableData: assignments.rows.map((row) => new SolutionEntry(toText(row))),
+        });
+
+        const parseJSON = (value, fallback) => {
+            // JSON columns arrive decoded, but older solutions may hold them as text
+            try {
+                const parsed = typeof value === "string" ? JSON.parse(value) : value;
+                return parsed ?? fallback;
+            } catch (error) {
+                console.warn("Failed to parse JSON value:", value);
+                return fallback;
+            }
+        };
 
-            return rows;
-        } catch (error) {
-            console.error("Error fetching and parsing CSV:", error);
-            throw error;
-        }
+        const insights = bundle.insights.rows[0];
+        setInsightsData({
+            workloadBalanceIndex: parseFloat(insights[0]),
+            dailyWorkloadDeviation: parseJSON(insights[1], {}),
+            underutilizedTeachers: parseJSON(insights[2], {}),
+            overloadedTeachers: parseJSON(insights[3], {}),
+            studentDistributionScore: parseFloat(insights[4]),
+            roomUtilizationRate: parseFloat(insights[5]),
+            peakHourCongestion: parseJSON(insights[6], {}),
+            roomUnderuse: parseJSON(insights[7], {}),
+            missingCourseStudents: parseJSON(insights[8], []),
+            missingInstrumentStudents: parseJSON(insights[9], []),
+            antiquityPenalties: parseJSON(insights[10], {}),
+            siblingPenalties: parseJSON(insights[11], {}),
+        });
+
+        setStudentCountData(bundle.student_count.rows.map(toText).map((row) => ({
+            timeSlot: row[0] || "Unknown",
+            numStudents: row[1] || "Unknown",
+        })));
+
+        // Indexed name mappings for use in displaying labeled entities
+        const toNames = (mapping) => mapping.rows.map(toText).map((row) => ({
+            index: parseInt(row[0], 10),
+            id: row[1],
+            name: row[2],
+        }));
+        setStudentNames(toNames(bundle.student_names));
+        setTeacherNames(toNames(bundle.teacher_names));
+        setRoomNames(toNames(bundle.room_names));
+        setCourseNames(toNames(bundle.course_names));
+        setInstrumentNames(toNames(bundle.instrument_names));
+
+        // Time grid the time slots of the solution refer to
+        setTimeGrid(bundle.time_grid || DEFAULT_TIME_GRID);
+
+        setShowSolution(true);
+        return true;
     };
 
-    // Called from handleContainerClick
-    const fetchSolutionData = async (customval, selection) => {
-        // Format Solution data 
+    // Called when the user wants to access the solution screen
+    const handleContainerClick = async () => {
+        // Fetch model solution data upon accessing the solution screen
+        if (!isContainerClickable) return;
         try {
-            let rows;
-            if (customval === 'True') {
-                // API Call
-                rows = await fetchAndParseCSV(() => customFetchSolutionCSV(loggedInUserId, selection));
-            } else {
-                // API Call
-                selection = 'temp_sol';
-                rows = await fetchAndParseCSV(() => customFetchSolutionCSV(loggedInUserId, selection));
-            };
-            const [header, ...dataRows] = rows.map(row => row.split(","));
-
-            console.log(rows);
-
-            // Each SolutionEntry object is a solution instance
-            const formattedData = dataRows.map(row => new SolutionEntry(row));
-            setSolutionData({
-                chartLabels: header,
-                chartData: dataRows.length,
-                tableData: formattedData,
-            });
-            console.log('successfully formatted data');
-            console.log(formattedData);
-
-            setShowSolution(true);
+            await loadSolutionBundle('temp_sol');
         } catch (error) {
             console.error("Error fetching solution data:", error);
         }
     };
 
-    // Called from handleContainerClick
-    const fetchInsightsData = async (customval, selection) => {
-        // Format Insights data
-        try {
-            let rows;
-            if (customval === 'True') {
-                // API Call
-                rows = await fetchAndParseCSV(() => customFetchInsightsCSV(loggedInUserId, selection));
-            } else {
-                // API Call
-                selection = 'temp_sol';
-                rows = await fetchAndParseCSV(() => customFetchInsightsCSV(loggedInUserId, selection));
-            };
-
-            console.log(rows);
-
-            const header = rows[0].split(",");
-            const dataRow = rows[1].match(/(".*?"|[^",]+)(?=\s*,|\s*$)/g);
-
-            const parseDict = (value) => {
-                try {
-                    if (typeof value === "string" && value.startsWith("\"{") && value.endsWith("}\"")) {
-                        value = value.slice(1, -1).replace(/""/g, '"');
-                    }
-                    return value.startsWith("{") ? JSON.parse(value) : parseFloat(value);
-                } catch (error) {
-                    console.warn("Failed to parse dictionary:", value);
-                    return {};
-                }
-            };
-
-            const parseList = (value) => {
-                try {
-                    if (typeof value === "string" && value.startsWith("\"[") && value.endsWith("]\"")) {
-                        value = value.slice(1, -1).replace(/""/g, '"');
-                    }
-                    return value.startsWith("[") ? JSON.parse(value) : [];
-                } catch (error) {
-                    console.warn("Failed to parse list:", value);
-                    return [];
-                }
-            };
-
-            const insightsData = {
-                workloadBalanceIndex: parseFloat(dataRow[0]),
-                dailyWorkloadDeviation: parseDict(dataRow[1]),
-                underutilizedTeachers: parseDict(dataRow[2]),
-                overloadedTeachers: parseDict(dataRow[3]),
-                studentDistributionScore: parseFloat(dataRow[4]),
-                roomUtilizationRate: parseFloat(dataRow[5]),
-                peakHourCongestion: parseDict(dataRow[6]),
-                roomUnderuse: parseDict(dataRow[7]),
-                missingCourseStudents: parseList(dataRow[8]),
-                missingInstrumentStudents: parseList(dataRow[9]),
-                antiquityPenalties: parseDict(dataRow[10]),
-                siblingPenalties: parseDict(dataRow[11]),
-            };
-
-            setInsightsData(insightsData);
-        } catch (error) {
-            console.error("Error fetching insights data:", error);
-        }
-    };
-
-    // Called from fetchData, which is called from handleContainerClick
-    const processNameMapping = async (endpoint, setDataFunction, customval, selection) => {
-        // Extracts indexed name mappings for use in displaying labeled entities
-        try {
-            let rows;
-            if (customval === 'True') {
-                // API Call
-                const modifiedEndpoint = `custom-${endpoint}`;
-                rows = await fetchAndParseCSV(() => customFetchNameMapping(modifiedEndpoint, loggedInUserId, selection), modifiedEndpoint);
-            } else {
-                // API Call
-                const modifiedEndpoint = `custom-${endpoint}`;
-                selection = 'temp_sol';
-                rows = await fetchAndParseCSV(() => customFetchNameMapping(modifiedEndpoint, loggedInUserId, selection), modifiedEndpoint);
-            };
-
-            if (!rows) return;
-
-            const header = rows[0].split(",");
-            const dataRows = rows.slice(1).map(row => row.split(","));
-
-            const parsedData = dataRows.map(row => ({
-                index: parseInt(row[0], 10),
-                id: row[1],
-                name: row[2]
-            }));
-
-            setDataFunction(parsedData);
-        } catch (error) {
-            // Already logged by fetchAndParseCSV
-        }
-    };
-
-    // Called from handleContainerClick
-    const fetchStudentCount = async (customval, selection) => {
-        // Extracts sudent count per time slot for statistical purposes
-        try {
-            let rows;
-            if (customval === 'True') {
-                // API Call
-                rows = await fetchAndParseCSV(() => customFetchStudentCountData(loggedInUserId, selection));
-            } else {
-                // API Call
-                selection = 'temp_sol';
-                rows = await fetchAndParseCSV(() => customFetchStudentCountData(loggedInUserId, selection));
-            };
-
-            if (!rows) return;
-
-            const [header, ...dataRows] = rows.map(row => row.split(","));
-
-            const studentCount = dataRows.map(row => ({
-                timeSlot: row[0] || "Unknown",
-                numStudents: row[1] || "Unknown",
-            }));
-
-            setStudentCountData(studentCount);
-            setShowSolution(true);
-        } catch (error) {
-            // Already logged by fetchAndParseCSV
-        }
-    };
-
-    // Called when the user wants to access the solution screen
-    const handleContainerClick = () => {
-        // Fetch model solution data upon accessing the solution screen
-        if (!isContainerClickable) return;
-        fetchSolutionData('False', '');
-        fetchInsightsData('False', '');
-        fetchStudentCount('False', '');
-        fetchData('False', '');
-    };
-
     // Triggered when the user wants to access the solution screen and all data has been successfully loaded
     if (showSolution && solutionData && insightsData && studentCount && loggedInUserId) {
         // Takes the user to the solution screen
@@ -502,6 +396,7 @@ function MainScreen() {
         courseNames={courseNames}
         instrumentNames={instrumentNames}
         roomNames={roomNames}
+        timeGrid={timeGrid}
         userID={loggedInUserId}
         loadedSolution={loadedSolution}
         />;
@@ -11,6 +11,8 @@ import SaveModal  from "./SaveModal";
 import ReturnHomeConfirmModal from "./ReturnHomeConfirmModal";
 import TopBar from './TopBar';
 
+import { gridSlots, slotDate } from './timeGrid';
+
 // API CALLS
 import {
  saveSolution,
@@ -19,7 +21,7 @@ import {
 // CSS
 import './App.css';
 
-function SolutionScreen({ solutionData, insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames, userID, loadedSolution}) {
+function SolutionScreen({ solutionData, insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames, timeGrid, userID, loadedSolution}) {
   const [filterType, setFilterType] = useState("room");
   const [selectedFilter, setSelectedFilter] = useState("0"); // Default to Room 0
   const [events, setEvents] = useState([]);
@@ -108,8 +110,7 @@ function SolutionScreen({ solutionData, insightsData, studentCount, studentNames
   useEffect(() => {
     if (!selectedFilter) return;
   
-    const slotsPerDay = 20; // (21:00 - 16:00) / 0.25h intervals
-    const baseDate = new Date(2000, 0, 3); // Monday of a fixed week
+    const slots = gridSlots(timeGrid); // Day and minute every time slot of the solution starts at
   
     // Group data by startTime, endTime, room, and teacher
     const groupedClasses = {};
@@ -141,21 +142,9 @@ function SolutionScreen({ solutionData, insightsData, studentCount, studentNames
         return true;
       })
       .map((group) => {
-        const startSlot = group.startTime;
-        const endSlot = group.endTime;
-
-        const startDayIndex = Math.floor(startSlot / slotsPerDay);
-        const startOffset = startSlot % slotsPerDay;
-        const endDayIndex = Math.floor(endSlot / slotsPerDay);
-        const endOffset = endSlot % slotsPerDay;
-
-        const startDate = new Date(baseDate);
-        startDate.setDate(baseDate.getDate() + startDayIndex);
-        startDate.setHours(16 + Math.floor(startOffset / 4), (startOffset % 4) * 15);
-
-        const endDate = new Date(baseDate);
-        endDate.setDate(baseDate.getDate() + endDayIndex);
-        endDate.setHours(16 + Math.floor(endOffset / 4), (endOffset % 4) * 15);
+        // endTime is the last slot the class takes, so the class ends one slot length after that slot starts
+        const startDate = slotDate(slots[group.startTime]);
+        const endDate = slotDate(slots[group.endTime], timeGrid.slot_minutes);
 
         return {
           title: `${group.title} (Room ${group.room})`,
@@ -167,7 +156,7 @@ function SolutionScreen({ solutionData, insightsData, studentCount, studentNames
 
     setEvents(filteredData);
 
-  }, [selectedFilter, filterType, solutionData, insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames]);
+  }, [selectedFilter, filterType, solutionData, insightsData, studentCount, studentNames, teacherNames, courseNames, instrumentNames, roomNames, timeGrid]);
 
   return (
     <>
@@ -237,6 +226,7 @@ function SolutionScreen({ solutionData, insightsData, studentCount, studentNames
             instrumentNames={instrumentNames}
             roomNames={roomNames}
             studentNames={studentNames}
+            timeGrid={timeGrid}
           />
           <InsightsSection
             insightsData={insightsData}
@@ -246,6 +236,7 @@ function SolutionScreen({ solutionData, insightsData, studentCount, studentNames
             courseNames={courseNames}
             instrumentNames={instrumentNames}
             roomNames={roomNames}
+            timeGrid={timeGrid}
           />
           <div className='save-button-wrapper'>
             <div
@@ -8,6 +8,8 @@ import {
   PolarAngleAxis
 } from "recharts";
 
+import { gridHours, gridSlots } from './timeGrid';
+
 // CARD NAME: Antiquity Penalties
 export const AntiquityChart = (data) => {
   const antiquityRanges = [
@@ -185,7 +187,7 @@ export const getPieChartData = (roomUnderuseData) => {
 };
 
 // CARD NAME: Peak Hour Congestion
-export const PeakHourMatrix = ({ studentCount }) => {
+export const PeakHourMatrix = ({ studentCount, timeGrid }) => {
   console.log(studentCount);
   let maxStudents = 0;
   for (let i = 0; i < studentCount.length; i++) {
@@ -208,12 +210,19 @@ export const PeakHourMatrix = ({ studentCount }) => {
     return "#FF0000";
   };
 
-  const daysOfWeek = ["M", "T", "W", "T", "F"];
-  const rowHeaders = Array.from({ length: 20 }, (_, i) => (i % 4 === 0 ? 16 + i / 4 : ""));
-
-  const grid = Array.from({ length: 5 }, (_, col) =>
-    Array.from({ length: 20 }, (_, row) => {
-      const timeslot = row + col * 20;
+  // One column per day of the time grid and one row per slot length from the earliest opening to the latest closing. Cells of a
+  // day that is closed at that time stay empty
+  const daysOfWeek = timeGrid.days.map(day => day.charAt(0));
+  const hours = gridHours(timeGrid);
+  const numRows = Math.floor((hours.close - hours.open) / timeGrid.slot_minutes);
+  const minutes = Array.from({ length: numRows }, (_, i) => hours.open + i * timeGrid.slot_minutes);
+  const rowHeaders = minutes.map(minute => (minute % 60 === 0 ? minute / 60 : ""));
+
+  const slotIndex = new Map(gridSlots(timeGrid).map(({ day, minute }, timeslot) => [`${day} ${minute}`, timeslot]));
+  const grid = timeGrid.days.map(day =>
+    minutes.map(minute => {
+      const timeslot = slotIndex.get(`${day} ${minute}`);
+      if (timeslot === undefined) return { timeslot: `${day} ${minute}`, students: null };
       const studentEntry = studentCount.find(entry => parseInt(entry.timeSlot) === timeslot);
       const students = studentEntry ? parseInt(studentEntry.numStudents.trim()) : 0;
       return { timeslot, students };
@@ -250,7 +259,7 @@ export const PeakHourMatrix = ({ studentCount }) => {
                   <div
                     key={timeslot}
                     className="cell"
-                    style={{ backgroundColor: getColor(students) }}
+                    style={{ backgroundColor: students === null ? "transparent" : getColor(students) }}
                   />
                 ))}
               </div>
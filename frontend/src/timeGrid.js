@@ -0,0 +1,40 @@
+// Time grid a solution was solved on, as the solution bundle sends it (see backend/time_grid.py): the days, the opening and closing
+// time of every day and the slot length. Time slots are numbered consecutively across the days of the grid, first day first
+export const DEFAULT_TIME_GRID = {
+  days: ["MON", "TUE", "WED", "THU", "FRI"],
+  open: ["16:00", "16:00", "16:00", "16:00", "16:00"],
+  close: ["21:00", "21:00", "21:00", "21:00", "21:00"],
+  slot_minutes: 15,
+};
+
+const WEEKDAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"];
+
+const toMinutes = (time) => {
+  const [hours, minutes] = time.split(":").map(Number);
+  return hours * 60 + minutes;
+};
+
+export const toTime = (minutes) =>
+  `${Math.floor(minutes / 60).toString().padStart(2, "0")}:${(minutes % 60).toString().padStart(2, "0")}`;
+
+// Day and minute of the day every time slot starts at, indexed by slot
+export const gridSlots = (grid) => {
+  const slots = [];
+  grid.days.forEach((day, d) => {
+    const open = toMinutes(grid.open[d]);
+    const count = Math.floor((toMinutes(grid.close[d]) - open) / grid.slot_minutes);
+    for (let i = 0; i < count; i++) {
+      slots.push({ day, minute: open + i * grid.slot_minutes });
+    }
+  });
+  return slots;
+};
+
+// Earliest opening and latest closing minute over the days of the grid
+export const gridHours = (grid) => ({
+  open: Math.min(...grid.open.map(toMinutes)),
+  close: Math.max(...grid.close.map(toMinutes)),
+});
+
+// Date a time slot starts at (plus some minutes) in the fixed week the calendar shows, which starts on Monday 2000-01-03
+export const slotDate = (slot, extraMinutes = 0) => new Date(2000, 0, 3 + WEEKDAYS.indexOf(slot.day), 0, slot.minute + extraMinutes);